@@ -0,0 +1,86 @@
+"""
+Fixtures building the storages, the remote backends against local stand-ins
+of the cloud services: an S3 compatible server (moto server, MinIO) pointed to
+by the ``AWS_ENDPOINT_URL`` environment variable and a fake-gcs-server pointed
+to by the ``STORAGE_EMULATOR_HOST`` environment variable. Benchmarks of
+a backend whose stand-in is not configured are skipped.
+"""
+
+import os
+from unittest import mock
+
+import pytest
+
+_BUCKET_NAME = "simple-storage-benchmarks"
+_AWS_CREDENTIALS = {
+    "aws_access_key_id": "benchmark",
+    "aws_secret_access_key": "benchmark",
+}
+
+
+@pytest.fixture(scope="session")
+def file_system_storage_factory(tmp_path_factory):
+    from storages.backends.file_system import FileSystemStorage
+
+    def factory(**kwargs) -> FileSystemStorage:
+        return FileSystemStorage(
+            path=str(tmp_path_factory.mktemp("storage")), **kwargs
+        )
+
+    return factory
+
+
+@pytest.fixture(scope="session")
+def s3_storage_factory():
+    if "AWS_ENDPOINT_URL" not in os.environ:
+        pytest.skip("AWS_ENDPOINT_URL does not point to an S3 stand-in")
+    boto3 = pytest.importorskip("boto3")
+    from botocore.exceptions import ClientError
+
+    from storages.backends.amazon_s3 import AmazonS3Storage
+
+    try:
+        boto3.client(
+            "s3", region_name="us-east-1", **_AWS_CREDENTIALS
+        ).create_bucket(Bucket=_BUCKET_NAME)
+    except ClientError:
+        pass
+
+    def factory(**kwargs) -> AmazonS3Storage:
+        return AmazonS3Storage(
+            aws_bucket_name=_BUCKET_NAME, **_AWS_CREDENTIALS, **kwargs
+        )
+
+    return factory
+
+
+@pytest.fixture(scope="session")
+def google_cloud_storage_factory():
+    if "STORAGE_EMULATOR_HOST" not in os.environ:
+        pytest.skip("STORAGE_EMULATOR_HOST does not point to a GCS stand-in")
+    storage = pytest.importorskip("google.cloud.storage")
+    from google.api_core.exceptions import Conflict
+    from google.auth.credentials import AnonymousCredentials
+
+    from storages.backends.google_cloud import GoogleCloudStorage
+
+    client = storage.Client(
+        project="benchmark", credentials=AnonymousCredentials()
+    )
+    try:
+        client.create_bucket(_BUCKET_NAME)
+    except Conflict:
+        pass
+
+    def factory(**kwargs) -> GoogleCloudStorage:
+        # The emulator accepts anonymous requests only.
+        with mock.patch.object(
+            storage.Client, "from_service_account_info", return_value=client
+        ):
+            return GoogleCloudStorage(
+                google_cloud_credentials="emulator",
+                google_cloud_bucket_name=_BUCKET_NAME,
+                **kwargs,
+            )
+
+    return factory
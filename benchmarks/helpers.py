@@ -0,0 +1,47 @@
+import os
+import resource
+
+
+def record_throughput(benchmark, size: int):
+    benchmark.extra_info["bytes"] = size
+    if benchmark.stats is None:  # benchmarks are disabled
+        return
+    benchmark.extra_info["throughput_mib_s"] = (
+        size / benchmark.stats.stats.mean / (1024 * 1024)
+    )
+
+
+def record_peak_memory(benchmark, function, *args):
+    """
+    Runs the function once more in a forked process and records by how much
+    it raised the peak resident set size of the process.
+    """
+    if not hasattr(os, "fork"):
+        return
+    read_end, write_end = os.pipe()
+    pid = os.fork()
+    if pid == 0:  # pragma: no cover
+        try:
+            os.close(read_end)
+            before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            function(*args)
+            after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            os.write(write_end, str(after - before).encode())
+        finally:
+            os._exit(0)
+    os.close(write_end)
+    with os.fdopen(read_end) as pipe:
+        increase = pipe.read()
+    os.waitpid(pid, 0)
+    if increase:
+        # ru_maxrss is given in kilobytes on Linux.
+        benchmark.extra_info["peak_rss_increase_mib"] = int(increase) / 1024
+
+
+def record_operations(benchmark, count: int):
+    benchmark.extra_info["operations"] = count
+    if benchmark.stats is None:  # benchmarks are disabled
+        return
+    benchmark.extra_info["operations_per_second"] = (
+        count / benchmark.stats.stats.mean
+    )
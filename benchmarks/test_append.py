@@ -0,0 +1,54 @@
+"""
+Lines appended to a growing log file. Every group compares appending a line
+with write(mode="ab") against rewriting the whole file with the line added
+(the read-modify-write appending used to take on the remote backends), at
+increasing sizes of the log. Appending stays flat as the log grows while
+rewriting grows with it.
+"""
+
+import pytest
+
+from benchmarks.helpers import record_operations
+from storages.backends.base import Storage
+
+_BACKENDS = ("file_system", "s3", "google_cloud")
+# Logs from 5 MiB up are appended to on S3 by copying parts.
+_LOG_SIZES = (64 * 1024, 1024 * 1024, 16 * 1024 * 1024)
+_LINE = b"2024-01-01T00:00:00Z INFO request handled in 12ms\n"
+_ROUNDS = 10
+
+
+@pytest.fixture(scope="module", params=_BACKENDS)
+def backend(request) -> str:
+    return request.param
+
+
+@pytest.fixture(scope="module")
+def storage(request, backend) -> Storage:
+    return request.getfixturevalue(f"{backend}_storage_factory")()
+
+
+def _append(storage: Storage, name: str):
+    storage.write(name, _LINE, mode="ab")
+
+
+def _rewrite(storage: Storage, name: str):
+    storage.write(name, storage.read(name, mode="rb") + _LINE, mode="wb")
+
+
+@pytest.mark.parametrize("log_size", _LOG_SIZES)
+@pytest.mark.parametrize("strategy", ("append", "rewrite"))
+def test_append(benchmark, backend, storage, strategy, log_size):
+    name = f"append-{strategy}-{log_size}"
+    storage.write(name, _LINE * (log_size // len(_LINE)), mode="wb")
+    benchmark.group = f"append-{backend}-{log_size}"
+    benchmark.extra_info.update(
+        backend=backend, strategy=strategy, log_size=log_size
+    )
+    benchmark.pedantic(
+        _append if strategy == "append" else _rewrite,
+        args=(storage, name),
+        rounds=_ROUNDS,
+    )
+    record_operations(benchmark, 1)
+    storage.delete(name)
@@ -0,0 +1,32 @@
+"""
+Existence checks against S3, comparing the shared low-level client of the
+storage with creating a new client for every call (the former behaviour).
+"""
+
+import pytest
+
+_NAME = "exists-benchmark"
+
+
+@pytest.fixture(scope="module")
+def s3_storage(s3_storage_factory):
+    storage = s3_storage_factory()
+    storage.write(_NAME, b"content", mode="wb")
+    yield storage
+    storage.delete(_NAME)
+
+
+def test_s3_exists_with_shared_client(benchmark, s3_storage):
+    benchmark.group = "s3-exists"
+    assert benchmark(s3_storage.exists, _NAME)
+
+
+def test_s3_exists_with_client_per_call(benchmark, s3_storage):
+    def exists(name: str) -> bool:
+        s3_storage._session.client(service_name="s3").head_object(
+            Bucket=s3_storage._bucket_name, Key=name
+        )
+        return True
+
+    benchmark.group = "s3-exists"
+    assert benchmark(exists, _NAME)
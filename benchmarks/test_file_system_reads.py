@@ -0,0 +1,97 @@
+"""
+Reads of local files, comparing copying them into memory with mapping them
+(read_buffer) and copying them to other files in the kernel (copy_to). Every
+group compares the throughput and the peak memory of the approaches for one
+file size. Note that mapped pages are counted in the resident set size even
+though they belong to the page cache and are never copied to the heap. The
+2 GB files are only benchmarked when the ``STORAGES_BENCHMARK_LARGE_FILES``
+environment variable is set.
+"""
+
+import os
+from shutil import copyfileobj
+
+import pytest
+
+from benchmarks.helpers import record_peak_memory, record_throughput
+from storages.backends.file_system import FileSystemStorage
+
+_BLOCK_SIZE = 1024 * 1024
+_PAGE_SIZE = 4096
+_COPY_NAME = "copy.bin"
+_LARGE_FILE_SIZE = 2 * 1024 * 1024 * 1024
+_FILE_SIZES = (
+    1024 * 1024,
+    100 * 1024 * 1024,
+    pytest.param(
+        _LARGE_FILE_SIZE,
+        marks=pytest.mark.skipif(
+            "STORAGES_BENCHMARK_LARGE_FILES" not in os.environ,
+            reason="STORAGES_BENCHMARK_LARGE_FILES is not set",
+        ),
+    ),
+)
+
+
+@pytest.fixture(scope="module")
+def storage(tmp_path_factory) -> FileSystemStorage:
+    return FileSystemStorage(path=str(tmp_path_factory.mktemp("reads")))
+
+
+@pytest.fixture(scope="module", params=_FILE_SIZES, ids=str)
+def file_name(request, storage) -> str:
+    name = f"{request.param}.bin"
+    block = os.urandom(_BLOCK_SIZE)
+    with storage.open_write(name) as file:
+        for _ in range(request.param // _BLOCK_SIZE):
+            file.write(block)
+    yield name
+    storage.delete(name)
+
+
+def _read(storage: FileSystemStorage, name: str):
+    assert len(storage.read(name, mode="rb")) == storage.size(name)
+
+
+def _read_buffer(storage: FileSystemStorage, name: str):
+    with storage.read_buffer(name) as buffer:
+        # Touches every page, as parsing the file would.
+        assert buffer[::_PAGE_SIZE].tobytes()
+
+
+def _copy_with_file_objects(storage: FileSystemStorage, name: str):
+    with storage.open_read(name) as source, storage.open_write(
+        _COPY_NAME, mode="wb"
+    ) as file:
+        copyfileobj(source, file)
+
+
+def _copy_to(storage: FileSystemStorage, name: str):
+    with storage.open_write(_COPY_NAME, mode="wb") as file:
+        storage.copy_to(name, file)
+
+
+@pytest.mark.parametrize(
+    "function",
+    (_read, _read_buffer),
+    ids=lambda function: function.__name__.strip("_"),
+)
+def test_file_system_read(benchmark, storage, file_name, function):
+    _benchmark(benchmark, "read", storage, file_name, function)
+
+
+@pytest.mark.parametrize(
+    "function",
+    (_copy_with_file_objects, _copy_to),
+    ids=lambda function: function.__name__.strip("_"),
+)
+def test_file_system_copy(benchmark, storage, file_name, function):
+    _benchmark(benchmark, "copy", storage, file_name, function)
+
+
+def _benchmark(benchmark, operation, storage, file_name, function):
+    size = storage.size(file_name)
+    benchmark.group = f"file-system-{operation}-{size}"
+    benchmark.pedantic(function, args=(storage, file_name), rounds=3)
+    record_throughput(benchmark, size)
+    record_peak_memory(benchmark, function, storage, file_name)
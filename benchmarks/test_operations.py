@@ -0,0 +1,129 @@
+"""
+The basic operations of every backend across object sizes and concurrency
+levels. Every benchmark runs one operation on as many objects as the
+concurrency level, all at once, and groups compare the backends. Results are
+saved for comparison over time with ``--benchmark-json`` or
+``--benchmark-autosave``, along with the backend, operation, object size and
+concurrency level in ``extra_info``.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+import pytest
+
+from benchmarks.helpers import record_operations, record_throughput
+from storages.backends.base import Storage
+
+_BACKENDS = ("file_system", "s3", "google_cloud")
+_SIZES = (1024, 1024 * 1024, 8 * 1024 * 1024)
+_METADATA_SIZE = 1024
+_CONCURRENCY_LEVELS = (1, 4, 16)
+_ROUNDS = 3
+
+
+@pytest.fixture(scope="module", params=_BACKENDS)
+def backend(request) -> str:
+    return request.param
+
+
+@pytest.fixture(scope="module")
+def storage(request, backend) -> Storage:
+    return request.getfixturevalue(f"{backend}_storage_factory")()
+
+
+@pytest.fixture(scope="module")
+def executor():
+    with ThreadPoolExecutor(max(_CONCURRENCY_LEVELS)) as executor:
+        yield executor
+
+
+def _names(operation: str, size: int, concurrency: int) -> List[str]:
+    return [
+        f"operations-{operation}-{size}-{concurrency}-{index}"
+        for index in range(concurrency)
+    ]
+
+
+def _run_all(executor, function: Callable[[str], object], names: List[str]):
+    # Surfaces the errors of the operations.
+    list(executor.map(function, names))
+
+
+def _write_all(storage: Storage, executor, names: List[str], content: bytes):
+    _run_all(
+        executor, lambda name: storage.write(name, content, mode="wb"), names
+    )
+
+
+def _describe(benchmark, backend, operation, size, concurrency):
+    benchmark.group = f"{operation}-{size}-{concurrency}"
+    benchmark.extra_info.update(
+        backend=backend,
+        operation=operation,
+        size=size,
+        concurrency=concurrency,
+    )
+
+
+@pytest.mark.parametrize("concurrency", _CONCURRENCY_LEVELS)
+@pytest.mark.parametrize("size", _SIZES)
+def test_write(benchmark, backend, storage, executor, size, concurrency):
+    content = os.urandom(size)
+    names = _names("write", size, concurrency)
+    _describe(benchmark, backend, "write", size, concurrency)
+    benchmark.pedantic(
+        _write_all, args=(storage, executor, names, content), rounds=_ROUNDS
+    )
+    record_throughput(benchmark, size * concurrency)
+    record_operations(benchmark, concurrency)
+    storage.delete_many(names)
+
+
+@pytest.mark.parametrize("concurrency", _CONCURRENCY_LEVELS)
+@pytest.mark.parametrize("size", _SIZES)
+def test_read(benchmark, backend, storage, executor, size, concurrency):
+    names = _names("read", size, concurrency)
+    _write_all(storage, executor, names, os.urandom(size))
+    _describe(benchmark, backend, "read", size, concurrency)
+    benchmark.pedantic(
+        _run_all,
+        args=(executor, lambda name: storage.read(name, mode="rb"), names),
+        rounds=_ROUNDS,
+    )
+    record_throughput(benchmark, size * concurrency)
+    record_operations(benchmark, concurrency)
+    storage.delete_many(names)
+
+
+@pytest.mark.parametrize("concurrency", _CONCURRENCY_LEVELS)
+@pytest.mark.parametrize("operation", ("exists", "size"))
+def test_metadata(
+    benchmark, backend, storage, executor, operation, concurrency
+):
+    names = _names(operation, _METADATA_SIZE, concurrency)
+    _write_all(storage, executor, names, os.urandom(_METADATA_SIZE))
+    _describe(benchmark, backend, operation, _METADATA_SIZE, concurrency)
+    benchmark.pedantic(
+        _run_all,
+        args=(executor, getattr(storage, operation), names),
+        rounds=_ROUNDS,
+    )
+    record_operations(benchmark, concurrency)
+    storage.delete_many(names)
+
+
+@pytest.mark.parametrize("concurrency", _CONCURRENCY_LEVELS)
+def test_delete(benchmark, backend, storage, executor, concurrency):
+    names = _names("delete", _METADATA_SIZE, concurrency)
+    content = os.urandom(_METADATA_SIZE)
+    _describe(benchmark, backend, "delete", _METADATA_SIZE, concurrency)
+    benchmark.pedantic(
+        _run_all,
+        args=(executor, storage.delete, names),
+        # Every round deletes freshly written objects.
+        setup=lambda: _write_all(storage, executor, names, content),
+        rounds=_ROUNDS,
+    )
+    record_operations(benchmark, concurrency)
@@ -0,0 +1,55 @@
+"""
+Large object uploads split into parts sent from a thread pool. Every group
+compares the throughput of the same upload across concurrency levels.
+"""
+
+import os
+
+import pytest
+
+from benchmarks.helpers import record_throughput
+
+_OBJECT_SIZE = 64 * 1024 * 1024
+_PART_SIZE = 8 * 1024 * 1024
+_CONCURRENCY_LEVELS = (1, 2, 4, 8)
+
+
+@pytest.fixture(scope="module")
+def content() -> bytes:
+    return os.urandom(_OBJECT_SIZE)
+
+
+@pytest.mark.parametrize("concurrency", _CONCURRENCY_LEVELS)
+def test_s3_multipart_upload(
+    benchmark, s3_storage_factory, content, concurrency
+):
+    storage = s3_storage_factory(
+        aws_multipart_threshold=_PART_SIZE,
+        aws_multipart_part_size=_PART_SIZE,
+        aws_max_concurrency=concurrency,
+    )
+    name = f"parallel-upload-{concurrency}"
+    benchmark.group = "s3-multipart-upload"
+    benchmark.pedantic(
+        storage.write, args=(name, content), kwargs={"mode": "wb"}, rounds=3
+    )
+    record_throughput(benchmark, len(content))
+    storage.delete(name)
+
+
+@pytest.mark.parametrize("concurrency", _CONCURRENCY_LEVELS)
+def test_google_cloud_composite_upload(
+    benchmark, google_cloud_storage_factory, content, concurrency
+):
+    storage = google_cloud_storage_factory(
+        google_cloud_composite_threshold=_PART_SIZE,
+        google_cloud_part_size=_PART_SIZE,
+        google_cloud_max_concurrency=concurrency,
+    )
+    name = f"parallel-upload-{concurrency}"
+    benchmark.group = "google-cloud-composite-upload"
+    benchmark.pedantic(
+        storage.write, args=(name, content), kwargs={"mode": "wb"}, rounds=3
+    )
+    record_throughput(benchmark, len(content))
+    storage.delete(name)
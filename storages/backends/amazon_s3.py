@@ -1,25 +1,76 @@
+import codecs
+import hashlib
+import io
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
-from typing import AnyStr
+from functools import partial
+from threading import Lock
+from typing import (
+    IO,
+    Any,
+    AnyStr,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+)
 
 import boto3
 from boto3 import Session
 from boto3.resources.base import ServiceResource
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from botocore.response import StreamingBody
+from s3transfer.utils import ChunksizeAdjuster
 
-from storages.backends.base import Storage
-from storages.exceptions import ImproperlyConfiguredError
+from storages.backends.base import (
+    DEFAULT_MAX_CONCURRENCY,
+    BatchResult,
+    ByteSize,
+    Duration,
+    Storage,
+    StorageEntry,
+    StorageStat,
+    _SpooledTextUpload,
+    _SpooledUpload,
+)
+from storages.exceptions import (
+    ConcurrentModificationError,
+    ImproperlyConfiguredError,
+)
 
 
 class AmazonS3Storage(Storage):
     _SERVICE_NAME = "s3"
+    _SPOOL_MAX_SIZE = 8 * 1024 * 1024
+    _MIN_PART_SIZE = 5 * 1024 * 1024
+    _MAX_COPY_PART_SIZE = 5 * 1024 * 1024 * 1024
+    _DELETE_BATCH_SIZE = 1000
+    _APPEND_ATTEMPTS = 5
+    _MISSING_CODES = ("404", "NoSuchKey")
+    # Codes of failed conditional writes, the latter one of a write racing
+    # another conditional write of the same object.
+    _PRECONDITION_CODES = ("PreconditionFailed", "ConditionalRequestConflict")
 
     def __init__(
         self,
         aws_access_key_id: str,
         aws_secret_access_key: str,
         aws_bucket_name: str,
+        *,
+        aws_multipart_threshold: ByteSize = ByteSize(8 * 1024 * 1024),
+        aws_multipart_part_size: ByteSize = ByteSize(8 * 1024 * 1024),
+        aws_max_concurrency: int = 10,
+        aws_max_attempts: int = 5,
+        aws_max_pool_connections: int = 10,
+        aws_connect_timeout: Duration = Duration(60.0),
+        aws_read_timeout: Duration = Duration(60.0),
+        aws_tcp_keepalive: bool = False,
     ):
         if not aws_access_key_id:
             raise ImproperlyConfiguredError(name="aws_access_key_id")
@@ -27,12 +78,32 @@ class AmazonS3Storage(Storage):
             raise ImproperlyConfiguredError(name="aws_secret_access_key")
         if not aws_bucket_name:
             raise ImproperlyConfiguredError(name="aws_bucket_name")
+        if aws_multipart_part_size < self._MIN_PART_SIZE:
+            raise ImproperlyConfiguredError(name="aws_multipart_part_size")
+        if aws_max_concurrency < 1:
+            raise ImproperlyConfiguredError(name="aws_max_concurrency")
+        if aws_max_pool_connections < 1:
+            raise ImproperlyConfiguredError(name="aws_max_pool_connections")
         self._session: Session = boto3.Session(
             aws_access_key_id=aws_access_key_id,
             aws_secret_access_key=aws_secret_access_key,
         )
         self._s3: ServiceResource = self._session.resource(
-            service_name=self._SERVICE_NAME
+            service_name=self._SERVICE_NAME,
+            config=Config(
+                retries={"max_attempts": aws_max_attempts, "mode": "standard"},
+                max_pool_connections=aws_max_pool_connections,
+                connect_timeout=aws_connect_timeout,
+                read_timeout=aws_read_timeout,
+                tcp_keepalive=aws_tcp_keepalive,
+            ),
+        )
+        # The low-level client of the resource, sharing its connection pool.
+        self._client = self._s3.meta.client
+        self._transfer_config = TransferConfig(
+            multipart_threshold=aws_multipart_threshold,
+            multipart_chunksize=aws_multipart_part_size,
+            max_concurrency=aws_max_concurrency,
         )
         self._bucket_name = aws_bucket_name
         self._bucket = self._s3.Bucket(self._bucket_name)
@@ -44,17 +115,344 @@ class AmazonS3Storage(Storage):
         body: StreamingBody = self._bucket.Object(key=name).get()["Body"]
         return body.read() if "b" in mode else body.read().decode("utf-8")
 
-    def write(self, name: str, content: AnyStr, mode: str = "a"):
-        self._bucket.put_object(Key=name, Body=content)
+    def write(self, name: str, content: AnyStr, mode: str = "w"):
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        if "a" in mode:
+            self._append(name, io.BytesIO(data))
+        elif len(data) < self._transfer_config.multipart_threshold:
+            self._bucket.put_object(Key=name, Body=data)
+        else:
+            self._upload(name, io.BytesIO(data))
+
+    def _upload(self, name: str, file: IO[bytes]):
+        """
+        Uploads the file, switching to a multipart upload with concurrently
+        sent parts above the multipart threshold. Every part is retried on
+        its own by botocore.
+        """
+        self._bucket.upload_fileobj(
+            Fileobj=file, Key=name, Config=self._transfer_config
+        )
+
+    def _append(self, name: str, file: IO[bytes]):
+        """
+        Appends the contents of the file to the object. Objects of at least
+        the minimum part size are extended by a multipart upload whose
+        leading parts are copied from the object on the server side
+        (upload_part_copy), followed by the appended data read from the file
+        one part at a time, so only the appended data is sent. Smaller
+        objects are downloaded and merged with the start of the appended
+        data into the first part. The upload is conditional on the ETag of
+        the object, and retried on the new object when racing another write.
+        """
+        attempt = 0
+        while True:
+            try:
+                self._append_once(name, file)
+                return
+            except ConcurrentModificationError:
+                attempt += 1
+                if attempt >= self._APPEND_ATTEMPTS:
+                    raise
+
+    def _append_once(self, name: str, file: IO[bytes]):
+        size = file.seek(0, io.SEEK_END)
+        file.seek(0)
+        head = self._head(name)
+        if head is None:
+            self._write_conditionally(name, file, size, {"IfNoneMatch": "*"})
+            return
+        if not size:
+            return
+        etag = head["ETag"]
+        existing_size = head["ContentLength"]
+        part_size = (
+            self._part_size(existing_size + size)
+            or self._transfer_config.multipart_chunksize
+        )
+        parts: List[Callable[[str, int], str]] = []
+        with self._preconditions(name):
+            if existing_size < self._MIN_PART_SIZE:
+                existing = self._client.get_object(
+                    Bucket=self._bucket_name, Key=name, IfMatch=etag
+                )["Body"].read()
+                if (
+                    existing_size + size
+                    < self._transfer_config.multipart_threshold
+                ):
+                    self._client.put_object(
+                        Bucket=self._bucket_name,
+                        Key=name,
+                        Body=existing + file.read(),
+                        IfMatch=etag,
+                    )
+                    return
+                first_part = existing + file.read(part_size - existing_size)
+                parts += self._file_parts(
+                    name, io.BytesIO(first_part), 0, len(first_part), part_size
+                )
+                start = len(first_part) - existing_size
+            else:
+                # Parts (but the last one) must not exceed the maximum copied
+                # part size nor fall below the minimum part size, so the
+                # object is split into equal ranges.
+                part_count = -(-existing_size // self._MAX_COPY_PART_SIZE)
+                copy_size = -(-existing_size // part_count)
+                parts += [
+                    partial(
+                        self._copy_part,
+                        name,
+                        etag,
+                        copy_start,
+                        min(copy_start + copy_size, existing_size),
+                    )
+                    for copy_start in range(0, existing_size, copy_size)
+                ]
+                start = 0
+            parts += self._file_parts(name, file, start, size, part_size)
+            self._upload_parts(name, parts, {"IfMatch": etag})
+
+    def write_if_changed(self, name: str, content: AnyStr) -> bool:
+        """
+        Uploads the content unless the object already holds it, comparing
+        its ETag with the one computed from the content. The upload is
+        conditional on the ETag (If-Match) or on the absence (If-None-Match)
+        of the object, so writers racing each other are not overwritten.
+        """
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        head = self._head(name)
+        if (
+            head is not None
+            and head["ContentLength"] == len(data)
+            and head["ETag"] == self._etag(data, self._part_size(len(data)))
+        ):
+            return False
+        if head is None:
+            conditions = {"IfNoneMatch": "*"}
+        else:
+            conditions = {"IfMatch": head["ETag"]}
+        self._write_conditionally(
+            name, io.BytesIO(data), len(data), conditions
+        )
+        return True
+
+    def _head(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the metadata of the object, or None if it does not exist.
+        """
+        try:
+            return self._client.head_object(Bucket=self._bucket_name, Key=name)
+        except ClientError as cause:
+            if cause.response["Error"]["Code"] not in self._MISSING_CODES:
+                raise
+            return None
+
+    @contextmanager
+    def _preconditions(self, name: str) -> Iterator[None]:
+        try:
+            yield
+        except ClientError as cause:
+            if cause.response["Error"]["Code"] in self._PRECONDITION_CODES:
+                raise ConcurrentModificationError(name=name) from cause
+            raise
+
+    def _write_conditionally(
+        self, name: str, file: IO[bytes], size: int, conditions: Dict[str, str]
+    ):
+        part_size = self._part_size(size)
+        with self._preconditions(name):
+            if part_size is None:
+                self._client.put_object(
+                    Bucket=self._bucket_name,
+                    Key=name,
+                    Body=file.read(),
+                    **conditions,
+                )
+            else:
+                self._upload_parts(
+                    name,
+                    self._file_parts(name, file, 0, size, part_size),
+                    conditions,
+                )
+
+    def _part_size(self, size: int) -> Optional[int]:
+        """
+        Returns the part size of the content of the given size uploaded in
+        parts, the same as the one picked by upload_fileobj, or None when
+        the content is uploaded whole.
+        """
+        if size < self._transfer_config.multipart_threshold:
+            return None
+        return ChunksizeAdjuster().adjust_chunksize(
+            self._transfer_config.multipart_chunksize, size
+        )
+
+    @staticmethod
+    def _etag(data: bytes, part_size: Optional[int]) -> str:
+        """
+        Returns the ETag S3 assigns to the data: its MD5, or the MD5 of the
+        MD5s of its parts followed by their number when uploaded in parts.
+        """
+        if part_size is None:
+            return f'"{hashlib.md5(data).hexdigest()}"'
+        view = memoryview(data)
+        digests = [
+            hashlib.md5(view[start:][:part_size]).digest()
+            for start in range(0, len(data), part_size)
+        ]
+        digest = hashlib.md5(b"".join(digests)).hexdigest()
+        return f'"{digest}-{len(digests)}"'
+
+    def _file_parts(
+        self, name: str, file: IO[bytes], start: int, end: int, part_size: int
+    ) -> List[Callable[[str, int], str]]:
+        """
+        Returns the parts uploading the range of the file, each reading its
+        data when sent, so only the parts being sent are held in memory.
+        """
+        lock = Lock()
+        return [
+            partial(
+                self._upload_part,
+                name,
+                file,
+                lock,
+                part_start,
+                min(part_start + part_size, end),
+            )
+            for part_start in range(start, end, part_size)
+        ]
+
+    def _upload_part(
+        self,
+        name: str,
+        file: IO[bytes],
+        lock: Lock,
+        start: int,
+        end: int,
+        upload_id: str,
+        number: int,
+    ) -> str:
+        with lock:
+            file.seek(start)
+            data = file.read(end - start)
+        response = self._client.upload_part(
+            Bucket=self._bucket_name,
+            Key=name,
+            UploadId=upload_id,
+            PartNumber=number,
+            Body=data,
+        )
+        return response["ETag"]
+
+    def _copy_part(
+        self,
+        name: str,
+        etag: str,
+        start: int,
+        end: int,
+        upload_id: str,
+        number: int,
+    ) -> str:
+        response = self._client.upload_part_copy(
+            Bucket=self._bucket_name,
+            Key=name,
+            UploadId=upload_id,
+            PartNumber=number,
+            CopySource={"Bucket": self._bucket_name, "Key": name},
+            CopySourceRange=f"bytes={start}-{end - 1}",
+            CopySourceIfMatch=etag,
+        )
+        return response["CopyPartResult"]["ETag"]
+
+    def _upload_parts(
+        self,
+        name: str,
+        parts: List[Callable[[str, int], str]],
+        conditions: Dict[str, str],
+    ):
+        """
+        Runs a multipart upload of the parts, functions uploading (or
+        copying) the part of the given upload ID and number and returning
+        its ETag. Parts are sent concurrently and the upload is completed on
+        the given conditions, which upload_fileobj does not pass on.
+        """
+        upload_id = self._client.create_multipart_upload(
+            Bucket=self._bucket_name, Key=name
+        )["UploadId"]
+
+        def upload_part(number: int) -> Dict[str, Any]:
+            etag = parts[number - 1](upload_id, number)
+            return {"ETag": etag, "PartNumber": number}
+
+        try:
+            with ThreadPoolExecutor(
+                self._transfer_config.max_concurrency
+            ) as executor:
+                completed_parts = list(
+                    executor.map(upload_part, range(1, len(parts) + 1))
+                )
+            self._client.complete_multipart_upload(
+                Bucket=self._bucket_name,
+                Key=name,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": completed_parts},
+                **conditions,
+            )
+        except Exception:
+            self._client.abort_multipart_upload(
+                Bucket=self._bucket_name, Key=name, UploadId=upload_id
+            )
+            raise
+
+    def open_read(self, name: str, mode: str = "rb") -> IO:
+        body: StreamingBody = self._get_object(name).get()["Body"]
+        if "b" in mode:
+            return body  # type: ignore
+        return codecs.getreader("utf-8")(body)  # type: ignore
+
+    def open_write(self, name: str, mode: str = "wb") -> IO:
+        if "a" in mode:
+            upload = _SpooledUpload(
+                upload=lambda file: self._append(name, file),
+                max_size=self._SPOOL_MAX_SIZE,
+            )
+        else:
+            upload = _SpooledUpload(
+                upload=lambda file: self._upload(name, file),
+                max_size=self._SPOOL_MAX_SIZE,
+            )
+        if "b" in mode:
+            return upload  # type: ignore
+        return _SpooledTextUpload(upload, encoding="utf-8")  # type: ignore
+
+    def read_range(
+        self, name: str, start: int, end: Optional[int] = None
+    ) -> bytes:
+        if end is not None and end <= start:
+            return b""
+        last = "" if end is None else end - 1
+        response = self._get_object(name).get(Range=f"bytes={start}-{last}")
+        return response["Body"].read()
 
     def delete(self, name: str):
         self._bucket.Object(key=name).delete()
 
+    def copy(self, source: str, destination: str):
+        """
+        Copies the object within S3, switching to a multipart copy with
+        concurrently copied parts (upload_part_copy) above the multipart
+        threshold.
+        """
+        self._bucket.copy(
+            CopySource={"Bucket": self._bucket_name, "Key": source},
+            Key=destination,
+            Config=self._transfer_config,
+        )
+
     def exists(self, name: str) -> bool:
         try:
-            self._session.client(service_name=self._SERVICE_NAME).head_object(
-                Bucket=self._bucket_name, Key=name
-            )
+            self._client.head_object(Bucket=self._bucket_name, Key=name)
             return True
         except ClientError as cause:
             logging.info(cause, exc_info=True)
@@ -75,3 +473,91 @@ class AmazonS3Storage(Storage):
         raise NotImplementedError(
             "S3 storage does not provide access time info."
         )
+
+    def stat(self, name: str) -> StorageStat:
+        s3_object = self._get_object(name)
+        s3_object.load()
+        return StorageStat(
+            size=s3_object.content_length,
+            modified_time=s3_object.last_modified,
+            created_time=None,
+            etag=s3_object.e_tag,
+            content_type=s3_object.content_type,
+        )
+
+    def delete_many(
+        self,
+        names: Iterable[str],
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ) -> BatchResult:
+        return self._run_batches(
+            self._delete_batch,
+            names,
+            self._DELETE_BATCH_SIZE,
+            max_concurrency,
+        )
+
+    def _delete_batch(self, names: List[str]) -> BatchResult:
+        response = self._client.delete_objects(
+            Bucket=self._bucket_name,
+            Delete={
+                "Objects": [{"Key": name} for name in names],
+                "Quiet": True,
+            },
+        )
+        errors = {
+            error["Key"]: ClientError(
+                {
+                    "Error": {
+                        "Code": error["Code"],
+                        "Message": error["Message"],
+                    }
+                },
+                "DeleteObjects",
+            )
+            for error in response.get("Errors", [])
+        }
+        return BatchResult(
+            results={name: None for name in names if name not in errors},
+            errors=errors,
+        )
+
+    def list(
+        self,
+        prefix: str = "",
+        delimiter: Optional[str] = None,
+        prefetch_pages: int = 0,
+    ) -> Iterator[StorageEntry]:
+        arguments = {"Bucket": self._bucket_name, "Prefix": prefix}
+        if delimiter is not None:
+            arguments["Delimiter"] = delimiter
+        pages = self._client.get_paginator("list_objects_v2").paginate(
+            **arguments
+        )
+        return self._iterate_pages(
+            (self._page_entries(page) for page in pages), prefetch_pages
+        )
+
+    @staticmethod
+    def _page_entries(page: Dict[str, Any]) -> List[StorageEntry]:
+        entries = [
+            StorageEntry(
+                name=content["Key"],
+                size=content["Size"],
+                modified_time=content["LastModified"],
+                etag=content["ETag"],
+                is_prefix=False,
+            )
+            for content in page.get("Contents", [])
+        ]
+        entries.extend(
+            StorageEntry(
+                name=common_prefix["Prefix"],
+                size=None,
+                modified_time=None,
+                etag=None,
+                is_prefix=True,
+            )
+            for common_prefix in page.get("CommonPrefixes", [])
+        )
+        return entries
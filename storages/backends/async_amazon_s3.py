@@ -0,0 +1,205 @@
+import asyncio
+import logging
+from contextlib import AsyncExitStack
+from datetime import datetime
+from typing import Any, AnyStr, AsyncIterator, Dict, List, Optional
+
+from aiobotocore.config import AioConfig
+from aiobotocore.session import get_session
+from botocore.exceptions import ClientError
+
+from storages.backends.async_base import AsyncStorage
+from storages.backends.base import (
+    DEFAULT_CHUNK_SIZE,
+    Duration,
+    StorageEntry,
+    StorageStat,
+)
+from storages.exceptions import ImproperlyConfiguredError
+
+
+class AsyncAmazonS3Storage(AsyncStorage):
+    """
+    S3 storage built on the aiohttp based aiobotocore client. The client and
+    its connection pool are created on first use and shared by all calls.
+    """
+
+    _SERVICE_NAME = "s3"
+
+    def __init__(
+        self,
+        aws_access_key_id: str,
+        aws_secret_access_key: str,
+        aws_bucket_name: str,
+        *,
+        aws_max_attempts: int = 5,
+        aws_max_pool_connections: int = 10,
+        aws_connect_timeout: Duration = Duration(60.0),
+        aws_read_timeout: Duration = Duration(60.0),
+    ):
+        if not aws_access_key_id:
+            raise ImproperlyConfiguredError(name="aws_access_key_id")
+        if not aws_secret_access_key:
+            raise ImproperlyConfiguredError(name="aws_secret_access_key")
+        if not aws_bucket_name:
+            raise ImproperlyConfiguredError(name="aws_bucket_name")
+        if aws_max_pool_connections < 1:
+            raise ImproperlyConfiguredError(name="aws_max_pool_connections")
+        self._session = get_session()
+        self._client_arguments = {
+            "aws_access_key_id": aws_access_key_id,
+            "aws_secret_access_key": aws_secret_access_key,
+            "config": AioConfig(
+                retries={"max_attempts": aws_max_attempts, "mode": "standard"},
+                max_pool_connections=aws_max_pool_connections,
+                connect_timeout=aws_connect_timeout,
+                read_timeout=aws_read_timeout,
+            ),
+        }
+        self._bucket_name = aws_bucket_name
+        self._exit_stack = AsyncExitStack()
+        self._client: Any = None
+        self._client_lock: Optional[asyncio.Lock] = None
+
+    async def _get_client(self) -> Any:
+        if self._client_lock is None:
+            self._client_lock = asyncio.Lock()
+        async with self._client_lock:
+            if self._client is None:
+                self._client = await self._exit_stack.enter_async_context(
+                    self._session.create_client(
+                        self._SERVICE_NAME, **self._client_arguments
+                    )
+                )
+        return self._client
+
+    async def _get_object(self, name: str, **kwargs) -> Dict[str, Any]:
+        client = await self._get_client()
+        return await client.get_object(
+            Bucket=self._bucket_name, Key=name, **kwargs
+        )
+
+    async def _head_object(self, name: str) -> Dict[str, Any]:
+        client = await self._get_client()
+        return await client.head_object(Bucket=self._bucket_name, Key=name)
+
+    async def read(self, name: str, mode: str = "r") -> AnyStr:
+        response = await self._get_object(name)
+        async with response["Body"] as body:
+            content = await body.read()
+        return content if "b" in mode else content.decode("utf-8")
+
+    async def write(self, name: str, content: AnyStr, mode: str = "w"):
+        if "a" in mode:
+            raise NotImplementedError(
+                "Async S3 storage does not support appending to files."
+            )
+        client = await self._get_client()
+        await client.put_object(
+            Bucket=self._bucket_name, Key=name, Body=content
+        )
+
+    async def iter_chunks(
+        self, name: str, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        response = await self._get_object(name)
+        async with response["Body"] as body:
+            while True:
+                chunk = await body.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+    async def read_range(
+        self, name: str, start: int, end: Optional[int] = None
+    ) -> bytes:
+        if end is not None and end <= start:
+            return b""
+        last = "" if end is None else end - 1
+        response = await self._get_object(name, Range=f"bytes={start}-{last}")
+        async with response["Body"] as body:
+            return await body.read()
+
+    async def delete(self, name: str):
+        client = await self._get_client()
+        await client.delete_object(Bucket=self._bucket_name, Key=name)
+
+    async def exists(self, name: str) -> bool:
+        try:
+            await self._head_object(name)
+            return True
+        except ClientError as cause:
+            logging.info(cause, exc_info=True)
+            return False
+
+    async def size(self, name: str) -> int:
+        return (await self._head_object(name))["ContentLength"]
+
+    async def get_created_time(self, name: str) -> datetime:
+        raise NotImplementedError(
+            "S3 storage does not provide created time info."
+        )
+
+    async def get_modified_time(self, name: str) -> datetime:
+        return (await self._head_object(name))["LastModified"]
+
+    async def get_access_time(self, name: str) -> datetime:
+        raise NotImplementedError(
+            "S3 storage does not provide access time info."
+        )
+
+    async def stat(self, name: str) -> StorageStat:
+        response = await self._head_object(name)
+        return StorageStat(
+            size=response["ContentLength"],
+            modified_time=response["LastModified"],
+            created_time=None,
+            etag=response["ETag"],
+            content_type=response.get("ContentType"),
+        )
+
+    def list(
+        self,
+        prefix: str = "",
+        delimiter: Optional[str] = None,
+        prefetch_pages: int = 0,
+    ) -> AsyncIterator[StorageEntry]:
+        arguments = {"Bucket": self._bucket_name, "Prefix": prefix}
+        if delimiter is not None:
+            arguments["Delimiter"] = delimiter
+
+        async def pages():
+            client = await self._get_client()
+            paginator = client.get_paginator("list_objects_v2")
+            async for page in paginator.paginate(**arguments):
+                yield self._page_entries(page)
+
+        return self._iterate_pages(pages(), prefetch_pages)
+
+    @staticmethod
+    def _page_entries(page: Dict[str, Any]) -> List[StorageEntry]:
+        entries = [
+            StorageEntry(
+                name=content["Key"],
+                size=content["Size"],
+                modified_time=content["LastModified"],
+                etag=content["ETag"],
+                is_prefix=False,
+            )
+            for content in page.get("Contents", [])
+        ]
+        entries.extend(
+            StorageEntry(
+                name=common_prefix["Prefix"],
+                size=None,
+                modified_time=None,
+                etag=None,
+                is_prefix=True,
+            )
+            for common_prefix in page.get("CommonPrefixes", [])
+        )
+        return entries
+
+    async def close(self):
+        await self._exit_stack.aclose()
+        self._client = None
@@ -0,0 +1,146 @@
+import asyncio
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, AnyStr, AsyncIterator, List, Optional
+
+from storages.backends.base import (
+    DEFAULT_CHUNK_SIZE,
+    StorageEntry,
+    StorageStat,
+)
+
+
+class AsyncStorage(ABC):
+    """
+    The asyncio counterpart of storages.backends.base.Storage. Storages
+    holding connections should be closed, either explicitly or by using them
+    as asynchronous context managers.
+    """
+
+    @abstractmethod
+    async def read(self, name: str, mode: str = "r") -> AnyStr:
+        pass  # pragma: no cover
+
+    @abstractmethod
+    async def write(self, name: str, content: AnyStr, mode: str = "a"):
+        pass  # pragma: no cover
+
+    @abstractmethod
+    def iter_chunks(
+        self, name: str, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        """
+        Yields the contents of the file specified by name in chunks of at
+        most chunk_size.
+        """
+        pass  # pragma: no cover
+
+    @abstractmethod
+    async def read_range(
+        self, name: str, start: int, end: Optional[int] = None
+    ) -> bytes:
+        """
+        Returns the bytes of the file specified by name from the start
+        offset up to, but not including, the end offset (or up to the end of
+        the file if end is not given).
+        """
+        pass  # pragma: no cover
+
+    @abstractmethod
+    async def delete(self, name: str):
+        pass  # pragma: no cover
+
+    @abstractmethod
+    async def exists(self, name: str) -> bool:
+        pass  # pragma: no cover
+
+    @abstractmethod
+    async def size(self, name: str) -> int:
+        """
+        Returns size in bytes of the file specified by name.
+        """
+        pass  # pragma: no cover
+
+    @abstractmethod
+    async def get_created_time(self, name: str) -> datetime:
+        pass  # pragma: no cover
+
+    @abstractmethod
+    async def get_modified_time(self, name: str) -> datetime:
+        pass  # pragma: no cover
+
+    @abstractmethod
+    async def get_access_time(self, name: str) -> datetime:
+        pass  # pragma: no cover
+
+    @abstractmethod
+    async def stat(self, name: str) -> StorageStat:
+        """
+        Returns the metadata of the file specified by name, fetched using a
+        single call to the backend.
+        """
+        pass  # pragma: no cover
+
+    @abstractmethod
+    def list(
+        self,
+        prefix: str = "",
+        delimiter: Optional[str] = None,
+        prefetch_pages: int = 0,
+    ) -> AsyncIterator[StorageEntry]:
+        """
+        Lazily yields the files whose names start with prefix, see
+        storages.backends.base.Storage.list.
+        """
+        pass  # pragma: no cover
+
+    async def close(self):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    @staticmethod
+    async def _iterate_pages(
+        pages: AsyncIterator[List[StorageEntry]], prefetch_pages: int
+    ) -> AsyncIterator[StorageEntry]:
+        if prefetch_pages > 0:
+            pages = _prefetch(pages, prefetch_pages)
+        async for page in pages:
+            for entry in page:
+                yield entry
+
+
+_END = object()
+
+
+async def _prefetch(iterator: AsyncIterator[Any], size: int):
+    """
+    Consumes the iterator in a background task, staying at most size items
+    ahead of the caller. Errors are re-raised to the caller.
+    """
+    queue: "asyncio.Queue[Any]" = asyncio.Queue(maxsize=size)
+
+    async def produce():
+        try:
+            async for item in iterator:
+                await queue.put((item, None))
+        except Exception as error:
+            await queue.put((_END, error))
+        else:
+            await queue.put((_END, None))
+
+    task = asyncio.ensure_future(produce())
+    try:
+        while True:
+            item, error = await queue.get()
+            if error is not None:
+                raise error
+            if item is _END:
+                return
+            yield item
+    finally:
+        task.cancel()
@@ -0,0 +1,121 @@
+import asyncio
+import io
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+from itertools import islice
+from typing import Any, AnyStr, AsyncIterator, Callable, Optional
+
+from storages.backends.async_base import AsyncStorage
+from storages.backends.base import (
+    DEFAULT_CHUNK_SIZE,
+    ByteSize,
+    StorageEntry,
+    StorageStat,
+)
+from storages.backends.file_system import FSYNC_NONE, FileSystemStorage
+from storages.exceptions import ImproperlyConfiguredError
+
+
+class AsyncFileSystemStorage(AsyncStorage):
+    """
+    Runs the blocking file system calls of FileSystemStorage on a pool of
+    threads dedicated to the storage, so they never block the event loop.
+    """
+
+    _LIST_PAGE_SIZE = 1000
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        max_workers: int = 32,
+        atomic_writes: bool = False,
+        fsync: str = FSYNC_NONE,
+        make_directories: bool = False,
+        write_buffer_size: ByteSize = ByteSize(io.DEFAULT_BUFFER_SIZE),
+    ):
+        if max_workers < 1:
+            raise ImproperlyConfiguredError(name="max_workers")
+        self._storage = FileSystemStorage(
+            path=path,
+            atomic_writes=atomic_writes,
+            fsync=fsync,
+            make_directories=make_directories,
+            write_buffer_size=write_buffer_size,
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="storages"
+        )
+
+    async def _run(self, function: Callable[..., Any], *args) -> Any:
+        return await asyncio.get_event_loop().run_in_executor(
+            self._executor, partial(function, *args)
+        )
+
+    async def read(self, name: str, mode: str = "r") -> AnyStr:
+        return await self._run(self._storage.read, name, mode)
+
+    async def write(self, name: str, content: AnyStr, mode: str = "x"):
+        await self._run(self._storage.write, name, content, mode)
+
+    async def iter_chunks(
+        self, name: str, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        file = await self._run(self._storage.open_read, name)
+        try:
+            while True:
+                chunk = await self._run(file.read, chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            await self._run(file.close)
+
+    async def read_range(
+        self, name: str, start: int, end: Optional[int] = None
+    ) -> bytes:
+        return await self._run(self._storage.read_range, name, start, end)
+
+    async def delete(self, name: str):
+        await self._run(self._storage.delete, name)
+
+    async def exists(self, name: str) -> bool:
+        return await self._run(self._storage.exists, name)
+
+    async def size(self, name: str) -> int:
+        return await self._run(self._storage.size, name)
+
+    async def get_created_time(self, name: str) -> datetime:
+        return await self._run(self._storage.get_created_time, name)
+
+    async def get_modified_time(self, name: str) -> datetime:
+        return await self._run(self._storage.get_modified_time, name)
+
+    async def get_access_time(self, name: str) -> datetime:
+        return await self._run(self._storage.get_access_time, name)
+
+    async def stat(self, name: str) -> StorageStat:
+        return await self._run(self._storage.stat, name)
+
+    def list(
+        self,
+        prefix: str = "",
+        delimiter: Optional[str] = None,
+        prefetch_pages: int = 0,
+    ) -> AsyncIterator[StorageEntry]:
+        entries = self._storage.list(prefix, delimiter)
+
+        async def pages():
+            while True:
+                page = await self._run(
+                    lambda: list(islice(entries, self._LIST_PAGE_SIZE))
+                )
+                if not page:
+                    break
+                yield page
+
+        return self._iterate_pages(pages(), prefetch_pages)
+
+    async def close(self):
+        self._executor.shutdown(wait=False)
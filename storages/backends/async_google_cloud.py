@@ -0,0 +1,185 @@
+import base64
+import io
+from datetime import datetime
+from typing import Any, AnyStr, AsyncIterator, Dict, List, Optional
+
+from aiohttp import ClientResponseError
+from gcloud.aio.storage import Storage as Client  # type: ignore
+
+from storages.backends.async_base import AsyncStorage
+from storages.backends.base import (
+    DEFAULT_CHUNK_SIZE,
+    StorageEntry,
+    StorageStat,
+)
+from storages.exceptions import ImproperlyConfiguredError
+
+
+class AsyncGoogleCloudStorage(AsyncStorage):
+    """
+    Google Cloud Storage built on the aiohttp based gcloud-aio-storage
+    client, sharing one HTTP session between all calls.
+    """
+
+    _NOT_FOUND_STATUS = 404
+
+    def __init__(
+        self,
+        google_cloud_credentials: str,
+        google_cloud_bucket_name: str,
+        *,
+        google_cloud_timeout: int = 60,
+    ):
+        if not google_cloud_credentials:
+            raise ImproperlyConfiguredError(name="credentials_path")
+        if not google_cloud_bucket_name:
+            raise ImproperlyConfiguredError(name="google_cloud_bucket_name")
+
+        self._client = Client(
+            service_file=io.StringIO(
+                base64.b64decode(google_cloud_credentials).decode("utf-8")
+            )
+        )
+        self._bucket_name = google_cloud_bucket_name
+        self._timeout = google_cloud_timeout
+
+    @staticmethod
+    def _date_from_rfc3339(value: str) -> datetime:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+    async def _get_metadata(self, name: str) -> Dict[str, Any]:
+        return await self._client.download_metadata(
+            self._bucket_name, name, timeout=self._timeout
+        )
+
+    async def read(self, name: str, mode: str = "r") -> AnyStr:
+        content = await self._client.download(
+            self._bucket_name, name, timeout=self._timeout
+        )
+        if "b" in mode:
+            return content  # type: ignore
+        return content.decode("utf-8")  # type: ignore
+
+    async def write(self, name: str, content: AnyStr, mode: str = "w"):
+        if "a" in mode:
+            raise NotImplementedError(
+                "Async Google Cloud storage does not support appending to "
+                "files."
+            )
+        await self._client.upload(
+            self._bucket_name, name, content, timeout=self._timeout
+        )
+
+    async def iter_chunks(
+        self, name: str, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        stream = await self._client.download_stream(
+            self._bucket_name, name, timeout=self._timeout
+        )
+        async with stream:
+            while True:
+                chunk = await stream.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+    async def read_range(
+        self, name: str, start: int, end: Optional[int] = None
+    ) -> bytes:
+        if end is not None and end <= start:
+            return b""
+        last = "" if end is None else end - 1
+        return await self._client.download(
+            self._bucket_name,
+            name,
+            headers={"Range": f"bytes={start}-{last}"},
+            timeout=self._timeout,
+        )
+
+    async def delete(self, name: str):
+        await self._client.delete(
+            self._bucket_name, name, timeout=self._timeout
+        )
+
+    async def exists(self, name: str) -> bool:
+        try:
+            await self._get_metadata(name)
+            return True
+        except ClientResponseError as cause:
+            if cause.status == self._NOT_FOUND_STATUS:
+                return False
+            raise
+
+    async def size(self, name: str) -> int:
+        return (await self.stat(name)).size
+
+    async def get_created_time(self, name: str) -> datetime:
+        return (await self.stat(name)).created_time  # type: ignore
+
+    async def get_modified_time(self, name: str) -> datetime:
+        return (await self.stat(name)).modified_time
+
+    async def get_access_time(self, name: str) -> datetime:
+        raise NotImplementedError(
+            "Google Cloud Storage does not provide access time info."
+        )
+
+    async def stat(self, name: str) -> StorageStat:
+        metadata = await self._get_metadata(name)
+        return StorageStat(
+            size=int(metadata["size"]),
+            modified_time=self._date_from_rfc3339(metadata["updated"]),
+            created_time=self._date_from_rfc3339(metadata["timeCreated"]),
+            etag=metadata.get("etag"),
+            content_type=metadata.get("contentType"),
+        )
+
+    def list(
+        self,
+        prefix: str = "",
+        delimiter: Optional[str] = None,
+        prefetch_pages: int = 0,
+    ) -> AsyncIterator[StorageEntry]:
+        parameters = {"prefix": prefix}
+        if delimiter is not None:
+            parameters["delimiter"] = delimiter
+
+        async def pages():
+            while True:
+                page = await self._client.list_objects(
+                    self._bucket_name,
+                    params=parameters,
+                    timeout=self._timeout,
+                )
+                yield self._page_entries(page)
+                if "nextPageToken" not in page:
+                    break
+                parameters["pageToken"] = page["nextPageToken"]
+
+        return self._iterate_pages(pages(), prefetch_pages)
+
+    def _page_entries(self, page: Dict[str, Any]) -> List[StorageEntry]:
+        entries = [
+            StorageEntry(
+                name=item["name"],
+                size=int(item["size"]),
+                modified_time=self._date_from_rfc3339(item["updated"]),
+                etag=item.get("etag"),
+                is_prefix=False,
+            )
+            for item in page.get("items", [])
+        ]
+        entries.extend(
+            StorageEntry(
+                name=prefix,
+                size=None,
+                modified_time=None,
+                etag=None,
+                is_prefix=True,
+            )
+            for prefix in page.get("prefixes", [])
+        )
+        return entries
+
+    async def close(self):
+        await self._client.close()
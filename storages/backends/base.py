@@ -1,6 +1,69 @@
+import io
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import AnyStr
+from itertools import islice
+from queue import Full, Queue
+from shutil import copyfileobj
+from tempfile import SpooledTemporaryFile
+from threading import Event, Lock, Thread
+from typing import (
+    IO,
+    Any,
+    AnyStr,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    NewType,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+T = TypeVar("T")
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+DEFAULT_PART_SIZE = 8 * 1024 * 1024
+DEFAULT_MAX_CONCURRENCY = 10
+
+# Annotations of constructor parameters, which may be configured with units,
+# e.g. "8MiB" or "30s" (see storages.provider.EnvironmentVariableConverter).
+ByteSize = NewType("ByteSize", int)
+Duration = NewType("Duration", float)
+
+
+class StorageStat(NamedTuple):
+    size: int
+    modified_time: datetime
+    created_time: Optional[datetime]
+    etag: Optional[str]
+    content_type: Optional[str]
+
+
+class StorageEntry(NamedTuple):
+    """
+    A listed file or, when listing with a delimiter, a common prefix of
+    files (is_prefix set, no size, time nor etag).
+    """
+
+    name: str
+    size: Optional[int]
+    modified_time: Optional[datetime]
+    etag: Optional[str]
+    is_prefix: bool
+
+
+class BatchResult(NamedTuple):
+    """
+    Outcome of an operation run on many files: the results of the files it
+    succeeded for and the errors raised for the files it failed for.
+    """
+
+    results: Dict[str, Any]
+    errors: Dict[str, Exception]
 
 
 class Storage(ABC):
@@ -12,6 +75,127 @@ class Storage(ABC):
     def write(self, name: str, content: AnyStr, mode: str = "a"):
         pass  # pragma: no cover
 
+    @abstractmethod
+    def open_read(self, name: str, mode: str = "rb") -> IO:
+        """
+        Returns a file-like object streaming the contents of the file
+        specified by name, so it never has to be held in memory as a whole.
+        """
+        pass  # pragma: no cover
+
+    @abstractmethod
+    def open_write(self, name: str, mode: str = "wb") -> IO:
+        """
+        Returns a file-like object writing to the file specified by name.
+        The file is complete once the returned object gets closed.
+        """
+        pass  # pragma: no cover
+
+    def iter_chunks(
+        self, name: str, chunk_size: int = DEFAULT_CHUNK_SIZE, mode: str = "rb"
+    ) -> Iterator[AnyStr]:
+        """
+        Yields the contents of the file specified by name in chunks of at
+        most chunk_size.
+        """
+        with self.open_read(name, mode=mode) as file:
+            while True:
+                chunk = file.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+    def write_if_changed(self, name: str, content: AnyStr) -> bool:
+        """
+        Writes the content to the file specified by name unless the file
+        already holds it, returning whether it was written. Backends
+        override it to compare checksums from a single metadata call and to
+        write on the condition that the file did not change since,
+        raising ConcurrentModificationError otherwise.
+        """
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        try:
+            unchanged = (
+                self.size(name) == len(data)
+                and self.read(name, mode="rb") == data
+            )
+        except FileNotFoundError:
+            unchanged = False
+        if unchanged:
+            return False
+        self.write(name, data, mode="wb")
+        return True
+
+    @abstractmethod
+    def read_range(
+        self, name: str, start: int, end: Optional[int] = None
+    ) -> bytes:
+        """
+        Returns the bytes of the file specified by name from the start
+        offset up to, but not including, the end offset (or up to the end of
+        the file if end is not given).
+        """
+        pass  # pragma: no cover
+
+    def read_parallel(
+        self,
+        name: str,
+        part_size: int = DEFAULT_PART_SIZE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ) -> bytearray:
+        """
+        Returns the contents of the file specified by name, fetching its
+        byte ranges concurrently into a preallocated buffer.
+        """
+        buffer = bytearray(self.size(name))
+        view = memoryview(buffer)
+
+        def write(offset: int, data: bytes):
+            end = offset + len(data)
+            view[offset:end] = data
+
+        self._fetch_ranges(
+            name, len(buffer), write, part_size, max_concurrency
+        )
+        return buffer
+
+    def download_parallel(
+        self,
+        name: str,
+        file: IO[bytes],
+        part_size: int = DEFAULT_PART_SIZE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ):
+        """
+        Writes the contents of the file specified by name to the seekable
+        file object, fetching its byte ranges concurrently.
+        """
+        size = self.size(name)
+        file.truncate(size)
+        lock = Lock()
+
+        def write(offset: int, data: bytes):
+            with lock:
+                file.seek(offset)
+                file.write(data)
+
+        self._fetch_ranges(name, size, write, part_size, max_concurrency)
+        file.seek(size)
+
+    def _fetch_ranges(
+        self,
+        name: str,
+        size: int,
+        write: Callable[[int, bytes], None],
+        part_size: int,
+        max_concurrency: int,
+    ):
+        def fetch(start: int):
+            write(start, self.read_range(name, start, start + part_size))
+
+        with ThreadPoolExecutor(max_concurrency) as executor:
+            list(executor.map(fetch, range(0, size, part_size)))
+
     @abstractmethod
     def delete(self, name: str):
         pass  # pragma: no cover
@@ -39,6 +223,345 @@ class Storage(ABC):
     def get_access_time(self, name: str) -> datetime:
         pass  # pragma: no cover
 
+    @abstractmethod
+    def stat(self, name: str) -> StorageStat:
+        """
+        Returns the metadata of the file specified by name, fetched using a
+        single call to the backend.
+        """
+        pass  # pragma: no cover
+
+    def copy(self, source: str, destination: str):
+        """
+        Copies the file specified by source to destination, replacing the
+        destination file if it exists. Backends override it to copy files
+        without transferring them through the client.
+        """
+        with self.open_read(source, mode="rb") as source_file:
+            with self.open_write(destination, mode="wb") as destination_file:
+                copyfileobj(source_file, destination_file, DEFAULT_CHUNK_SIZE)
+
+    def move(self, source: str, destination: str):
+        """
+        Moves the file specified by source to destination, replacing the
+        destination file if it exists.
+        """
+        self.copy(source, destination)
+        self.delete(source)
+
+    def delete_many(
+        self,
+        names: Iterable[str],
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ) -> BatchResult:
+        return self._run_many(self.delete, names, max_concurrency)
+
+    def exists_many(
+        self,
+        names: Iterable[str],
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ) -> BatchResult:
+        return self._run_many(self.exists, names, max_concurrency)
+
+    def stat_many(
+        self,
+        names: Iterable[str],
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ) -> BatchResult:
+        return self._run_many(self.stat, names, max_concurrency)
+
+    @abstractmethod
+    def list(
+        self,
+        prefix: str = "",
+        delimiter: Optional[str] = None,
+        prefetch_pages: int = 0,
+    ) -> Iterator[StorageEntry]:
+        """
+        Lazily yields the files whose names start with prefix. With
+        a delimiter, names are not listed past the first delimiter after the
+        prefix, their common prefixes are yielded instead. Pages of entries
+        are fetched on demand, up to prefetch_pages of them ahead of the
+        caller in a background thread.
+        """
+        pass  # pragma: no cover
+
+    @staticmethod
+    def _iterate_pages(
+        pages: Iterator[List[StorageEntry]], prefetch_pages: int
+    ) -> Iterator[StorageEntry]:
+        if prefetch_pages > 0:
+            pages = _prefetch(pages, prefetch_pages)
+        for page in pages:
+            yield from page
+
+    @staticmethod
+    def _run_many(
+        operation: Callable[[str], Any],
+        names: Iterable[str],
+        max_concurrency: int,
+    ) -> BatchResult:
+        """
+        Runs the operation for every name from a thread pool, collecting
+        errors instead of stopping at the first one.
+        """
+        result = BatchResult(results={}, errors={})
+
+        def run(name: str):
+            try:
+                result.results[name] = operation(name)
+            except Exception as error:
+                result.errors[name] = error
+
+        with ThreadPoolExecutor(max_concurrency) as executor:
+            list(executor.map(run, names))
+        return result
+
+    @staticmethod
+    def _run_batches(
+        operation: Callable[[List[str]], BatchResult],
+        names: Iterable[str],
+        batch_size: int,
+        max_concurrency: int,
+    ) -> BatchResult:
+        """
+        Runs the operation for batches of at most batch_size names from
+        a thread pool. When a whole batch fails, its error is reported for
+        every name of the batch.
+        """
+        result = BatchResult(results={}, errors={})
+
+        def run(batch: List[str]):
+            try:
+                batch_result = operation(batch)
+            except Exception as error:
+                result.errors.update(dict.fromkeys(batch, error))
+                return
+            result.results.update(batch_result.results)
+            result.errors.update(batch_result.errors)
+
+        names_iterator = iter(names)
+        batches = iter(lambda: list(islice(names_iterator, batch_size)), [])
+        with ThreadPoolExecutor(max_concurrency) as executor:
+            list(executor.map(run, batches))
+        return result
+
+
+_END = object()
+
+
+def _prefetch(iterator: Iterator[T], size: int) -> Iterator[T]:
+    """
+    Consumes the iterator in a background thread, staying at most size
+    items ahead of the caller. Errors are re-raised to the caller.
+    """
+    queue: "Queue[Tuple[Any, Optional[Exception]]]" = Queue(maxsize=size)
+    stopped = Event()
+
+    def put(item: Any, error: Optional[Exception] = None) -> bool:
+        while not stopped.is_set():
+            try:
+                queue.put((item, error), timeout=0.1)
+                return True
+            except Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for item in iterator:
+                if not put(item):
+                    return
+        except Exception as error:
+            put(_END, error)
+        else:
+            put(_END)
+
+    Thread(target=produce, daemon=True).start()
+    try:
+        while True:
+            item, error = queue.get()
+            if error is not None:
+                raise error
+            if item is _END:
+                return
+            yield item
+    finally:
+        stopped.set()
+
+
+def _mode_argument(mode: Optional[str]) -> Dict[str, Any]:
+    return {} if mode is None else {"mode": mode}
+
+
+class _SpooledUpload(io.RawIOBase):
+    """
+    Buffers written data in a spooled temporary file (rolled over to disk
+    once it exceeds max_size) and hands it over to upload when closed. The
+    data is discarded instead when the with block it is used in raises.
+    """
+
+    def __init__(self, upload: Callable[[IO[bytes]], None], max_size: int):
+        super().__init__()
+        self._upload = upload
+        self._spool = SpooledTemporaryFile(max_size=max_size)
+        self._aborted = False
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:  # type: ignore
+        return self._spool.write(data)
+
+    def abort(self):
+        """
+        Closes the file without uploading the written data.
+        """
+        self._aborted = True
+        self.close()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.abort()
+        return super().__exit__(exc_type, exc_value, traceback)
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            if not self._aborted:
+                self._spool.seek(0)
+                self._upload(self._spool)  # type: ignore
+        finally:
+            self._spool.close()
+            super().close()
+
+
+class _SpooledTextUpload(io.TextIOWrapper):
+    """
+    Text file over a spooled upload, which discards the data as well when
+    the with block it is used in raises.
+    """
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.buffer.abort()  # type: ignore
+        return super().__exit__(exc_type, exc_value, traceback)
+
+
+class StorageWrapper(Storage):
+    """
+    Base for storages adding behaviour on top of another storage. Every
+    method is delegated to the wrapped storage unless overridden, modes
+    default to the ones of the wrapped storage.
+    """
+
+    def __init__(self, storage: Storage):
+        self._storage = storage
+
+    def read(self, name: str, mode: Optional[str] = None) -> AnyStr:
+        return self._storage.read(name, **_mode_argument(mode))  # type: ignore
+
+    def write(self, name: str, content: AnyStr, mode: Optional[str] = None):
+        self._storage.write(name, content, **_mode_argument(mode))
+
+    def open_read(self, name: str, mode: Optional[str] = None) -> IO:
+        return self._storage.open_read(name, **_mode_argument(mode))
+
+    def open_write(self, name: str, mode: Optional[str] = None) -> IO:
+        return self._storage.open_write(name, **_mode_argument(mode))
+
+    def iter_chunks(
+        self,
+        name: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        mode: Optional[str] = None,
+    ) -> Iterator[AnyStr]:
+        return self._storage.iter_chunks(
+            name, chunk_size, **_mode_argument(mode)
+        )
+
+    def write_if_changed(self, name: str, content: AnyStr) -> bool:
+        return self._storage.write_if_changed(name, content)
+
+    def read_range(
+        self, name: str, start: int, end: Optional[int] = None
+    ) -> bytes:
+        return self._storage.read_range(name, start, end)
+
+    def read_parallel(
+        self,
+        name: str,
+        part_size: int = DEFAULT_PART_SIZE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ) -> bytearray:
+        return self._storage.read_parallel(name, part_size, max_concurrency)
+
+    def download_parallel(
+        self,
+        name: str,
+        file: IO[bytes],
+        part_size: int = DEFAULT_PART_SIZE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ):
+        self._storage.download_parallel(name, file, part_size, max_concurrency)
+
+    def delete(self, name: str):
+        self._storage.delete(name)
+
+    def copy(self, source: str, destination: str):
+        self._storage.copy(source, destination)
+
+    def move(self, source: str, destination: str):
+        self._storage.move(source, destination)
+
+    def exists(self, name: str) -> bool:
+        return self._storage.exists(name)
+
+    def size(self, name: str) -> int:
+        return self._storage.size(name)
+
+    def get_created_time(self, name: str) -> datetime:
+        return self._storage.get_created_time(name)
+
+    def get_modified_time(self, name: str) -> datetime:
+        return self._storage.get_modified_time(name)
+
+    def get_access_time(self, name: str) -> datetime:
+        return self._storage.get_access_time(name)
+
+    def stat(self, name: str) -> StorageStat:
+        return self._storage.stat(name)
+
+    def list(
+        self,
+        prefix: str = "",
+        delimiter: Optional[str] = None,
+        prefetch_pages: int = 0,
+    ) -> Iterator[StorageEntry]:
+        return self._storage.list(prefix, delimiter, prefetch_pages)
+
+    def delete_many(
+        self,
+        names: Iterable[str],
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ) -> BatchResult:
+        return self._storage.delete_many(names, max_concurrency)
+
+    def exists_many(
+        self,
+        names: Iterable[str],
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ) -> BatchResult:
+        return self._storage.exists_many(names, max_concurrency)
+
+    def stat_many(
+        self,
+        names: Iterable[str],
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ) -> BatchResult:
+        return self._storage.stat_many(names, max_concurrency)
+
 
 class StorageBuilder(ABC):
     @abstractmethod
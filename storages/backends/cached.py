@@ -0,0 +1,308 @@
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from hashlib import sha256
+from os import makedirs, remove, replace, rmdir, utime
+from os.path import basename, dirname, getsize, join
+from shutil import copyfileobj
+from threading import Lock
+from time import monotonic
+from typing import IO, AnyStr, Iterable, Iterator, NamedTuple, Optional
+from uuid import uuid4
+
+from storages.backends.base import (
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_PART_SIZE,
+    BatchResult,
+    Storage,
+    StorageWrapper,
+)
+from storages.backends.file_system import FileSystemStorage
+from storages.exceptions import ImproperlyConfiguredError
+
+
+class CacheStatistics(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+
+
+class CachedStorage(StorageWrapper):
+    """
+    Keeps local copies of the files read from the wrapped storage in a file
+    system directory, which may be shared by many processes. Copies are
+    validated against the etag (or the modification time) of the remote
+    files and the least recently used ones are evicted once the cache
+    exceeds max_size bytes. Without validation, copies are only invalidated
+    by writes made through this storage.
+
+    The copies and their total size are tracked in memory, least recently
+    used first, and the directory is only rescanned every rescan interval,
+    picking up the copies made and removed by other processes.
+    """
+
+    _TEMPORARY_PREFIX = "."
+    _STALE_TEMPORARY_FILE_AGE = timedelta(hours=1)
+    _RESCAN_INTERVAL = timedelta(minutes=1)
+
+    def __init__(
+        self, storage: Storage, path: str, max_size: int, validate: bool = True
+    ):
+        super().__init__(storage)
+        if max_size <= 0:
+            raise ImproperlyConfiguredError(name="max_size")
+        self._cache = FileSystemStorage(path=path)
+        self._cache_path = path
+        self._max_size = max_size
+        self._validate = validate
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        # Sizes of the copies, least recently used first.
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._size = 0
+        self._scanned: Optional[float] = None
+
+    @property
+    def statistics(self) -> CacheStatistics:
+        """
+        Counters of cache hits, misses and evictions made by this process.
+        """
+        with self._lock:
+            return CacheStatistics(self._hits, self._misses, self._evictions)
+
+    def read(self, name: str, mode: Optional[str] = None) -> AnyStr:
+        with self._open(name) as file:
+            content = file.read()
+        if mode is not None and "b" in mode:
+            return content
+        return content.decode("utf-8")
+
+    def write(self, name: str, content: AnyStr, mode: Optional[str] = None):
+        try:
+            super().write(name, content, mode)
+        finally:
+            self._invalidate(name)
+
+    def write_if_changed(self, name: str, content: AnyStr) -> bool:
+        try:
+            return super().write_if_changed(name, content)
+        finally:
+            self._invalidate(name)
+
+    def open_read(self, name: str, mode: Optional[str] = None) -> IO:
+        return self._open(name, mode or "rb")
+
+    def open_write(self, name: str, mode: Optional[str] = None) -> IO:
+        self._invalidate(name)
+        return super().open_write(name, mode)
+
+    def iter_chunks(
+        self,
+        name: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        mode: Optional[str] = None,
+    ) -> Iterator[AnyStr]:
+        return Storage.iter_chunks(self, name, chunk_size, mode or "rb")
+
+    def read_range(
+        self, name: str, start: int, end: Optional[int] = None
+    ) -> bytes:
+        with self._open(name) as file:
+            file.seek(start)
+            return file.read(-1 if end is None else max(end - start, 0))
+
+    def read_parallel(
+        self,
+        name: str,
+        part_size: int = DEFAULT_PART_SIZE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ) -> bytearray:
+        with self._open(name) as file:
+            return bytearray(file.read())
+
+    def download_parallel(
+        self,
+        name: str,
+        file: IO[bytes],
+        part_size: int = DEFAULT_PART_SIZE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ):
+        with self._open(name) as source:
+            copyfileobj(source, file, DEFAULT_CHUNK_SIZE)
+
+    def delete(self, name: str):
+        try:
+            super().delete(name)
+        finally:
+            self._invalidate(name)
+
+    def copy(self, source: str, destination: str):
+        try:
+            super().copy(source, destination)
+        finally:
+            self._invalidate(destination)
+
+    def move(self, source: str, destination: str):
+        try:
+            super().move(source, destination)
+        finally:
+            self._invalidate(source)
+            self._invalidate(destination)
+
+    def delete_many(
+        self,
+        names: Iterable[str],
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ) -> BatchResult:
+        names = list(names)
+        try:
+            return super().delete_many(names, max_concurrency)
+        finally:
+            for name in names:
+                self._invalidate(name)
+
+    @staticmethod
+    def _digest(value: str) -> str:
+        return sha256(value.encode("utf-8")).hexdigest()
+
+    def _local_path(self, cache_name: str) -> str:
+        return join(self._cache_path, cache_name)
+
+    def _count(self, hits: int = 0, misses: int = 0, evictions: int = 0):
+        with self._lock:
+            self._hits += hits
+            self._misses += misses
+            self._evictions += evictions
+
+    def _open(self, name: str, mode: str = "rb") -> IO:
+        cache_name = self._cached(name)
+        try:
+            return self._cache.open_read(cache_name, mode=mode)
+        except FileNotFoundError:
+            # Evicted by another process in the meantime.
+            return self._storage.open_read(name, mode=mode)
+
+    def _cached(self, name: str) -> str:
+        """
+        Returns the cache name of an up to date copy of the file, fetching
+        the file on a miss. Copies are named after the digests of the file
+        name and of its version, so they are published atomically.
+        """
+        version = ""
+        if self._validate:
+            stat = self._storage.stat(name)
+            version = stat.etag or stat.modified_time.isoformat()
+        directory = self._digest(name)
+        cache_name = f"{directory}/{self._digest(version)}"
+        try:
+            # Marks the copy as recently used, for other processes as well.
+            utime(self._local_path(cache_name))
+        except FileNotFoundError:
+            self._count(misses=1)
+        else:
+            self._touch(cache_name)
+            self._count(hits=1)
+            return cache_name
+        self._fetch(name, cache_name)
+        self._evict()
+        return cache_name
+
+    def _fetch(self, name: str, cache_name: str):
+        directory = dirname(cache_name)
+        makedirs(self._local_path(directory), exist_ok=True)
+        temporary_name = f"{directory}/{self._TEMPORARY_PREFIX}{uuid4().hex}"
+        try:
+            with self._storage.open_read(
+                name, mode="rb"
+            ) as source, self._cache.open_write(
+                temporary_name, mode="xb"
+            ) as target:
+                copyfileobj(source, target, DEFAULT_CHUNK_SIZE)
+            replace(
+                self._local_path(temporary_name),
+                self._local_path(cache_name),
+            )
+        except BaseException:
+            self._remove(temporary_name)
+            raise
+        self._add(cache_name, getsize(self._local_path(cache_name)))
+        for entry in self._cache.list(f"{directory}/"):
+            if entry.name != cache_name and not self._is_temporary(entry.name):
+                self._remove(entry.name)
+
+    def _evict(self):
+        if self._scanned is None or (
+            monotonic() - self._scanned
+            >= self._RESCAN_INTERVAL.total_seconds()
+        ):
+            self._scan()
+        while True:
+            with self._lock:
+                if self._size <= self._max_size or not self._entries:
+                    return
+                cache_name = next(iter(self._entries))
+            if self._remove(cache_name):
+                self._count(evictions=1)
+
+    def _scan(self):
+        """
+        Rebuilds the index of the copies from the cache directory, removing
+        the stale temporary files left behind by crashed processes.
+        """
+        stale_time = datetime.utcnow() - self._STALE_TEMPORARY_FILE_AGE
+        entries = []
+        for entry in self._cache.list():
+            if not self._is_temporary(entry.name):
+                entries.append(entry)
+            elif entry.modified_time < stale_time:  # type: ignore
+                self._remove(entry.name)
+        entries.sort(key=lambda entry: entry.modified_time)  # type: ignore
+        with self._lock:
+            self._entries = OrderedDict(
+                (entry.name, entry.size) for entry in entries
+            )
+            self._size = sum(self._entries.values())
+            self._scanned = monotonic()
+
+    def _touch(self, cache_name: str):
+        with self._lock:
+            if cache_name in self._entries:
+                self._entries.move_to_end(cache_name)
+                return
+        # Fetched by another process since the directory was scanned.
+        try:
+            size = getsize(self._local_path(cache_name))
+        except FileNotFoundError:
+            return
+        self._add(cache_name, size)
+
+    def _add(self, cache_name: str, size: int):
+        with self._lock:
+            self._size += size - self._entries.pop(cache_name, 0)
+            self._entries[cache_name] = size
+
+    def _invalidate(self, name: str):
+        for entry in self._cache.list(f"{self._digest(name)}/"):
+            self._remove(entry.name)
+
+    def _is_temporary(self, cache_name: str) -> bool:
+        return basename(cache_name).startswith(self._TEMPORARY_PREFIX)
+
+    def _remove(self, cache_name: str) -> bool:
+        """
+        Removes the copy, along with its directory once empty. Copies may
+        be removed by other processes at any time.
+        """
+        with self._lock:
+            self._size -= self._entries.pop(cache_name, 0)
+        try:
+            remove(self._local_path(cache_name))
+        except FileNotFoundError:
+            return False
+        try:
+            rmdir(self._local_path(dirname(cache_name)))
+        except OSError:
+            pass
+        return True
@@ -0,0 +1,596 @@
+import gzip
+import io
+import struct
+from abc import ABC, abstractmethod
+from fnmatch import fnmatchcase
+from shutil import copyfileobj
+from typing import (
+    IO,
+    Any,
+    AnyStr,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
+
+from storages.backends.base import (
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_PART_SIZE,
+    Storage,
+    StorageStat,
+    StorageWrapper,
+    _mode_argument,
+)
+from storages.exceptions import ImproperlyConfiguredError
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None  # type: ignore
+
+try:
+    import lz4.frame
+except ImportError:  # pragma: no cover
+    lz4 = None  # type: ignore
+
+
+class Codec(ABC):
+    """
+    A compression format, recognized by the magic number its streams start
+    with. Streams written by CompressedStorage end with a trailer recording
+    their uncompressed size, which decompressors skip: a skippable frame
+    unless overridden.
+    """
+
+    name: str
+    magic: bytes
+    _SIZE_TRAILER_PREFIX = struct.pack("<II", 0x184D2A50, 12) + b"SIZE"
+    _SIZE_TRAILER_SUFFIX = b""
+
+    @abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        pass  # pragma: no cover
+
+    @abstractmethod
+    def open_compressing(self, file: IO[bytes]) -> IO[bytes]:
+        """
+        Returns a file compressing the data written to the given file, which
+        is left open once the returned file gets closed.
+        """
+        pass  # pragma: no cover
+
+    @abstractmethod
+    def open_decompressing(self, file: IO[bytes]) -> IO[bytes]:
+        """
+        Returns a file decompressing the data read from the given file,
+        which is left open once the returned file gets closed.
+        """
+        pass  # pragma: no cover
+
+    @property
+    def size_trailer_length(self) -> int:
+        return (
+            len(self._SIZE_TRAILER_PREFIX) + 8 + len(self._SIZE_TRAILER_SUFFIX)
+        )
+
+    def size_trailer(self, size: int) -> bytes:
+        """
+        Returns the trailer recording the given uncompressed size.
+        """
+        return (
+            self._SIZE_TRAILER_PREFIX
+            + size.to_bytes(8, "little")
+            + self._SIZE_TRAILER_SUFFIX
+        )
+
+    def recorded_size(self, trailer: bytes) -> Optional[int]:
+        """
+        Returns the uncompressed size recorded by the trailer read from the
+        end of a stream, or None if the stream does not end with one.
+        """
+        if (
+            len(trailer) != self.size_trailer_length
+            or not trailer.startswith(self._SIZE_TRAILER_PREFIX)
+            or not trailer.endswith(self._SIZE_TRAILER_SUFFIX)
+        ):
+            return None
+        start = len(self._SIZE_TRAILER_PREFIX)
+        return int.from_bytes(trailer[start:][:8], "little")
+
+    def uncompressed_size(
+        self, storage: Storage, name: str, size: int
+    ) -> Optional[int]:
+        """
+        Returns the uncompressed size of the file of the given (compressed)
+        size without a size trailer, if recorded in the compressed stream.
+        """
+        return None
+
+
+class GzipCodec(Codec):
+    name = "gzip"
+    magic = b"\x1f\x8b"
+    # An empty member holding the size in an extra field of its header.
+    _SIZE_TRAILER_PREFIX = (
+        b"\x1f\x8b\x08\x04\x00\x00\x00\x00\x00\xff"
+        + struct.pack("<H", 12)
+        + b"SZ"
+        + struct.pack("<H", 8)
+    )
+    _SIZE_TRAILER_SUFFIX = b"\x03\x00" + bytes(8)
+    _ISIZE_LENGTH = 4
+    _MAX_RECORDED_SIZE = 2**32
+    _MAX_RATIO = 1032
+
+    def __init__(self, level: int = 6):
+        self._level = level
+
+    def compress(self, data: bytes) -> bytes:
+        return gzip.compress(data, compresslevel=self._level, mtime=0)
+
+    def open_compressing(self, file: IO[bytes]) -> IO[bytes]:
+        return gzip.GzipFile(  # type: ignore
+            fileobj=file, mode="wb", compresslevel=self._level, mtime=0
+        )
+
+    def open_decompressing(self, file: IO[bytes]) -> IO[bytes]:
+        return gzip.GzipFile(fileobj=file, mode="rb")  # type: ignore
+
+    def uncompressed_size(
+        self, storage: Storage, name: str, size: int
+    ) -> Optional[int]:
+        # The trailer records the size modulo 4 GiB, which is exact for the
+        # files too small to decompress to more than that, deflate
+        # compressing at most 1032:1.
+        if size >= self._MAX_RECORDED_SIZE // self._MAX_RATIO:
+            return None
+        trailer = storage.read_range(name, size - self._ISIZE_LENGTH)
+        return int.from_bytes(trailer, "little")
+
+
+class ZstdCodec(Codec):
+    name = "zstd"
+    magic = b"\x28\xb5\x2f\xfd"
+    _MAX_FRAME_HEADER_SIZE = 18
+
+    def __init__(self, level: int = 3):
+        if zstandard is None:
+            raise ImproperlyConfiguredError(name=self.name)
+        self._level = level
+
+    # Compressors and decompressors are not thread-safe, so they are created
+    # for every call.
+    def compress(self, data: bytes) -> bytes:
+        return zstandard.ZstdCompressor(level=self._level).compress(data)
+
+    def open_compressing(self, file: IO[bytes]) -> IO[bytes]:
+        return zstandard.ZstdCompressor(level=self._level).stream_writer(
+            file, closefd=False
+        )
+
+    def open_decompressing(self, file: IO[bytes]) -> IO[bytes]:
+        return zstandard.ZstdDecompressor().stream_reader(
+            file, read_across_frames=True, closefd=False
+        )
+
+    def uncompressed_size(
+        self, storage: Storage, name: str, size: int
+    ) -> Optional[int]:
+        header = storage.read_range(name, 0, self._MAX_FRAME_HEADER_SIZE)
+        content_size = zstandard.frame_content_size(header)
+        return None if content_size < 0 else content_size
+
+
+class Lz4Codec(Codec):
+    name = "lz4"
+    magic = b"\x04\x22\x4d\x18"
+    _MAX_FRAME_HEADER_SIZE = 19
+
+    def __init__(self, level: int = 0):
+        if lz4 is None:
+            raise ImproperlyConfiguredError(name=self.name)
+        self._level = level
+
+    def compress(self, data: bytes) -> bytes:
+        return lz4.frame.compress(
+            data, compression_level=self._level, store_size=True
+        )
+
+    def open_compressing(self, file: IO[bytes]) -> IO[bytes]:
+        return lz4.frame.LZ4FrameFile(  # type: ignore
+            file, mode="wb", compression_level=self._level
+        )
+
+    def open_decompressing(self, file: IO[bytes]) -> IO[bytes]:
+        return lz4.frame.LZ4FrameFile(file, mode="rb")  # type: ignore
+
+    def uncompressed_size(
+        self, storage: Storage, name: str, size: int
+    ) -> Optional[int]:
+        header = storage.read_range(name, 0, self._MAX_FRAME_HEADER_SIZE)
+        content_size = lz4.frame.get_frame_info(header)["content_size"]
+        return content_size or None
+
+
+CODECS: Dict[str, Type[Codec]] = {
+    codec.name: codec for codec in (GzipCodec, ZstdCodec, Lz4Codec)
+}
+
+
+class _StackedFile:
+    """
+    A file stacked on top of another one, closing both.
+    """
+
+    def __init__(self, file: IO, wrapped: IO):
+        self._file = file
+        self._wrapped = wrapped
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._file, name)
+
+    def __iter__(self):
+        return iter(self._file)
+
+    def __enter__(self) -> "_StackedFile":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        try:
+            self._file.close()
+        finally:
+            self._wrapped.close()
+
+
+class _CompressingWriter(io.RawIOBase):
+    """
+    Compresses the data written to the file of the wrapped storage, which
+    already holds data of the given uncompressed size, and ends the stream
+    with its size trailer once closed. When the with block it is used in
+    raises, the error is passed on to the file of the wrapped storage
+    instead, so it may discard the data written.
+    """
+
+    def __init__(self, codec: Codec, file: IO[bytes], size: int):
+        super().__init__()
+        self._codec = codec
+        self._file = file
+        self._writer = codec.open_compressing(file)
+        self._size = size
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:  # type: ignore
+        self._writer.write(data)
+        size = memoryview(data).nbytes
+        self._size += size
+        return size
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None or self.closed:
+            return super().__exit__(exc_type, exc_value, traceback)
+        try:
+            self._writer.close()
+        finally:
+            super().close()
+            self._file.__exit__(exc_type, exc_value, traceback)
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            self._writer.close()
+            self._file.write(self._codec.size_trailer(self._size))
+        finally:
+            self._file.close()
+            super().close()
+
+
+class _CompressingTextWriter(io.TextIOWrapper):
+    """
+    Text file over a compressing writer, passing the error of the with
+    block it is used in on to the writer as well.
+    """
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.buffer.__exit__(exc_type, exc_value, traceback)
+        return super().__exit__(exc_type, exc_value, traceback)
+
+
+class _PrefixedReader(io.RawIOBase):
+    """
+    Reads the bytes already read from the file, followed by the rest of it.
+    """
+
+    def __init__(self, prefix: bytes, file: IO[bytes]):
+        super().__init__()
+        self._prefix = prefix
+        self._file = file
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:  # type: ignore
+        if self._prefix:
+            size = min(len(buffer), len(self._prefix))
+            buffer[:size] = self._prefix[:size]
+            self._prefix = self._prefix[size:]
+            return size
+        data = self._file.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+
+class CompressedStorage(StorageWrapper):
+    """
+    Compresses the files whose names match the patterns (e.g. "*.json")
+    with the codecs the patterns map to, either codec names ("gzip", "zstd"
+    or "lz4") or Codec instances. Files are stored as plain streams of their
+    codecs, recognized by their magic numbers when read, so files stored
+    uncompressed or with another codec are read as well. Sizes and stats
+    report the uncompressed sizes, listings the stored ones.
+    """
+
+    _MAGIC_SIZE = max(len(codec.magic) for codec in CODECS.values())
+
+    def __init__(
+        self, storage: Storage, codecs: Mapping[str, Union[str, Codec]]
+    ):
+        super().__init__(storage)
+        self._patterns: List[Tuple[str, Codec]] = []
+        for pattern, codec in codecs.items():
+            if isinstance(codec, str):
+                if codec not in CODECS:
+                    raise ImproperlyConfiguredError(name=codec)
+                codec = CODECS[codec]()
+            self._patterns.append((pattern, codec))
+        self._codecs = {codec.name: codec for _, codec in self._patterns}
+        self._size_trailer_length = max(
+            (codec.size_trailer_length for codec in self._codecs.values()),
+            default=0,
+        )
+
+    def read(self, name: str, mode: Optional[str] = None) -> AnyStr:
+        if self._codec(name) is None:
+            return super().read(name, mode)  # type: ignore
+        with self.open_read(name, mode=mode or "r") as file:
+            return file.read()  # type: ignore
+
+    def write(self, name: str, content: AnyStr, mode: Optional[str] = None):
+        codec = self._codec(name)
+        if codec is None:
+            super().write(name, content, mode)
+            return
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        size = 0
+        if mode is not None and "a" in mode:
+            codec, size = self._appended(name, codec)
+            if codec is None:
+                self._storage.write(name, data, mode="ab")
+                return
+        compressed = codec.compress(data) + codec.size_trailer(
+            size + len(data)
+        )
+        binary_mode = self._binary_mode(mode)
+        if binary_mode is None:
+            # The default mode of write is a text one, the one of open_write
+            # its binary counterpart (e.g. exclusive).
+            with self._storage.open_write(name) as file:
+                file.write(compressed)
+            return
+        self._storage.write(name, compressed, mode=binary_mode)
+
+    def write_if_changed(self, name: str, content: AnyStr) -> bool:
+        if self._codec(name) is None:
+            return super().write_if_changed(name, content)
+        # Checksums of the wrapped storage are of the compressed stream,
+        # which depends on the codec settings, so the contents are compared.
+        return Storage.write_if_changed(self, name, content)
+
+    def open_read(self, name: str, mode: Optional[str] = None) -> IO:
+        if self._codec(name) is None:
+            return super().open_read(name, mode)
+        file = self._storage.open_read(name, mode="rb")
+        try:
+            magic = file.read(self._MAGIC_SIZE)
+            codec = self._recognize(magic)
+            reader: IO = io.BufferedReader(
+                _PrefixedReader(magic, file), DEFAULT_CHUNK_SIZE
+            )
+            if codec is not None:
+                reader = codec.open_decompressing(reader)
+        except BaseException:
+            file.close()
+            raise
+        if mode is None or "b" not in mode:
+            reader = io.TextIOWrapper(reader, encoding="utf-8")
+        return _StackedFile(reader, file)  # type: ignore
+
+    def open_write(self, name: str, mode: Optional[str] = None) -> IO:
+        codec = self._codec(name)
+        if codec is None:
+            return super().open_write(name, mode)
+        size = 0
+        if mode is not None and "a" in mode:
+            codec, size = self._appended(name, codec)
+            if codec is None:
+                return super().open_write(name, mode)
+        file = self._storage.open_write(
+            name, **_mode_argument(self._binary_mode(mode))
+        )
+        writer: IO = _CompressingWriter(codec, file, size)  # type: ignore
+        if mode is not None and "b" not in mode:
+            writer = _CompressingTextWriter(
+                writer, encoding="utf-8"  # type: ignore
+            )
+        return writer
+
+    def iter_chunks(
+        self,
+        name: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        mode: Optional[str] = None,
+    ) -> Iterator[AnyStr]:
+        if self._codec(name) is None:
+            return super().iter_chunks(name, chunk_size, mode)
+        return Storage.iter_chunks(self, name, chunk_size, mode or "rb")
+
+    def read_range(
+        self, name: str, start: int, end: Optional[int] = None
+    ) -> bytes:
+        if self._codec(name) is None:
+            return super().read_range(name, start, end)
+        # Compressed streams are not seekable, the data before the range is
+        # decompressed and skipped.
+        with self.open_read(name, mode="rb") as file:
+            while start > 0:
+                skipped = len(file.read(min(start, DEFAULT_CHUNK_SIZE)))
+                if not skipped:
+                    return b""
+                start -= skipped
+                if end is not None:
+                    end -= skipped
+            return file.read(-1 if end is None else max(end, 0))
+
+    def read_parallel(
+        self,
+        name: str,
+        part_size: int = DEFAULT_PART_SIZE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ) -> bytearray:
+        if self._codec(name) is None:
+            return super().read_parallel(name, part_size, max_concurrency)
+        with self.open_read(name, mode="rb") as file:
+            return bytearray(file.read())
+
+    def download_parallel(
+        self,
+        name: str,
+        file: IO[bytes],
+        part_size: int = DEFAULT_PART_SIZE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ):
+        if self._codec(name) is None:
+            super().download_parallel(name, file, part_size, max_concurrency)
+            return
+        with self.open_read(name, mode="rb") as source:
+            copyfileobj(source, file, DEFAULT_CHUNK_SIZE)
+
+    def size(self, name: str) -> int:
+        if self._codec(name) is None:
+            return super().size(name)
+        return self._uncompressed_size(name, super().size(name))
+
+    def stat(self, name: str) -> StorageStat:
+        result = super().stat(name)
+        if self._codec(name) is None:
+            return result
+        return result._replace(size=self._uncompressed_size(name, result.size))
+
+    def _codec(self, name: str) -> Optional[Codec]:
+        for pattern, codec in self._patterns:
+            if fnmatchcase(name, pattern):
+                return codec
+        return None
+
+    def _recognize(self, magic: bytes) -> Optional[Codec]:
+        for codec_name, codec_class in CODECS.items():
+            if magic.startswith(codec_class.magic):
+                codec = self._codecs.get(codec_name)
+                return codec if codec is not None else codec_class()
+        return None
+
+    def _appended(
+        self, name: str, codec: Codec
+    ) -> Tuple[Optional[Codec], int]:
+        """
+        Returns the codec and the uncompressed size of the file appended to,
+        or the given codec and no size when it is missing or empty. Files
+        stored uncompressed are appended to uncompressed (no codec).
+        """
+        if not self._storage.exists(name):
+            return codec, 0
+        size = self._storage.size(name)
+        if not size:
+            return codec, 0
+        magic = self._storage.read_range(name, 0, self._MAGIC_SIZE)
+        recognized = self._recognize(magic)
+        if recognized is None:
+            return None, size
+        return recognized, self._recorded_size(name, recognized, size)
+
+    def _uncompressed_size(self, name: str, size: int) -> int:
+        """
+        Returns the uncompressed size of the file of the given stored size,
+        recorded by the trailer read in a single range read from the end of
+        files written by this storage.
+        """
+        if not size:
+            return 0
+        tail = self._storage.read_range(
+            name, max(size - self._size_trailer_length, 0)
+        )
+        for codec in self._codecs.values():
+            length = codec.size_trailer_length
+            uncompressed_size = codec.recorded_size(tail[-length:])
+            if uncompressed_size is not None:
+                return uncompressed_size
+        magic = self._storage.read_range(name, 0, self._MAGIC_SIZE)
+        recognized = self._recognize(magic)
+        if recognized is None:
+            return size
+        return self._recorded_size(name, recognized, size)
+
+    def _recorded_size(self, name: str, codec: Codec, size: int) -> int:
+        uncompressed_size = None
+        if size >= codec.size_trailer_length:
+            trailer = self._storage.read_range(
+                name, size - codec.size_trailer_length
+            )
+            uncompressed_size = codec.recorded_size(trailer)
+        if uncompressed_size is None:
+            # Written elsewhere, without a size trailer.
+            uncompressed_size = codec.uncompressed_size(
+                self._storage, name, size
+            )
+        if uncompressed_size is None:
+            uncompressed_size = self._decompressed_size(name)
+        return uncompressed_size
+
+    def _decompressed_size(self, name: str) -> int:
+        """
+        Returns the uncompressed size of the file counted while
+        decompressing it, for streams not recording it.
+        """
+        size = 0
+        with self.open_read(name, mode="rb") as file:
+            while True:
+                chunk = file.read(DEFAULT_CHUNK_SIZE)
+                if not chunk:
+                    return size
+                size += len(chunk)
+
+    @staticmethod
+    def _binary_mode(mode: Optional[str]) -> Optional[str]:
+        """
+        Returns the binary counterpart of the mode, None (the default mode
+        of the wrapped storage) for None.
+        """
+        if mode is None:
+            return None
+        if "+" in mode:
+            raise NotImplementedError("Compressed files can not be updated.")
+        if "a" in mode:
+            return "ab"
+        return "xb" if "x" in mode else "wb"
@@ -0,0 +1,519 @@
+import hashlib
+import io
+import mimetypes
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from tempfile import SpooledTemporaryFile
+from threading import Lock
+from time import time
+from typing import (
+    IO,
+    AnyStr,
+    Callable,
+    Iterator,
+    Optional,
+    Tuple,
+)
+
+from storages.backends.base import (
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_PART_SIZE,
+    Storage,
+    StorageEntry,
+    StorageStat,
+    StorageWrapper,
+    _SpooledTextUpload,
+)
+from storages.exceptions import (
+    ConcurrentModificationError,
+    ImproperlyConfiguredError,
+)
+
+
+class _HashingSpool(io.RawIOBase):
+    """
+    Buffers written data in a spooled temporary file, hashing it on the
+    way, and hands the file, its digest and size over to commit when closed.
+    Nothing is committed when the with block it is used in raises.
+    """
+
+    def __init__(
+        self,
+        commit: Callable[[IO[bytes], str, int], None],
+        algorithm: str,
+        max_size: int,
+    ):
+        super().__init__()
+        self._commit = commit
+        self._hash = hashlib.new(algorithm)
+        self._size = 0
+        self._spool = SpooledTemporaryFile(max_size=max_size)
+        self._aborted = False
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:  # type: ignore
+        self._hash.update(data)
+        self._size += len(data)
+        return self._spool.write(data)
+
+    def abort(self):
+        """
+        Closes the file without committing the written data.
+        """
+        self._aborted = True
+        self.close()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.abort()
+        return super().__exit__(exc_type, exc_value, traceback)
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            if not self._aborted:
+                self._spool.seek(0)
+                self._commit(
+                    self._spool,  # type: ignore
+                    self._hash.hexdigest(),
+                    self._size,
+                )
+        finally:
+            self._spool.close()
+            super().close()
+
+
+class DeduplicatedStorage(StorageWrapper):
+    """
+    Stores the contents of files once per distinct content, as blobs of the
+    wrapped storage named after the digests of their contents. Names are
+    mapped to digests by an index kept in a SQLite database at index_path,
+    which counts the references to every blob. Contents already stored are
+    not uploaded again, and blobs no longer referenced are deleted by
+    collect_garbage. Only files written through this storage are known.
+    """
+
+    _SPOOL_MAX_SIZE = 8 * 1024 * 1024
+    _GARBAGE_BATCH_SIZE = 1000
+    _SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS names ("
+        "name TEXT PRIMARY KEY, digest TEXT NOT NULL, size INTEGER NOT NULL,"
+        " created_time REAL NOT NULL, modified_time REAL NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS names_digest ON names (digest)",
+        "CREATE TABLE IF NOT EXISTS blobs ("
+        "digest TEXT PRIMARY KEY, size INTEGER NOT NULL,"
+        " refs INTEGER NOT NULL, complete INTEGER NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS blobs_refs ON blobs (refs)",
+    )
+
+    def __init__(
+        self,
+        storage: Storage,
+        index_path: str,
+        prefix: str = "blobs/",
+        algorithm: str = "sha256",
+        timeout: float = 60.0,
+    ):
+        super().__init__(storage)
+        if algorithm not in hashlib.algorithms_available:
+            raise ImproperlyConfiguredError(name="algorithm")
+        self._prefix = prefix
+        self._algorithm = algorithm
+        # Shared by the threads, the transactions are serialized by the
+        # lock. Processes sharing the index are serialized by SQLite.
+        self._connection = sqlite3.connect(
+            index_path,
+            timeout=timeout,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self._lock = Lock()
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            for statement in self._SCHEMA:
+                self._connection.execute(statement)
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def read(self, name: str, mode: Optional[str] = None) -> AnyStr:
+        return super().read(self._blob(name), mode)  # type: ignore
+
+    def write(self, name: str, content: AnyStr, mode: Optional[str] = None):
+        self._check_mode(name, mode)
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        digest = hashlib.new(self._algorithm, data).hexdigest()
+        self._commit(
+            name,
+            digest,
+            len(data),
+            lambda blob: self._storage.write(blob, data, mode="wb"),
+        )
+
+    def write_if_changed(self, name: str, content: AnyStr) -> bool:
+        """
+        Writes the content unless the name is mapped to its digest already,
+        compared in the index without reading the blob. The name is mapped
+        on the condition that it is still mapped to the digest compared.
+        """
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        digest = hashlib.new(self._algorithm, data).hexdigest()
+        with self._transaction(immediate=False) as cursor:
+            mapped_digest = self._mapped_digest(cursor, name)
+        if mapped_digest == digest:
+            return False
+        self._commit(
+            name,
+            digest,
+            len(data),
+            lambda blob: self._storage.write(blob, data, mode="wb"),
+            conditional=True,
+            expected_digest=mapped_digest,
+        )
+        return True
+
+    def open_read(self, name: str, mode: Optional[str] = None) -> IO:
+        return super().open_read(self._blob(name), mode)
+
+    def open_write(self, name: str, mode: Optional[str] = None) -> IO:
+        self._check_mode(name, mode)
+        spool = _HashingSpool(
+            commit=lambda file, digest, size: self._commit(
+                name, digest, size, lambda blob: self._upload(blob, file)
+            ),
+            algorithm=self._algorithm,
+            max_size=self._SPOOL_MAX_SIZE,
+        )
+        if mode is not None and "b" not in mode:
+            return _SpooledTextUpload(spool, encoding="utf-8")  # type: ignore
+        return spool  # type: ignore
+
+    def iter_chunks(
+        self,
+        name: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        mode: Optional[str] = None,
+    ) -> Iterator[AnyStr]:
+        return super().iter_chunks(self._blob(name), chunk_size, mode)
+
+    def read_range(
+        self, name: str, start: int, end: Optional[int] = None
+    ) -> bytes:
+        return super().read_range(self._blob(name), start, end)
+
+    def read_parallel(
+        self,
+        name: str,
+        part_size: int = DEFAULT_PART_SIZE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ) -> bytearray:
+        return super().read_parallel(
+            self._blob(name), part_size, max_concurrency
+        )
+
+    def download_parallel(
+        self,
+        name: str,
+        file: IO[bytes],
+        part_size: int = DEFAULT_PART_SIZE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ):
+        super().download_parallel(
+            self._blob(name), file, part_size, max_concurrency
+        )
+
+    def delete(self, name: str):
+        """
+        Deletes the name, the blob is deleted by collect_garbage once no
+        longer referenced.
+        """
+        with self._transaction() as cursor:
+            digest = self._lookup(cursor, name)[0]
+            cursor.execute("DELETE FROM names WHERE name = ?", (name,))
+            self._dereference(cursor, digest)
+
+    def copy(self, source: str, destination: str):
+        """
+        Copies the file within the index, sharing the blob of the source.
+        """
+        now = time()
+        with self._transaction() as cursor:
+            digest, size, _, _ = self._lookup(cursor, source)
+            cursor.execute(
+                "UPDATE blobs SET refs = refs + 1 WHERE digest = ?", (digest,)
+            )
+            self._map(cursor, destination, digest, size, now)
+
+    def move(self, source: str, destination: str):
+        with self._transaction() as cursor:
+            digest, size, created_time, modified_time = self._lookup(
+                cursor, source
+            )
+            cursor.execute("DELETE FROM names WHERE name = ?", (source,))
+            self._map(cursor, destination, digest, size, modified_time)
+            cursor.execute(
+                "UPDATE names SET created_time = ? WHERE name = ?",
+                (created_time, destination),
+            )
+
+    def exists(self, name: str) -> bool:
+        with self._transaction(immediate=False) as cursor:
+            cursor.execute("SELECT 1 FROM names WHERE name = ?", (name,))
+            return cursor.fetchone() is not None
+
+    def size(self, name: str) -> int:
+        return self.stat(name).size
+
+    def get_created_time(self, name: str) -> datetime:
+        return self.stat(name).created_time  # type: ignore
+
+    def get_modified_time(self, name: str) -> datetime:
+        return self.stat(name).modified_time
+
+    def get_access_time(self, name: str) -> datetime:
+        return super().get_access_time(self._blob(name))
+
+    def stat(self, name: str) -> StorageStat:
+        with self._transaction(immediate=False) as cursor:
+            digest, size, created_time, modified_time = self._lookup(
+                cursor, name
+            )
+        return StorageStat(
+            size=size,
+            modified_time=datetime.utcfromtimestamp(modified_time),
+            created_time=datetime.utcfromtimestamp(created_time),
+            etag=digest,
+            content_type=mimetypes.guess_type(name)[0],
+        )
+
+    def list(
+        self,
+        prefix: str = "",
+        delimiter: Optional[str] = None,
+        prefetch_pages: int = 0,
+    ) -> Iterator[StorageEntry]:
+        with self._transaction(immediate=False) as cursor:
+            # The range of the names starting with the prefix.
+            cursor.execute(
+                "SELECT name, digest, size, modified_time FROM names"
+                " WHERE name >= ? AND name < ? ORDER BY name",
+                (prefix, f"{prefix}\U0010ffff"),
+            )
+            rows = cursor.fetchall()
+        common_prefixes = set()
+        for name, digest, size, modified_time in rows:
+            if delimiter:
+                position = name.find(delimiter, len(prefix))
+                if position >= 0:
+                    common_prefixes.add(name[: position + len(delimiter)])
+                    continue
+            yield StorageEntry(
+                name=name,
+                size=size,
+                modified_time=datetime.utcfromtimestamp(modified_time),
+                etag=digest,
+                is_prefix=False,
+            )
+        for common_prefix in sorted(common_prefixes):
+            yield StorageEntry(
+                name=common_prefix,
+                size=None,
+                modified_time=None,
+                etag=None,
+                is_prefix=True,
+            )
+
+    def collect_garbage(
+        self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+    ) -> int:
+        """
+        Deletes the blobs no longer referenced by any name and returns their
+        number. Blobs are deleted in batches, each locking the index, so a
+        blob is never deleted while referenced again.
+        """
+        deleted_count = 0
+        last_digest = ""
+        while True:
+            with self._transaction() as cursor:
+                cursor.execute(
+                    "SELECT digest FROM blobs WHERE refs <= 0 AND digest > ?"
+                    " ORDER BY digest LIMIT ?",
+                    (last_digest, self._GARBAGE_BATCH_SIZE),
+                )
+                digests = [digest for digest, in cursor.fetchall()]
+                if not digests:
+                    return deleted_count
+                last_digest = digests[-1]
+                result = self._storage.delete_many(
+                    [self._blob_name(digest) for digest in digests],
+                    max_concurrency,
+                )
+                # Blobs of failed uploads may be missing.
+                deleted = [
+                    (digest,)
+                    for digest in digests
+                    if self._blob_name(digest) in result.results
+                    or isinstance(
+                        result.errors.get(self._blob_name(digest)),
+                        FileNotFoundError,
+                    )
+                ]
+                cursor.executemany(
+                    "DELETE FROM blobs WHERE digest = ?", deleted
+                )
+            deleted_count += len(deleted)
+
+    def _commit(
+        self,
+        name: str,
+        digest: str,
+        size: int,
+        upload: Callable[[str], None],
+        conditional: bool = False,
+        expected_digest: Optional[str] = None,
+    ):
+        """
+        References the blob of the digest, uploading it unless already
+        stored, and maps the name to it. When conditional, the name is mapped
+        only if it is mapped to the expected digest (or not mapped at all for
+        None), raising ConcurrentModificationError otherwise.
+        """
+        with self._transaction() as cursor:
+            cursor.execute(
+                "UPDATE blobs SET refs = refs + 1 WHERE digest = ?", (digest,)
+            )
+            if cursor.rowcount == 0:
+                cursor.execute(
+                    "INSERT INTO blobs (digest, size, refs, complete)"
+                    " VALUES (?, ?, 1, 0)",
+                    (digest, size),
+                )
+            cursor.execute(
+                "SELECT complete FROM blobs WHERE digest = ?", (digest,)
+            )
+            complete = cursor.fetchone()[0]
+        try:
+            if not complete:
+                upload(self._blob_name(digest))
+                with self._transaction() as cursor:
+                    cursor.execute(
+                        "UPDATE blobs SET complete = 1 WHERE digest = ?",
+                        (digest,),
+                    )
+        except BaseException:
+            with self._transaction() as cursor:
+                self._dereference(cursor, digest)
+            raise
+        now = time()
+        with self._transaction() as cursor:
+            changed = (
+                conditional
+                and self._mapped_digest(cursor, name) != expected_digest
+            )
+            if changed:
+                self._dereference(cursor, digest)
+            else:
+                self._map(cursor, name, digest, size, now)
+        if changed:
+            raise ConcurrentModificationError(name=name)
+
+    def _map(
+        self,
+        cursor: sqlite3.Cursor,
+        name: str,
+        digest: str,
+        size: int,
+        modified_time: float,
+    ):
+        """
+        Maps the name to the referenced blob, releasing the blob it was
+        mapped to.
+        """
+        cursor.execute(
+            "SELECT digest, created_time FROM names WHERE name = ?", (name,)
+        )
+        row = cursor.fetchone()
+        created_time = modified_time
+        if row is not None:
+            self._dereference(cursor, row[0])
+            created_time = row[1]
+        cursor.execute(
+            "INSERT OR REPLACE INTO names"
+            " (name, digest, size, created_time, modified_time)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (name, digest, size, created_time, modified_time),
+        )
+
+    @staticmethod
+    def _dereference(cursor: sqlite3.Cursor, digest: str):
+        cursor.execute(
+            "UPDATE blobs SET refs = refs - 1 WHERE digest = ?", (digest,)
+        )
+
+    @staticmethod
+    def _lookup(
+        cursor: sqlite3.Cursor, name: str
+    ) -> Tuple[str, int, float, float]:
+        cursor.execute(
+            "SELECT digest, size, created_time, modified_time FROM names"
+            " WHERE name = ?",
+            (name,),
+        )
+        row = cursor.fetchone()
+        if row is None:
+            raise FileNotFoundError(f"File {name} does not exist.")
+        return row
+
+    @staticmethod
+    def _mapped_digest(cursor: sqlite3.Cursor, name: str) -> Optional[str]:
+        cursor.execute("SELECT digest FROM names WHERE name = ?", (name,))
+        row = cursor.fetchone()
+        return None if row is None else row[0]
+
+    def _blob(self, name: str) -> str:
+        with self._transaction(immediate=False) as cursor:
+            return self._blob_name(self._lookup(cursor, name)[0])
+
+    def _blob_name(self, digest: str) -> str:
+        return f"{self._prefix}{digest[:2]}/{digest}"
+
+    def _upload(self, blob: str, file: IO[bytes]):
+        with self._storage.open_write(blob, mode="wb") as target:
+            while True:
+                chunk = file.read(DEFAULT_CHUNK_SIZE)
+                if not chunk:
+                    break
+                target.write(chunk)
+
+    def _check_mode(self, name: str, mode: Optional[str]):
+        if mode is not None and ("a" in mode or "+" in mode):
+            raise NotImplementedError(
+                "Deduplicated files can not be appended to nor updated."
+            )
+        if mode is not None and "x" in mode and self.exists(name):
+            raise FileExistsError(f"File {name} already exists.")
+
+    @contextmanager
+    def _transaction(self, immediate: bool = True) -> Iterator[sqlite3.Cursor]:
+        """
+        Runs a transaction of the index, committed unless an error is
+        raised. Immediate transactions lock the index for writing up front.
+        """
+        with self._lock:
+            cursor = self._connection.cursor()
+            try:
+                cursor.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+                try:
+                    yield cursor
+                except BaseException:
+                    cursor.execute("ROLLBACK")
+                    raise
+                cursor.execute("COMMIT")
+            finally:
+                cursor.close()
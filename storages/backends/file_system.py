@@ -1,17 +1,179 @@
+import errno
+import io
+import mimetypes
+import os
 from datetime import datetime
-from os import remove
-from os.path import getatime, getctime, getmtime, getsize, join, lexists
-from typing import AnyStr, Union
+from itertools import islice
+from locale import getpreferredencoding
+from mmap import ACCESS_READ, mmap
+from os import (
+    fstat,
+    fsync,
+    link,
+    lseek,
+    makedirs,
+    remove,
+    replace,
+    scandir,
+    stat,
+    stat_result,
+)
+from os.path import (
+    basename,
+    dirname,
+    getatime,
+    getctime,
+    getmtime,
+    getsize,
+    join,
+    lexists,
+)
+from shutil import copyfileobj
+from stat import S_ISREG
+from typing import IO, AnyStr, Iterator, Optional, Union
+from uuid import uuid4
 
-from storages.backends.base import Storage
-from storages.exceptions import ImproperlyConfiguredError
+from storages.backends.base import (
+    DEFAULT_CHUNK_SIZE,
+    ByteSize,
+    Storage,
+    StorageEntry,
+    StorageStat,
+)
+from storages.exceptions import (
+    ConcurrentModificationError,
+    ImproperlyConfiguredError,
+)
+
+FSYNC_NONE = "none"
+FSYNC_FILE = "file"
+FSYNC_FILE_AND_DIRECTORY = "file+dir"
+
+
+class _DurableFile(io.FileIO):
+    """
+    Syncs the file to disk when closed, according to the fsync policy. Given
+    a target, the file is written under a temporary name and moved in place
+    of the target once closed, so readers never see it partially written.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        mode: str,
+        fsync_policy: str,
+        target: Optional[str] = None,
+        exclusive: bool = False,
+    ):
+        super().__init__(path, mode.replace("t", ""))
+        self._fsync_policy = fsync_policy
+        self._target = target
+        self._exclusive = exclusive
+        self._aborted = False
+
+    def abort(self):
+        """
+        Discards the temporary file once closed, leaving the target as it
+        was. Files written in place are kept as they were written.
+        """
+        self._aborted = True
+
+    def close(self):
+        if self.closed:
+            return
+        if self._aborted and self._target is not None:
+            try:
+                super().close()
+            finally:
+                remove(self.name)
+            return
+        published = False
+        try:
+            try:
+                if self._fsync_policy != FSYNC_NONE:
+                    fsync(self.fileno())
+            finally:
+                super().close()
+            if self._target is not None:
+                self._publish(self._target)
+            published = True
+        finally:
+            if not published and self._target is not None:
+                remove(self.name)
+        if self._fsync_policy == FSYNC_FILE_AND_DIRECTORY:
+            self._sync_directory(dirname(self._target or self.name))
+
+    def _publish(self, target: str):
+        if not self._exclusive:
+            replace(self.name, target)
+            return
+        # Linking fails if the target exists, unlike replacing.
+        link(self.name, target)
+        remove(self.name)
+
+    @staticmethod
+    def _sync_directory(path: str):
+        descriptor = os.open(path or ".", os.O_RDONLY)
+        try:
+            fsync(descriptor)
+        finally:
+            os.close(descriptor)
+
+
+class _DurableWriter(io.BufferedWriter):
+    """
+    Aborts the durable file when the with block it is used in raises, so
+    the target is never replaced with a partially written file.
+    """
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.raw.abort()  # type: ignore
+        return super().__exit__(exc_type, exc_value, traceback)
+
+
+class _DurableTextWriter(io.TextIOWrapper):
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.buffer.raw.abort()  # type: ignore
+        return super().__exit__(exc_type, exc_value, traceback)
 
 
 class FileSystemStorage(Storage):
-    def __init__(self, path: str):
+    _DELIMITER = "/"
+    _LIST_PAGE_SIZE = 1000
+    # Errors raised by the kernel copy calls when they do not support the
+    # given pair of file descriptors.
+    _UNSUPPORTED_COPY_ERRORS = (
+        errno.EINVAL,
+        errno.ENOSYS,
+        errno.EXDEV,
+        errno.EBADF,
+        errno.ENOTSUP,
+    )
+
+    _FSYNC_POLICIES = (FSYNC_NONE, FSYNC_FILE, FSYNC_FILE_AND_DIRECTORY)
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        atomic_writes: bool = False,
+        fsync: str = FSYNC_NONE,
+        make_directories: bool = False,
+        write_buffer_size: ByteSize = ByteSize(io.DEFAULT_BUFFER_SIZE),
+    ):
         if not path:
             raise ImproperlyConfiguredError(name="path")
+        if fsync not in self._FSYNC_POLICIES:
+            raise ImproperlyConfiguredError(name="fsync")
+        if write_buffer_size < 1:
+            raise ImproperlyConfiguredError(name="write_buffer_size")
         self._base_path = path
+        self._atomic_writes = atomic_writes
+        self._fsync_policy = fsync
+        self._make_directories = make_directories
+        self._write_buffer_size = write_buffer_size
 
     def _path(self, name: str) -> str:
         return join(self._base_path, name)
@@ -20,17 +182,235 @@ class FileSystemStorage(Storage):
     def _date_from_timestamp(ts: Union[int, float]) -> datetime:
         return datetime.utcfromtimestamp(ts)
 
+    @staticmethod
+    def _etag(result: stat_result) -> str:
+        return f"{result.st_mtime_ns:x}-{result.st_size:x}"
+
     def read(self, name: str, mode: str = "r") -> AnyStr:
         with open(file=self._path(name), mode=mode) as file:
             return file.read()
 
     def write(self, name: str, content: AnyStr, mode: str = "x"):
-        with open(file=self._path(name), mode=mode) as file:
+        if "a" in mode and "+" not in mode:
+            self._append(name, content)
+            return
+        with self._open_write(name, mode) as file:
             file.write(content)
 
+    def _append(self, name: str, content: AnyStr):
+        """
+        Appends the content with a single write to the file opened with
+        O_APPEND, unbuffered, so the contents appended by concurrent writers
+        (even in other processes) never interleave.
+        """
+        data = self._encode(content)
+        path = self._path(name)
+        if self._make_directories:
+            makedirs(dirname(path), exist_ok=True)
+        descriptor = os.open(
+            path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o666
+        )
+        try:
+            view = memoryview(data)
+            while view:
+                written = os.write(descriptor, view)
+                view = view[written:]
+            if self._fsync_policy != FSYNC_NONE:
+                fsync(descriptor)
+        finally:
+            os.close(descriptor)
+        if self._fsync_policy == FSYNC_FILE_AND_DIRECTORY:
+            _DurableFile._sync_directory(dirname(path))
+
+    @staticmethod
+    def _encode(content: AnyStr) -> bytes:
+        # The encoding files opened in text mode are read and written with.
+        if isinstance(content, str):
+            return content.encode(getpreferredencoding(False))
+        return content  # type: ignore
+
+    def write_if_changed(self, name: str, content: AnyStr) -> bool:
+        """
+        Writes the content unless the file already holds it, compared only
+        when the sizes match. A missing file is created exclusively, an
+        existing one is replaced unless its size or modification time
+        changed since compared. File systems have no conditional replace,
+        so they are checked right before the file is written.
+        """
+        data = self._encode(content)
+        path = self._path(name)
+        try:
+            result: Optional[stat_result] = stat(path)
+        except FileNotFoundError:
+            result = None
+        if result is not None and result.st_size == len(data):
+            with self.read_buffer(name) as buffer:
+                if buffer == data:
+                    return False
+        if result is None:
+            try:
+                self.write(name, data, mode="xb")
+            except FileExistsError as cause:
+                raise ConcurrentModificationError(name=name) from cause
+            return True
+        try:
+            current = stat(path)
+        except FileNotFoundError as cause:
+            raise ConcurrentModificationError(name=name) from cause
+        if self._etag(current) != self._etag(result):
+            raise ConcurrentModificationError(name=name)
+        self.write(name, data, mode="wb")
+        return True
+
+    def open_read(self, name: str, mode: str = "rb") -> IO:
+        return open(file=self._path(name), mode=mode)
+
+    def open_write(self, name: str, mode: str = "xb") -> IO:
+        return self._open_write(name, mode)
+
+    def _open_write(self, name: str, mode: str) -> IO:
+        """
+        Opens the file for writing according to the write settings of the
+        storage. Appending and updating writes are never atomic, as they
+        build on the current contents of the file.
+        """
+        path = self._path(name)
+        if self._make_directories:
+            makedirs(dirname(path), exist_ok=True)
+        atomic = self._atomic_writes and "a" not in mode and "+" not in mode
+        if not atomic and self._fsync_policy == FSYNC_NONE:
+            return open(
+                file=path, mode=mode, buffering=self._write_buffer_size
+            )
+        if atomic:
+            exclusive = "x" in mode
+            if exclusive and lexists(path):
+                # Fails early, linking the file in place fails anyway.
+                raise FileExistsError(
+                    errno.EEXIST, os.strerror(errno.EEXIST), path
+                )
+            temporary_path = join(
+                dirname(path), f".{basename(path)}.{uuid4().hex}.tmp"
+            )
+            raw = _DurableFile(
+                temporary_path,
+                "xb",
+                self._fsync_policy,
+                target=path,
+                exclusive=exclusive,
+            )
+        else:
+            raw = _DurableFile(path, mode, self._fsync_policy)
+        if "+" in mode:
+            file: IO = io.BufferedRandom(raw, self._write_buffer_size)
+        else:
+            file = _DurableWriter(raw, self._write_buffer_size)
+        if "b" in mode:
+            return file
+        return _DurableTextWriter(file)  # type: ignore
+
+    def read_range(
+        self, name: str, start: int, end: Optional[int] = None
+    ) -> bytes:
+        with open(file=self._path(name), mode="rb") as file:
+            file.seek(start)
+            return file.read(-1 if end is None else max(end - start, 0))
+
+    def read_buffer(self, name: str) -> memoryview:
+        """
+        Returns a read-only view of the file specified by name, memory mapped
+        instead of copied into memory. The file stays mapped until the view
+        is released.
+        """
+        with open(file=self._path(name), mode="rb") as file:
+            if fstat(file.fileno()).st_size == 0:
+                # Empty files cannot be mapped.
+                return memoryview(b"")
+            return memoryview(mmap(file.fileno(), 0, access=ACCESS_READ))
+
+    def copy_to(self, name: str, file: IO[bytes]) -> int:
+        """
+        Copies the file specified by name to the given file object, which may
+        wrap a socket, and returns the number of bytes copied. The copy is
+        made by the kernel (using copy_file_range or sendfile) whenever the
+        platform supports it for the given file object.
+        """
+        with open(file=self._path(name), mode="rb") as source:
+            try:
+                target = file.fileno()
+            except (AttributeError, io.UnsupportedOperation):
+                target = None
+            if target is not None:
+                file.flush()
+                copied = self._copy_file_descriptor(source.fileno(), target)
+                if copied is not None:
+                    if file.seekable():
+                        # Synchronizes the position of buffered file objects.
+                        file.seek(lseek(target, 0, os.SEEK_CUR))
+                    return copied
+            copied = fstat(source.fileno()).st_size
+            copyfileobj(source, file, DEFAULT_CHUNK_SIZE)
+            return copied
+
+    @classmethod
+    def _copy_file_descriptor(cls, source: int, target: int) -> Optional[int]:
+        """
+        Returns the number of bytes copied, or None if the kernel is not able
+        to copy between the descriptors.
+        """
+        size = fstat(source).st_size
+        copy_functions = []
+        if hasattr(os, "copy_file_range") and S_ISREG(fstat(target).st_mode):
+            copy_functions.append(
+                lambda offset: os.copy_file_range(
+                    source, target, size - offset, offset
+                )
+            )
+        if hasattr(os, "sendfile"):
+            copy_functions.append(
+                lambda offset: os.sendfile(
+                    target, source, offset, size - offset
+                )
+            )
+        for copy_function in copy_functions:
+            offset = 0
+            try:
+                while offset < size:
+                    copied = copy_function(offset)
+                    if copied == 0:
+                        break
+                    offset += copied
+            except OSError as error:
+                if offset or error.errno not in cls._UNSUPPORTED_COPY_ERRORS:
+                    raise
+                continue
+            return offset
+        return None
+
     def delete(self, name: str):
         remove(self._path(name))
 
+    def copy(self, source: str, destination: str):
+        # Copied within the kernel, sharing blocks on file systems which
+        # support it, rather than hard linked, so the copies never change
+        # together. The source is checked first, so a missing one does not
+        # leave an empty destination file behind.
+        stat(self._path(source))
+        with self._open_write(destination, "wb") as file:
+            self.copy_to(source, file)
+
+    def move(self, source: str, destination: str):
+        path = self._path(destination)
+        if self._make_directories:
+            makedirs(dirname(path), exist_ok=True)
+        try:
+            replace(self._path(source), path)
+        except OSError as error:
+            # Raised when the files are on different file systems.
+            if error.errno != errno.EXDEV:
+                raise
+            super().move(source, destination)
+
     def exists(self, name: str) -> bool:
         return lexists(self._path(name))
 
@@ -45,3 +425,68 @@ class FileSystemStorage(Storage):
 
     def get_access_time(self, name: str) -> datetime:
         return self._date_from_timestamp(getatime(self._path(name)))
+
+    def stat(self, name: str) -> StorageStat:
+        result = stat(self._path(name))
+        return StorageStat(
+            size=result.st_size,
+            modified_time=self._date_from_timestamp(result.st_mtime),
+            created_time=self._date_from_timestamp(result.st_ctime),
+            etag=self._etag(result),
+            content_type=mimetypes.guess_type(name)[0],
+        )
+
+    def list(
+        self,
+        prefix: str = "",
+        delimiter: Optional[str] = None,
+        prefetch_pages: int = 0,
+    ) -> Iterator[StorageEntry]:
+        if delimiter not in (None, self._DELIMITER):
+            raise NotImplementedError(
+                f"File system storage supports only the '{self._DELIMITER}' "
+                f"delimiter."
+            )
+        directory = prefix.rpartition(self._DELIMITER)[0]
+        entries = self._scan(directory, prefix, recursive=delimiter is None)
+        pages = iter(lambda: list(islice(entries, self._LIST_PAGE_SIZE)), [])
+        return self._iterate_pages(pages, prefetch_pages)
+
+    def _scan(
+        self, directory: str, prefix: str, recursive: bool
+    ) -> Iterator[StorageEntry]:
+        try:
+            iterator = scandir(self._path(directory))
+        except FileNotFoundError:
+            return
+        with iterator:
+            for entry in iterator:
+                name = (
+                    f"{directory}{self._DELIMITER}{entry.name}"
+                    if directory
+                    else entry.name
+                )
+                if not name.startswith(prefix):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        yield from self._scan(name, prefix, recursive)
+                    else:
+                        yield StorageEntry(
+                            name=f"{name}{self._DELIMITER}",
+                            size=None,
+                            modified_time=None,
+                            etag=None,
+                            is_prefix=True,
+                        )
+                elif entry.is_file():
+                    result = entry.stat()
+                    yield StorageEntry(
+                        name=name,
+                        size=result.st_size,
+                        modified_time=self._date_from_timestamp(
+                            result.st_mtime
+                        ),
+                        etag=self._etag(result),
+                        is_prefix=False,
+                    )
@@ -1,35 +1,158 @@
 import base64
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import AnyStr
+from tempfile import SpooledTemporaryFile
+from typing import IO, Any, AnyStr, Iterable, Iterator, List, Optional
+from uuid import uuid4
 
+import google_crc32c  # type: ignore
+from google.auth.transport.requests import (  # type: ignore
+    AuthorizedSession,
+)
 from google.cloud import exceptions, storage  # type: ignore
+from google.cloud.storage.batch import Batch  # type: ignore
+from google.cloud.storage.retry import (  # type: ignore
+    DEFAULT_RETRY,
+    ConditionalRetryPolicy,
+    is_generation_specified,
+)
+from google.oauth2 import service_account  # type: ignore
+from requests.adapters import HTTPAdapter
 
-from storages.backends.base import Storage
-from storages.exceptions import ImproperlyConfiguredError
+from storages.backends.base import (
+    DEFAULT_MAX_CONCURRENCY,
+    BatchResult,
+    ByteSize,
+    Duration,
+    Storage,
+    StorageEntry,
+    StorageStat,
+    _SpooledTextUpload,
+    _SpooledUpload,
+)
+from storages.exceptions import (
+    ConcurrentModificationError,
+    ImproperlyConfiguredError,
+)
+
+
+class _ResponsesBatch(Batch):
+    """
+    A batch keeping the responses to its requests, in their order, which
+    are only returned by finish, called on leaving the with block.
+    """
+
+    def __init__(self, client: storage.Client):
+        super().__init__(client, raise_exception=False)
+        self.responses: List[Any] = []
+
+    def finish(self, raise_exception: bool = True) -> List[Any]:
+        self.responses = super().finish(raise_exception=raise_exception)
+        return self.responses
 
 
 class GoogleCloudStorage(Storage):
     _SERVICE_NAME = "google_cloud"
+    _CHUNK_SIZE_MULTIPLE = 256 * 1024
+    _MAX_COMPOSE_SOURCES = 32
+    _DELETE_BATCH_SIZE = 100
+    _MAX_COMPONENT_COUNT = 1024
+    _APPEND_ATTEMPTS = 5
 
     def __init__(
         self,
         google_cloud_credentials: str,
         google_cloud_bucket_name: str,
+        *,
+        google_cloud_composite_threshold: ByteSize = ByteSize(
+            32 * 1024 * 1024
+        ),
+        google_cloud_part_size: ByteSize = ByteSize(8 * 1024 * 1024),
+        google_cloud_max_concurrency: int = 10,
+        google_cloud_retry_deadline: Duration = Duration(120.0),
+        google_cloud_retry_initial_delay: Duration = Duration(1.0),
+        google_cloud_retry_max_delay: Duration = Duration(60.0),
+        google_cloud_retry_multiplier: float = 2.0,
+        google_cloud_max_pool_connections: int = 10,
+        google_cloud_connect_timeout: Duration = Duration(60.0),
+        google_cloud_read_timeout: Duration = Duration(60.0),
+        google_cloud_chunk_size: ByteSize = ByteSize(8 * 1024 * 1024),
     ):
         if not google_cloud_credentials:
             raise ImproperlyConfiguredError(name="credentials_path")
         if not google_cloud_bucket_name:
             raise ImproperlyConfiguredError(name="google_cloud_bucket_name")
+        if (
+            google_cloud_part_size <= 0
+            or google_cloud_part_size % self._CHUNK_SIZE_MULTIPLE
+        ):
+            raise ImproperlyConfiguredError(name="google_cloud_part_size")
+        if google_cloud_max_concurrency < 1:
+            raise ImproperlyConfiguredError(
+                name="google_cloud_max_concurrency"
+            )
+        if (
+            google_cloud_chunk_size <= 0
+            or google_cloud_chunk_size % self._CHUNK_SIZE_MULTIPLE
+        ):
+            raise ImproperlyConfiguredError(name="google_cloud_chunk_size")
+        if google_cloud_max_pool_connections < 1:
+            raise ImproperlyConfiguredError(
+                name="google_cloud_max_pool_connections"
+            )
+        if google_cloud_retry_multiplier < 1:
+            raise ImproperlyConfiguredError(
+                name="google_cloud_retry_multiplier"
+            )
 
-        self._client = storage.Client.from_service_account_info(
-            json.loads(base64.b64decode(google_cloud_credentials))
+        info = json.loads(base64.b64decode(google_cloud_credentials))
+        credentials = service_account.Credentials.from_service_account_info(
+            info
+        ).with_scopes(storage.Client.SCOPE)
+        # The default pool of the session keeps 10 connections per host,
+        # requests made by more threads than that open and drop connections.
+        adapter = HTTPAdapter(
+            pool_connections=google_cloud_max_pool_connections,
+            pool_maxsize=google_cloud_max_pool_connections,
+        )
+        session = AuthorizedSession(credentials)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        self._client = storage.Client(
+            project=info.get("project_id"),
+            credentials=credentials,
+            _http=session,
         )
         self._bucket_name = google_cloud_bucket_name
-        self._bucket = self._client.get_bucket(self._bucket_name)
+        # No request is made until the bucket is actually used.
+        self._bucket = self._client.bucket(self._bucket_name)
+        self._composite_threshold = google_cloud_composite_threshold
+        self._part_size = google_cloud_part_size
+        self._max_concurrency = google_cloud_max_concurrency
+        self._chunk_size = google_cloud_chunk_size
+        self._timeout = (
+            google_cloud_connect_timeout,
+            google_cloud_read_timeout,
+        )
+        self._retry = DEFAULT_RETRY.with_deadline(
+            google_cloud_retry_deadline
+        ).with_delay(
+            initial=google_cloud_retry_initial_delay,
+            maximum=google_cloud_retry_max_delay,
+            multiplier=google_cloud_retry_multiplier,
+        )
+        # Uploads, composes and rewrites are only safe to repeat on a
+        # generation precondition, which is how the library retries them
+        # by default.
+        self._conditional_retry = ConditionalRetryPolicy(
+            self._retry, is_generation_specified, ["query_params"]
+        )
 
     def _get_blob(self, name: str) -> storage.Blob:
-        blob = self._bucket.get_blob(name)
+        blob = self._bucket.get_blob(
+            name, timeout=self._timeout, retry=self._retry
+        )
 
         if blob is None:
             raise exceptions.NotFound(f"File {name} does not exist.")
@@ -38,16 +161,283 @@ class GoogleCloudStorage(Storage):
 
     def read(self, name: str, mode: str = "r") -> AnyStr:
         blob = self._bucket.blob(name)
-        return blob.download_as_bytes()
+        return blob.download_as_bytes(timeout=self._timeout, retry=self._retry)
+
+    def write(self, name: str, content: AnyStr, mode: str = "w"):
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        if "a" in mode:
+            self._append(name, data)
+        elif len(data) < self._composite_threshold:
+            self._bucket.blob(name).upload_from_string(
+                data, timeout=self._timeout, retry=self._conditional_retry
+            )
+        else:
+            self._upload_composite(name, data)
+
+    def write_if_changed(self, name: str, content: AnyStr) -> bool:
+        """
+        Uploads the content unless the object already holds it, comparing
+        its CRC32C checksum (which, unlike the MD5 one, composite objects
+        have as well) with the one computed from the content. The upload is
+        conditional on the generation of the object, or on its absence, so
+        writers racing each other are not overwritten.
+        """
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        blob = self._bucket.get_blob(
+            name, timeout=self._timeout, retry=self._retry
+        )
+        if (
+            blob is not None
+            and blob.size == len(data)
+            and blob.crc32c == self._crc32c(data)
+        ):
+            return False
+        # Generation 0 matches only an object which does not exist.
+        generation = 0 if blob is None else blob.generation
+        try:
+            self._upload_conditionally(name, data, generation)
+        except exceptions.PreconditionFailed as cause:
+            raise ConcurrentModificationError(name=name) from cause
+        return True
+
+    def _append(self, name: str, data: bytes):
+        """
+        Appends the data to the object. The data is uploaded as a temporary
+        object and composed onto the end of the object on the server side,
+        so only the appended data is sent. Composite objects are limited in
+        their number of components, so once the limit would be exceeded, the
+        object is compacted: rewritten whole along with the appended data.
+        The object is written on the condition of its generation, and the
+        append retried on the new object when racing another write.
+        """
+        attempt = 0
+        while True:
+            try:
+                self._append_once(name, data)
+                return
+            except ConcurrentModificationError:
+                attempt += 1
+                if attempt >= self._APPEND_ATTEMPTS:
+                    raise
+
+    def _append_once(self, name: str, data: bytes):
+        blob = self._bucket.get_blob(
+            name, timeout=self._timeout, retry=self._retry
+        )
+        try:
+            if blob is None:
+                self._upload_conditionally(name, data, 0)
+            elif not data:
+                return
+            elif (blob.component_count or 1) + self._component_count(
+                data
+            ) > self._MAX_COMPONENT_COUNT:
+                self._compact_appended(blob, data)
+            else:
+                self._compose_appended(blob, data)
+        except exceptions.PreconditionFailed as cause:
+            raise ConcurrentModificationError(name=name) from cause
+
+    def _compact_appended(self, blob: storage.Blob, data: bytes):
+        """
+        Rewrites the object whole along with the appended data, streamed
+        through a spooled temporary file rather than held in memory.
+        """
+        with SpooledTemporaryFile(max_size=self._chunk_size) as file:
+            blob.download_to_file(
+                file,
+                if_generation_match=blob.generation,
+                timeout=self._timeout,
+                retry=self._retry,
+            )
+            file.write(data)
+            size = file.tell()
+            file.seek(0)
+            blob.upload_from_file(
+                file,
+                size=size,
+                if_generation_match=blob.generation,
+                timeout=self._timeout,
+                retry=self._conditional_retry,
+            )
+
+    def _compose_appended(self, blob: storage.Blob, data: bytes):
+        appended = self._bucket.blob(f"{blob.name}.{uuid4().hex}.append")
+        self._upload_conditionally(appended.name, data, 0)
+        try:
+            blob.compose(
+                [blob, appended],
+                if_generation_match=blob.generation,
+                timeout=self._timeout,
+                retry=self._conditional_retry,
+            )
+        finally:
+            self._bucket.delete_blobs(
+                [appended],
+                on_error=lambda blob: None,
+                timeout=self._timeout,
+                retry=self._retry,
+            )
+
+    def _component_count(self, data: bytes) -> int:
+        """
+        Returns the number of components of the object the data is uploaded
+        as.
+        """
+        if len(data) < self._composite_threshold:
+            return 1
+        return -(-len(data) // self._part_size)
+
+    def _upload_conditionally(
+        self, name: str, data: bytes, if_generation_match: int
+    ):
+        if len(data) < self._composite_threshold:
+            self._bucket.blob(name).upload_from_string(
+                data,
+                if_generation_match=if_generation_match,
+                timeout=self._timeout,
+                retry=self._conditional_retry,
+            )
+        else:
+            self._upload_composite(
+                name, data, if_generation_match=if_generation_match
+            )
+
+    @staticmethod
+    def _crc32c(data: bytes) -> str:
+        checksum = google_crc32c.Checksum(data).digest()
+        return base64.b64encode(checksum).decode("ascii")
+
+    def _upload_composite(
+        self,
+        name: str,
+        data: bytes,
+        if_generation_match: Optional[int] = None,
+    ):
+        """
+        Uploads the data as a parallel composite upload: parts are uploaded
+        concurrently as temporary objects, each retried on its own, and then
+        composed into the target object on the server side (on the given
+        generation precondition, if any).
+        """
+        prefix = f"{name}.{uuid4().hex}.part-"
+        temporary_blobs: List[storage.Blob] = []
+
+        def upload_part(index: int) -> storage.Blob:
+            start = index * self._part_size
+            end = start + self._part_size
+            blob = self._bucket.blob(f"{prefix}{index}")
+            temporary_blobs.append(blob)
+            blob.upload_from_string(
+                data[start:end],
+                if_generation_match=0,
+                timeout=self._timeout,
+                retry=self._conditional_retry,
+            )
+            return blob
 
-    def write(self, name: str, content: AnyStr, mode: str = "a"):
-        self._bucket.blob(name).upload_from_string(content)
+        part_count = -(-len(data) // self._part_size)
+        try:
+            with ThreadPoolExecutor(self._max_concurrency) as executor:
+                parts = list(executor.map(upload_part, range(part_count)))
+            while len(parts) > self._MAX_COMPOSE_SOURCES:
+                parts = self._compose_groups(prefix, parts, temporary_blobs)
+            self._bucket.blob(name).compose(
+                parts,
+                if_generation_match=if_generation_match,
+                timeout=self._timeout,
+                retry=self._conditional_retry,
+            )
+        finally:
+            self._bucket.delete_blobs(
+                temporary_blobs,
+                on_error=lambda blob: None,
+                timeout=self._timeout,
+                retry=self._retry,
+            )
+
+    def _compose_groups(
+        self,
+        prefix: str,
+        parts: List[storage.Blob],
+        temporary_blobs: List[storage.Blob],
+    ) -> List[storage.Blob]:
+        composed = []
+        for start in range(0, len(parts), self._MAX_COMPOSE_SOURCES):
+            end = start + self._MAX_COMPOSE_SOURCES
+            blob = self._bucket.blob(f"{prefix}{len(temporary_blobs)}")
+            temporary_blobs.append(blob)
+            blob.compose(
+                parts[start:end],
+                timeout=self._timeout,
+                retry=self._conditional_retry,
+            )
+            composed.append(blob)
+        return composed
+
+    def open_read(self, name: str, mode: str = "rb") -> IO:
+        return self._bucket.blob(name).open(
+            mode=mode,
+            chunk_size=self._chunk_size,
+            timeout=self._timeout,
+            retry=self._retry,
+        )
+
+    def open_write(self, name: str, mode: str = "wb") -> IO:
+        if "a" in mode:
+            upload = _SpooledUpload(
+                upload=lambda file: self._append(name, file.read()),
+                max_size=self._chunk_size,
+            )
+            if "b" in mode:
+                return upload  # type: ignore
+            return _SpooledTextUpload(upload, encoding="utf-8")  # type: ignore
+        return self._bucket.blob(name).open(
+            mode=mode,
+            chunk_size=self._chunk_size,
+            timeout=self._timeout,
+            retry=self._conditional_retry,
+        )
+
+    def read_range(
+        self, name: str, start: int, end: Optional[int] = None
+    ) -> bytes:
+        if end is not None and end <= start:
+            return b""
+        return self._bucket.blob(name).download_as_bytes(
+            start=start,
+            end=None if end is None else end - 1,
+            timeout=self._timeout,
+            retry=self._retry,
+        )
 
     def delete(self, name: str):
-        self._bucket.blob(name).delete()
+        self._bucket.blob(name).delete(
+            timeout=self._timeout, retry=self._retry
+        )
+
+    def copy(self, source: str, destination: str):
+        """
+        Copies the blob within Google Cloud Storage. Large blobs are
+        rewritten in several calls, each continuing the previous one.
+        """
+        source_blob = self._bucket.blob(source)
+        destination_blob = self._bucket.blob(destination)
+        token, _, _ = destination_blob.rewrite(
+            source_blob, timeout=self._timeout, retry=self._conditional_retry
+        )
+        while token is not None:
+            token, _, _ = destination_blob.rewrite(
+                source_blob,
+                token=token,
+                timeout=self._timeout,
+                retry=self._conditional_retry,
+            )
 
     def exists(self, name: str) -> bool:
-        return self._bucket.blob(name).exists()
+        return self._bucket.blob(name).exists(
+            timeout=self._timeout, retry=self._retry
+        )
 
     def size(self, name: str) -> int:
         return self._get_blob(name).size
@@ -62,3 +452,78 @@ class GoogleCloudStorage(Storage):
         raise NotImplementedError(
             "Google Cloud Storage does not provide access time info."
         )
+
+    def stat(self, name: str) -> StorageStat:
+        blob = self._get_blob(name)
+        return StorageStat(
+            size=blob.size,
+            modified_time=blob.updated,
+            created_time=blob.time_created,
+            etag=blob.etag,
+            content_type=blob.content_type,
+        )
+
+    def delete_many(
+        self,
+        names: Iterable[str],
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ) -> BatchResult:
+        return self._run_batches(
+            self._delete_batch,
+            names,
+            self._DELETE_BATCH_SIZE,
+            max_concurrency,
+        )
+
+    def _delete_batch(self, names: List[str]) -> BatchResult:
+        with _ResponsesBatch(self._client) as batch:
+            for name in names:
+                self._bucket.delete_blob(name)
+        result = BatchResult(results={}, errors={})
+        for name, response in zip(names, batch.responses):
+            if 200 <= response.status_code < 300:
+                result.results[name] = None
+            else:
+                result.errors[name] = exceptions.from_http_response(response)
+        return result
+
+    def list(
+        self,
+        prefix: str = "",
+        delimiter: Optional[str] = None,
+        prefetch_pages: int = 0,
+    ) -> Iterator[StorageEntry]:
+        blobs = self._client.list_blobs(
+            self._bucket,
+            prefix=prefix or None,
+            delimiter=delimiter,
+            timeout=self._timeout,
+            retry=self._retry,
+        )
+        return self._iterate_pages(
+            (self._page_entries(page) for page in blobs.pages), prefetch_pages
+        )
+
+    @staticmethod
+    def _page_entries(page) -> List[StorageEntry]:
+        entries = [
+            StorageEntry(
+                name=blob.name,
+                size=blob.size,
+                modified_time=blob.updated,
+                etag=blob.etag,
+                is_prefix=False,
+            )
+            for blob in page
+        ]
+        entries.extend(
+            StorageEntry(
+                name=prefix,
+                size=None,
+                modified_time=None,
+                etag=None,
+                is_prefix=True,
+            )
+            for prefix in sorted(page.prefixes)
+        )
+        return entries
@@ -0,0 +1,200 @@
+import io
+from collections import OrderedDict
+from concurrent.futures import Future
+from threading import Lock
+from time import monotonic
+from typing import IO, AnyStr, Dict, Iterable, Iterator, Optional, Tuple
+
+from storages.backends.base import (
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_MAX_CONCURRENCY,
+    BatchResult,
+    Storage,
+    StorageWrapper,
+)
+from storages.exceptions import ImproperlyConfiguredError
+
+
+class MemoryCachedStorage(StorageWrapper):
+    """
+    Keeps the contents of small files read from the wrapped storage in
+    memory. Files up to max_object_size bytes are cached, the least recently
+    used ones are evicted once the cache exceeds max_size bytes. Concurrent
+    reads of a file missing from the cache share a single fetch. Entries
+    expire after ttl seconds, if given. Files missing from the cache are
+    streamed from the wrapped storage by open_read and iter_chunks, without
+    being cached.
+    """
+
+    def __init__(
+        self,
+        storage: Storage,
+        max_size: int = 64 * 1024 * 1024,
+        max_object_size: int = 1024 * 1024,
+        ttl: Optional[float] = None,
+    ):
+        super().__init__(storage)
+        if max_size < 1:
+            raise ImproperlyConfiguredError(name="max_size")
+        if not 0 < max_object_size <= max_size:
+            raise ImproperlyConfiguredError(name="max_object_size")
+        if ttl is not None and ttl <= 0:
+            raise ImproperlyConfiguredError(name="ttl")
+        self._max_size = max_size
+        self._max_object_size = max_object_size
+        self._ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._size = 0
+        self._fetches: "Dict[str, Future[bytes]]" = {}
+        self._lock = Lock()
+
+    def invalidate(self, name: str):
+        with self._lock:
+            self._fetches.pop(name, None)
+            self._pop(name)
+
+    def read(self, name: str, mode: Optional[str] = None) -> AnyStr:
+        content = self._get(name)
+        if mode is not None and "b" in mode:
+            return content  # type: ignore
+        return content.decode("utf-8")  # type: ignore
+
+    def write(self, name: str, content: AnyStr, mode: Optional[str] = None):
+        try:
+            super().write(name, content, mode)
+        finally:
+            self.invalidate(name)
+
+    def write_if_changed(self, name: str, content: AnyStr) -> bool:
+        try:
+            return super().write_if_changed(name, content)
+        finally:
+            self.invalidate(name)
+
+    def open_read(self, name: str, mode: Optional[str] = None) -> IO:
+        content = self._cached(name)
+        if content is None:
+            return super().open_read(name, mode)
+        file = io.BytesIO(content)
+        if mode is not None and "b" not in mode:
+            return io.TextIOWrapper(file, encoding="utf-8")
+        return file
+
+    def open_write(self, name: str, mode: Optional[str] = None) -> IO:
+        self.invalidate(name)
+        return super().open_write(name, mode)
+
+    def iter_chunks(
+        self,
+        name: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        mode: Optional[str] = None,
+    ) -> Iterator[AnyStr]:
+        if self._cached(name) is None:
+            return super().iter_chunks(name, chunk_size, mode)
+        return Storage.iter_chunks(self, name, chunk_size, mode or "rb")
+
+    def read_range(
+        self, name: str, start: int, end: Optional[int] = None
+    ) -> bytes:
+        # Ranges are usually read from large files, so they are only served
+        # from the cache, never added to it.
+        content = self._cached(name)
+        if content is None:
+            return super().read_range(name, start, end)
+        return content[start:end]
+
+    def delete(self, name: str):
+        try:
+            super().delete(name)
+        finally:
+            self.invalidate(name)
+
+    def copy(self, source: str, destination: str):
+        try:
+            super().copy(source, destination)
+        finally:
+            self.invalidate(destination)
+
+    def move(self, source: str, destination: str):
+        try:
+            super().move(source, destination)
+        finally:
+            self.invalidate(source)
+            self.invalidate(destination)
+
+    def delete_many(
+        self,
+        names: Iterable[str],
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ) -> BatchResult:
+        names = list(names)
+        try:
+            return super().delete_many(names, max_concurrency)
+        finally:
+            for name in names:
+                self.invalidate(name)
+
+    def _cached(self, name: str) -> Optional[bytes]:
+        with self._lock:
+            return self._lookup(name)
+
+    def _get(self, name: str) -> bytes:
+        with self._lock:
+            content = self._lookup(name)
+            if content is not None:
+                return content
+            fetch = self._fetches.get(name)
+            if fetch is not None:
+                leader = False
+            else:
+                leader = True
+                fetch = self._fetches[name] = Future()
+        if not leader:
+            return fetch.result()
+        return self._fetch(name, fetch)
+
+    def _fetch(self, name: str, fetch: "Future[bytes]") -> bytes:
+        try:
+            content: bytes = self._storage.read(  # type: ignore
+                name, mode="rb"
+            )
+        except BaseException as error:
+            fetch.set_exception(error)
+            with self._lock:
+                if self._fetches.get(name) is fetch:
+                    del self._fetches[name]
+            raise
+        fetch.set_result(content)
+        with self._lock:
+            # Skipped when invalidated while fetching.
+            if self._fetches.get(name) is fetch:
+                del self._fetches[name]
+                self._put(name, content)
+        return content
+
+    def _lookup(self, name: str) -> Optional[bytes]:
+        entry = self._entries.get(name)
+        if entry is None:
+            return None
+        if entry[0] <= monotonic():
+            self._pop(name)
+            return None
+        self._entries.move_to_end(name)
+        return entry[1]
+
+    def _put(self, name: str, content: bytes):
+        if len(content) > self._max_object_size:
+            return
+        self._pop(name)
+        expiry = float("inf") if self._ttl is None else monotonic() + self._ttl
+        self._entries[name] = (expiry, content)
+        self._size += len(content)
+        while self._size > self._max_size:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    def _pop(self, name: str):
+        entry = self._entries.pop(name, None)
+        if entry is not None:
+            self._size -= len(entry[1])
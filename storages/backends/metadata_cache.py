@@ -0,0 +1,144 @@
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import datetime
+from threading import Lock
+from time import monotonic
+from typing import IO, AnyStr, Dict, Iterable, Optional, Tuple
+
+from storages.backends.base import (
+    DEFAULT_MAX_CONCURRENCY,
+    BatchResult,
+    Storage,
+    StorageStat,
+    StorageWrapper,
+)
+from storages.exceptions import ImproperlyConfiguredError
+
+
+class MetadataCachedStorage(StorageWrapper):
+    """
+    Caches the metadata of the wrapped storage files for ttl seconds and
+    serves size and timestamps from it. At most max_size entries are kept,
+    the least recently used ones are evicted first. Concurrent stats of a
+    file share a single fetch, whose result is not cached when the file is
+    written or deleted meanwhile.
+    """
+
+    def __init__(
+        self, storage: Storage, ttl: float = 60.0, max_size: int = 1024
+    ):
+        super().__init__(storage)
+        if ttl <= 0:
+            raise ImproperlyConfiguredError(name="ttl")
+        if max_size < 1:
+            raise ImproperlyConfiguredError(name="max_size")
+        self._ttl = ttl
+        self._max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[float, StorageStat]]" = (
+            OrderedDict()
+        )
+        self._fetches: "Dict[str, Future[StorageStat]]" = {}
+        self._lock = Lock()
+
+    def invalidate(self, name: str):
+        with self._lock:
+            self._fetches.pop(name, None)
+            self._entries.pop(name, None)
+
+    def write(self, name: str, content: AnyStr, mode: Optional[str] = None):
+        try:
+            super().write(name, content, mode)
+        finally:
+            self.invalidate(name)
+
+    def write_if_changed(self, name: str, content: AnyStr) -> bool:
+        try:
+            return super().write_if_changed(name, content)
+        finally:
+            self.invalidate(name)
+
+    def open_write(self, name: str, mode: Optional[str] = None) -> IO:
+        self.invalidate(name)
+        return super().open_write(name, mode)
+
+    def delete(self, name: str):
+        try:
+            super().delete(name)
+        finally:
+            self.invalidate(name)
+
+    def copy(self, source: str, destination: str):
+        try:
+            super().copy(source, destination)
+        finally:
+            self.invalidate(destination)
+
+    def move(self, source: str, destination: str):
+        try:
+            super().move(source, destination)
+        finally:
+            self.invalidate(source)
+            self.invalidate(destination)
+
+    def delete_many(
+        self,
+        names: Iterable[str],
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ) -> BatchResult:
+        names = list(names)
+        try:
+            return super().delete_many(names, max_concurrency)
+        finally:
+            for name in names:
+                self.invalidate(name)
+
+    def size(self, name: str) -> int:
+        return self.stat(name).size
+
+    def get_created_time(self, name: str) -> datetime:
+        created_time = self.stat(name).created_time
+        if created_time is None:
+            return super().get_created_time(name)
+        return created_time
+
+    def get_modified_time(self, name: str) -> datetime:
+        return self.stat(name).modified_time
+
+    def stat(self, name: str) -> StorageStat:
+        now = monotonic()
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(name)
+                return entry[1]
+            fetch = self._fetches.get(name)
+            if fetch is not None:
+                leader = False
+            else:
+                leader = True
+                fetch = self._fetches[name] = Future()
+        if not leader:
+            return fetch.result()
+        return self._fetch(name, fetch, now)
+
+    def _fetch(
+        self, name: str, fetch: "Future[StorageStat]", now: float
+    ) -> StorageStat:
+        try:
+            result = super().stat(name)
+        except BaseException as error:
+            fetch.set_exception(error)
+            with self._lock:
+                if self._fetches.get(name) is fetch:
+                    del self._fetches[name]
+            raise
+        fetch.set_result(result)
+        with self._lock:
+            # Skipped when invalidated while fetching.
+            if self._fetches.get(name) is fetch:
+                del self._fetches[name]
+                self._entries[name] = (now + self._ttl, result)
+                self._entries.move_to_end(name)
+                while len(self._entries) > self._max_size:
+                    self._entries.popitem(last=False)
+        return result
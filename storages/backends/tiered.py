@@ -0,0 +1,658 @@
+import itertools
+import logging
+import weakref
+from concurrent.futures import Future
+from datetime import datetime, timezone
+from shutil import copyfileobj
+from threading import Event, Lock, Thread
+from time import monotonic
+from typing import (
+    IO,
+    Any,
+    AnyStr,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+)
+
+from storages.backends.base import (
+    DEFAULT_CHUNK_SIZE,
+    Storage,
+    StorageEntry,
+    StorageStat,
+    _mode_argument,
+)
+from storages.exceptions import ImproperlyConfiguredError
+
+
+class _IndexEntry:
+    __slots__ = (
+        "fast",
+        "synced",
+        "resolved",
+        "size",
+        "accessed",
+        "generation",
+        "pins",
+    )
+
+    def __init__(self, fast: bool, size: int, accessed: float):
+        # Whether the file is in the fast tier and whether the slow tier
+        # holds the same contents. Files out of the fast tier are always in
+        # the slow one.
+        self.fast = fast
+        self.synced = not fast
+        # Whether the fast copy is known not to be older than the slow one,
+        # which is not the case for the files indexed on creation.
+        self.resolved = True
+        self.size = size
+        self.accessed = accessed
+        self.generation = 0
+        # Number of calls and open files using the fast copy, which must
+        # not be demoted in the meantime.
+        self.pins = 0
+
+
+class _PinnedFile:
+    """
+    A file of the fast tier, which calls release once closed.
+    """
+
+    def __init__(self, file: IO, release: Callable[[], None]):
+        self._file = file
+        self._release: Optional[Callable[[], None]] = release
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._file, name)
+
+    def __iter__(self):
+        return iter(self._file)
+
+    def __enter__(self) -> "_PinnedFile":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        try:
+            self._file.close()
+        finally:
+            release, self._release = self._release, None
+            if release is not None:
+                release()
+
+
+class TieredStorage(Storage):
+    """
+    Keeps hot files in the fast storage and cold ones in the slow storage.
+    Files are written to the fast tier, promoted to it when read, and demoted
+    to the slow tier in the background once not accessed for demote_after
+    seconds or, least recently used first, once the fast tier exceeds
+    max_fast_size bytes. Where the file is found in both tiers, the newer
+    copy wins.
+
+    The tier of every file is kept in an index, so only the first lookup of
+    a file checks the tiers. The index of the files already in the fast tier
+    is built when the storage is created, and each of them is compared with
+    its slow copy on first use.
+    """
+
+    def __init__(
+        self,
+        fast: Storage,
+        slow: Storage,
+        *,
+        max_fast_size: Optional[int] = None,
+        demote_after: Optional[float] = None,
+        demote_interval: float = 60.0,
+    ):
+        if max_fast_size is not None and max_fast_size < 0:
+            raise ImproperlyConfiguredError(name="max_fast_size")
+        if demote_after is not None and demote_after < 0:
+            raise ImproperlyConfiguredError(name="demote_after")
+        if demote_interval <= 0:
+            raise ImproperlyConfiguredError(name="demote_interval")
+        self._fast = fast
+        self._slow = slow
+        self._max_fast_size = max_fast_size
+        self._demote_after = demote_after
+        self._demote_interval = demote_interval
+        self._index: Dict[str, _IndexEntry] = {}
+        self._fast_size = 0
+        # Promotions, and deletions of fast copies moved to the slow tier,
+        # which writes of the file wait for.
+        self._transfers: Dict[str, "Future[None]"] = {}
+        # Generations are unique across entries, so an entry replaced while
+        # a file was demoted is told apart from the original one.
+        self._generations = itertools.count(1)
+        self._lock = Lock()
+        self._load_index()
+        self._wake = Event()
+        self._stopped = Event()
+        self._thread: Optional[Thread] = None
+        if max_fast_size is not None or demote_after is not None:
+            self._thread = Thread(
+                target=TieredStorage._run_demotions,
+                args=(
+                    weakref.ref(self),
+                    demote_interval,
+                    self._wake,
+                    self._stopped,
+                ),
+                name="storages-demotion",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def close(self):
+        """
+        Stops demoting files in the background.
+        """
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def read(self, name: str, mode: Optional[str] = None) -> AnyStr:
+        return self._call(
+            name,
+            lambda storage: storage.read(name, **_mode_argument(mode)),
+            promote=True,
+        )
+
+    def write(self, name: str, content: AnyStr, mode: Optional[str] = None):
+        self._claim(name, mode)
+        try:
+            self._fast.write(name, content, **_mode_argument(mode))
+        except BaseException:
+            self._forget(name)
+            raise
+        finally:
+            self._release(name, written=True)
+
+    def open_read(self, name: str, mode: Optional[str] = None) -> IO:
+        storage = self._acquire(name, promote=True)
+        if storage is self._slow:
+            return storage.open_read(name, **_mode_argument(mode))
+        try:
+            file = storage.open_read(name, **_mode_argument(mode))
+        except BaseException:
+            self._release(name)
+            raise
+        return _PinnedFile(file, lambda: self._release(name))  # type: ignore
+
+    def open_write(self, name: str, mode: Optional[str] = None) -> IO:
+        self._claim(name, mode)
+        try:
+            file = self._fast.open_write(name, **_mode_argument(mode))
+        except BaseException:
+            self._forget(name)
+            self._release(name)
+            raise
+        return _PinnedFile(  # type: ignore
+            file, lambda: self._release(name, written=True)
+        )
+
+    def iter_chunks(
+        self,
+        name: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        mode: Optional[str] = None,
+    ) -> Iterator[AnyStr]:
+        return Storage.iter_chunks(self, name, chunk_size, mode or "rb")
+
+    def read_range(
+        self, name: str, start: int, end: Optional[int] = None
+    ) -> bytes:
+        return self._call(
+            name, lambda storage: storage.read_range(name, start, end)
+        )
+
+    def delete(self, name: str):
+        self._settle(name)
+        with self._lock:
+            entry = self._index.pop(name, None)
+            if entry is not None:
+                in_fast, synced = entry.fast, entry.synced
+                self._resize(entry, fast=False)
+        if entry is None:
+            in_fast = self._fast.exists(name)
+            in_slow = self._slow.exists(name)
+            if not in_fast and not in_slow:
+                raise FileNotFoundError(f"File {name} does not exist.")
+        else:
+            # A stale copy may be left in the slow tier by a rewrite.
+            in_slow = not in_fast or synced or self._slow.exists(name)
+        if in_fast:
+            self._fast.delete(name)
+        if in_slow:
+            self._slow.delete(name)
+
+    def exists(self, name: str) -> bool:
+        try:
+            self._entry(name)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def size(self, name: str) -> int:
+        return self._call(name, lambda storage: storage.size(name))
+
+    def get_created_time(self, name: str) -> datetime:
+        return self._call(name, lambda storage: storage.get_created_time(name))
+
+    def get_modified_time(self, name: str) -> datetime:
+        return self._call(
+            name, lambda storage: storage.get_modified_time(name)
+        )
+
+    def get_access_time(self, name: str) -> datetime:
+        return self._call(name, lambda storage: storage.get_access_time(name))
+
+    def stat(self, name: str) -> StorageStat:
+        return self._call(name, lambda storage: storage.stat(name))
+
+    def list(
+        self,
+        prefix: str = "",
+        delimiter: Optional[str] = None,
+        prefetch_pages: int = 0,
+    ) -> Iterator[StorageEntry]:
+        fast_entries = {
+            entry.name: entry for entry in self._fast.list(prefix, delimiter)
+        }
+        for entry in self._slow.list(prefix, delimiter, prefetch_pages):
+            fast_entry = fast_entries.pop(entry.name, None)
+            if fast_entry is None or (
+                not entry.is_prefix
+                and _timestamp(entry.modified_time)  # type: ignore
+                > _timestamp(fast_entry.modified_time)  # type: ignore
+            ):
+                yield entry
+            else:
+                yield fast_entry
+        yield from fast_entries.values()
+
+    def demote(self) -> List[str]:
+        """
+        Demotes the files not accessed for demote_after seconds and the
+        least recently used files above max_fast_size, and returns their
+        names. Called periodically in the background.
+        """
+        now = monotonic()
+        with self._lock:
+            entries = sorted(
+                (
+                    (name, entry)
+                    for name, entry in self._index.items()
+                    if entry.fast
+                ),
+                key=lambda item: item[1].accessed,
+            )
+            fast_size = self._fast_size
+            selected = []
+            for name, entry in entries:
+                idle = (
+                    self._demote_after is not None
+                    and now - entry.accessed >= self._demote_after
+                )
+                if idle or (
+                    self._max_fast_size is not None
+                    and fast_size > self._max_fast_size
+                ):
+                    selected.append((name, entry.generation, entry.accessed))
+                    fast_size -= entry.size
+        return [
+            name
+            for name, generation, accessed in selected
+            if self._demote(name, generation, accessed)
+        ]
+
+    @staticmethod
+    def _run_demotions(
+        reference: "weakref.ref[TieredStorage]",
+        interval: float,
+        wake: Event,
+        stopped: Event,
+    ):
+        # Holds the storage only while demoting, so it can be collected.
+        while True:
+            wake.wait(interval)
+            wake.clear()
+            storage = reference()
+            if storage is None or stopped.is_set():
+                return
+            try:
+                storage.demote()
+            except Exception:
+                logging.warning("Demotion of files failed.", exc_info=True)
+            del storage
+
+    def _demote(self, name: str, generation: int, accessed: float) -> bool:
+        with self._lock:
+            entry = self._index.get(name)
+            if not self._is_demotable(entry, generation, accessed):
+                return False
+            synced = entry.synced  # type: ignore
+        # A newer copy written to the slow tier elsewhere is kept, and the
+        # stale fast copy only dropped.
+        stale = not synced and self._is_stale(name)
+        if not synced and not stale:
+            with self._fast.open_read(
+                name, mode="rb"
+            ) as source, self._slow.open_write(name, mode="wb") as target:
+                copyfileobj(source, target, DEFAULT_CHUNK_SIZE)
+        with self._lock:
+            entry = self._index.get(name)
+            deleted = entry is None
+            if entry is not None and entry.generation == generation:
+                entry.synced = True
+                entry.resolved = True
+            demotable = self._is_demotable(entry, generation, accessed)
+            if demotable:
+                self._resize(entry, fast=False)  # type: ignore
+                transfer = self._transfers[name] = Future()
+        if demotable:
+            self._delete_fast_copy(name, transfer)
+        if deleted and not synced and not stale and self._slow.exists(name):
+            # Deleted while copied, the copy must not resurrect it.
+            self._slow.delete(name)
+        return demotable
+
+    @staticmethod
+    def _is_demotable(
+        entry: Optional[_IndexEntry], generation: int, accessed: float
+    ) -> bool:
+        return (
+            entry is not None
+            and entry.fast
+            and not entry.pins
+            and entry.generation == generation
+            and entry.accessed == accessed
+        )
+
+    def _load_index(self):
+        now = monotonic()
+        current_time = datetime.now(timezone.utc).timestamp()
+        for entry in self._fast.list():
+            if entry.is_prefix:
+                continue
+            modified_time: datetime = entry.modified_time  # type: ignore
+            age = current_time - _timestamp(modified_time)
+            index_entry = _IndexEntry(
+                fast=True, size=entry.size or 0, accessed=now - max(age, 0)
+            )
+            # The slow tier may hold a newer copy, compared on first use.
+            index_entry.resolved = False
+            index_entry.generation = next(self._generations)
+            self._index[entry.name] = index_entry
+            self._fast_size += index_entry.size
+
+    def _entry(self, name: str) -> _IndexEntry:
+        with self._lock:
+            entry = self._index.get(name)
+        if entry is None:
+            entry = self._locate(name)
+        elif not entry.resolved:
+            self._resolve(name, entry)
+        return entry
+
+    def _locate(self, name: str) -> _IndexEntry:
+        """
+        Finds the tier holding the newer copy of the file, removing a stale
+        copy from the fast tier, and indexes the file.
+        """
+        in_fast = self._fast.exists(name)
+        in_slow = self._slow.exists(name)
+        if not in_fast and not in_slow:
+            raise FileNotFoundError(f"File {name} does not exist.")
+        stale = in_fast and in_slow and self._is_newer_in_slow(name)
+        entry = _IndexEntry(
+            fast=in_fast and not stale,
+            size=self._fast.size(name) if in_fast and not stale else 0,
+            accessed=monotonic(),
+        )
+        entry.generation = next(self._generations)
+        with self._lock:
+            if name in self._index:
+                return self._index[name]
+            self._index[name] = entry
+            self._fast_size += entry.size
+            if stale:
+                transfer = self._transfers[name] = Future()
+        if stale:
+            self._delete_fast_copy(name, transfer)
+        return entry
+
+    def _resolve(self, name: str, entry: _IndexEntry):
+        """
+        Compares the fast copy of a file indexed on creation with the slow
+        tier, moving the file to the slow tier where it holds a newer copy.
+        """
+        generation = entry.generation
+        stale = self._is_stale(name)
+        with self._lock:
+            if (
+                self._index.get(name) is not entry
+                or entry.resolved
+                or entry.generation != generation
+            ):
+                # Deleted, rewritten or resolved in the meantime.
+                return
+            entry.resolved = True
+            if not stale:
+                return
+            self._resize(entry, fast=False)
+            entry.synced = True
+            transfer = self._transfers[name] = Future()
+        self._delete_fast_copy(name, transfer)
+
+    def _is_stale(self, name: str) -> bool:
+        """
+        Returns whether the slow tier holds a newer copy of a file of the
+        fast tier.
+        """
+        return self._slow.exists(name) and self._is_newer_in_slow(name)
+
+    def _is_newer_in_slow(self, name: str) -> bool:
+        return _timestamp(self._slow.get_modified_time(name)) > _timestamp(
+            self._fast.get_modified_time(name)
+        )
+
+    def _delete_fast_copy(self, name: str, transfer: "Future[None]"):
+        """
+        Deletes the fast copy of a file moved to the slow tier, outside the
+        lock. Writes of the file wait for the transfer in the meantime.
+        """
+        try:
+            self._fast.delete(name)
+        finally:
+            with self._lock:
+                del self._transfers[name]
+            transfer.set_result(None)
+
+    def _call(
+        self,
+        name: str,
+        function: Callable[[Storage], Any],
+        promote: bool = False,
+    ) -> Any:
+        storage = self._acquire(name, promote)
+        try:
+            return function(storage)
+        finally:
+            if storage is self._fast:
+                self._release(name)
+
+    def _acquire(self, name: str, promote: bool) -> Storage:
+        """
+        Returns the tier to use the file from, promoting the file first
+        where requested. The fast tier is pinned until released.
+        """
+        entry = self._entry(name)
+        if promote and not entry.fast:
+            self._promote(name)
+        with self._lock:
+            entry = self._index.get(name, entry)
+            entry.accessed = monotonic()
+            if entry.fast:
+                entry.pins += 1
+                return self._fast
+            return self._slow
+
+    def _release(self, name: str, written: bool = False):
+        size = None
+        if written:
+            try:
+                size = self._fast.size(name)
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            entry = self._index.get(name)
+            if entry is not None:
+                entry.pins = max(entry.pins - 1, 0)
+                if size is not None and entry.fast:
+                    self._resize(entry, fast=True, size=size)
+                over_capacity = self._is_over_capacity()
+            else:
+                over_capacity = False
+        if over_capacity:
+            self._wake.set()
+
+    def _claim(self, name: str, mode: Optional[str]):
+        """
+        Marks the file as written to the fast tier, once it is not being
+        transferred between the tiers. Updated files are promoted first.
+        """
+        if mode is not None and "x" in mode and self.exists(name):
+            raise FileExistsError(f"File {name} already exists.")
+        promote = mode is not None and ("a" in mode or "+" in mode)
+        while True:
+            if promote:
+                try:
+                    entry = self._entry(name)
+                except FileNotFoundError:
+                    pass
+                else:
+                    if not entry.fast:
+                        self._promote(name)
+            with self._lock:
+                transfer = self._transfers.get(name)
+                entry = self._index.get(name)  # type: ignore
+                if transfer is None and not (
+                    promote and entry is not None and not entry.fast
+                ):
+                    if entry is None:
+                        entry = self._index[name] = _IndexEntry(
+                            fast=True, size=0, accessed=monotonic()
+                        )
+                    elif not entry.fast:
+                        self._resize(entry, fast=True, size=0)
+                    entry.synced = False
+                    entry.resolved = True
+                    entry.generation = next(self._generations)
+                    entry.accessed = monotonic()
+                    entry.pins += 1
+                    return
+            if transfer is not None:
+                self._wait(transfer)
+
+    def _settle(self, name: str):
+        """
+        Waits until the file is not being transferred between the tiers.
+        """
+        while True:
+            with self._lock:
+                transfer = self._transfers.get(name)
+            if transfer is None:
+                return
+            self._wait(transfer)
+
+    @staticmethod
+    def _wait(transfer: "Future[None]"):
+        try:
+            transfer.result()
+        except Exception:
+            # Raised to the caller which transferred the file.
+            pass
+
+    def _forget(self, name: str):
+        with self._lock:
+            entry = self._index.pop(name, None)
+            if entry is not None:
+                self._resize(entry, fast=False)
+
+    def _promote(self, name: str):
+        with self._lock:
+            entry = self._index.get(name)
+            if entry is None or entry.fast:
+                return
+            promotion = self._transfers.get(name)
+            if promotion is not None:
+                leader = False
+            else:
+                leader = True
+                promotion = self._transfers[name] = Future()
+            generation = entry.generation
+        if not leader:
+            self._wait(promotion)
+            return
+        try:
+            if (
+                self._max_fast_size is None
+                or self._slow.size(name) <= self._max_fast_size
+            ):
+                self._copy_to_fast(name, generation)
+        except BaseException as error:
+            promotion.set_exception(error)
+            raise
+        else:
+            promotion.set_result(None)
+        finally:
+            with self._lock:
+                del self._transfers[name]
+
+    def _copy_to_fast(self, name: str, generation: int):
+        with self._slow.open_read(
+            name, mode="rb"
+        ) as source, self._fast.open_write(name, mode="wb") as target:
+            copyfileobj(source, target, DEFAULT_CHUNK_SIZE)
+        size = self._fast.size(name)
+        with self._lock:
+            entry = self._index.get(name)
+            if entry is None or entry.generation != generation:
+                # Deleted while promoted.
+                self._fast.delete(name)
+                return
+            self._resize(entry, fast=True, size=size)
+            entry.synced = True
+            over_capacity = self._is_over_capacity()
+        if over_capacity:
+            self._wake.set()
+
+    def _resize(self, entry: _IndexEntry, fast: bool, size: int = 0):
+        """
+        Updates the tier and the size of the entry, along with the size of
+        the fast tier. Called under the lock.
+        """
+        self._fast_size += (size if fast else 0) - (
+            entry.size if entry.fast else 0
+        )
+        entry.fast = fast
+        entry.size = size if fast else 0
+
+    def _is_over_capacity(self) -> bool:
+        return (
+            self._max_fast_size is not None
+            and self._fast_size > self._max_fast_size
+        )
+
+
+def _timestamp(time: datetime) -> float:
+    # Times of the file system are naive, in UTC.
+    if time.tzinfo is None:
+        time = time.replace(tzinfo=timezone.utc)
+    return time.timestamp()
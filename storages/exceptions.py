@@ -10,3 +10,8 @@ class ImproperlyConfiguredError(StoragesError):
 class MissingEnvironmentVariableError(StoragesError):
     def __init__(self, name: str):
         super().__init__(f"The environment variable '{name}' is not defined")
+
+
+class ConcurrentModificationError(StoragesError):
+    def __init__(self, name: str):
+        super().__init__(f"The file '{name}' was modified concurrently")
@@ -0,0 +1,554 @@
+import logging
+from bisect import bisect_left
+from datetime import datetime
+from threading import Lock
+from time import perf_counter
+from typing import (
+    IO,
+    Any,
+    AnyStr,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from storages.backends.base import (
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_PART_SIZE,
+    BatchResult,
+    Storage,
+    StorageEntry,
+    StorageStat,
+    StorageWrapper,
+)
+
+DEFAULT_LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class OperationEvent(NamedTuple):
+    backend: str
+    operation: str
+    name: Optional[str]
+    duration: float
+    size: Optional[int]
+    error: Optional[Exception]
+
+
+Hook = Callable[[OperationEvent], None]
+
+
+def _byte_size(data: Any) -> int:
+    # Text is counted in the bytes it is encoded to, nothing read from
+    # non-blocking streams in no bytes.
+    if data is None:
+        return 0
+    if isinstance(data, str):
+        return len(data.encode("utf-8"))
+    return memoryview(data).nbytes
+
+
+class _ObservedFile:
+    """
+    A file of the wrapped storage, counting the bytes read from or written
+    to it and calling report with their number, and the first error raised,
+    once closed.
+    """
+
+    def __init__(
+        self,
+        file: IO,
+        report: Callable[[int, Optional[Exception]], None],
+    ):
+        self._file = file
+        self._report: Optional[Callable[[int, Optional[Exception]], None]] = (
+            report
+        )
+        self._size = 0
+        self._error: Optional[Exception] = None
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._file, name)
+
+    def __iter__(self) -> "_ObservedFile":
+        return self
+
+    def __next__(self) -> Any:
+        try:
+            line = next(self._file)
+        except StopIteration:
+            raise
+        except Exception as error:
+            self._fail(error)
+            raise
+        self._size += _byte_size(line)
+        return line
+
+    def __enter__(self) -> "_ObservedFile":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # Passed on, so files discarding the data written in a failed with
+        # block still do.
+        try:
+            return self._file.__exit__(exc_type, exc_value, traceback)
+        finally:
+            self._finish()
+
+    def read(self, *args) -> Any:
+        data = self._call(self._file.read, *args)
+        self._size += _byte_size(data)
+        return data
+
+    def read1(self, *args) -> bytes:
+        data = self._call(self._file.read1, *args)  # type: ignore
+        self._size += len(data)
+        return data
+
+    def readline(self, *args) -> Any:
+        line = self._call(self._file.readline, *args)
+        self._size += _byte_size(line)
+        return line
+
+    def readlines(self, *args) -> List[Any]:
+        lines = self._call(self._file.readlines, *args)
+        self._size += sum(_byte_size(line) for line in lines)
+        return lines
+
+    def readinto(self, buffer) -> Optional[int]:
+        size = self._call(self._file.readinto, buffer)  # type: ignore
+        self._size += size or 0
+        return size
+
+    def write(self, data: AnyStr) -> int:
+        written = self._call(self._file.write, data)
+        self._size += _byte_size(data)
+        return written
+
+    def writelines(self, lines: Iterable[AnyStr]):
+        for line in lines:
+            self.write(line)
+
+    def close(self):
+        try:
+            self._call(self._file.close)
+        finally:
+            self._finish()
+
+    def _call(self, function: Callable[..., Any], *args) -> Any:
+        try:
+            return function(*args)
+        except Exception as error:
+            self._fail(error)
+            raise
+
+    def _fail(self, error: Exception):
+        if self._error is None:
+            self._error = error
+
+    def _finish(self):
+        report, self._report = self._report, None
+        if report is not None:
+            report(self._size, self._error)
+
+
+class InstrumentedStorage(StorageWrapper):
+    """
+    Reports every call made to the wrapped storage to the registered hooks,
+    along with its duration, the number of bytes read or written and the
+    error raised, if any. Calls are passed straight through while no hooks
+    are registered. Streams are reported once closed and iterators once
+    exhausted, along with the bytes read or written through them. Text is
+    counted in UTF-8 encoded bytes.
+    """
+
+    def __init__(
+        self,
+        storage: Storage,
+        hooks: Iterable[Hook] = (),
+        backend: Optional[str] = None,
+    ):
+        super().__init__(storage)
+        self._hooks: Tuple[Hook, ...] = tuple(hooks)
+        self._backend = backend
+        self._lock = Lock()
+
+    @property
+    def backend(self) -> str:
+        """
+        Name of the innermost wrapped storage class, unless given.
+        """
+        if self._backend is None:
+            storage = self._storage
+            while isinstance(storage, StorageWrapper):
+                storage = storage._storage
+            self._backend = type(storage).__name__
+        return self._backend
+
+    def add_hook(self, hook: Hook):
+        with self._lock:
+            self._hooks = (*self._hooks, hook)
+
+    def remove_hook(self, hook: Hook):
+        with self._lock:
+            self._hooks = tuple(item for item in self._hooks if item != hook)
+
+    def read(self, name: str, mode: Optional[str] = None) -> AnyStr:
+        return self._observe(
+            "read", name, _byte_size, super().read, name, mode
+        )
+
+    def write(self, name: str, content: AnyStr, mode: Optional[str] = None):
+        self._observe(
+            "write",
+            name,
+            lambda _: _byte_size(content),
+            super().write,
+            name,
+            content,
+            mode,
+        )
+
+    def write_if_changed(self, name: str, content: AnyStr) -> bool:
+        return self._observe(
+            "write_if_changed",
+            name,
+            lambda written: _byte_size(content) if written else 0,
+            super().write_if_changed,
+            name,
+            content,
+        )
+
+    def open_read(self, name: str, mode: Optional[str] = None) -> IO:
+        return self._observe_file(
+            "open_read", name, super().open_read, name, mode
+        )
+
+    def open_write(self, name: str, mode: Optional[str] = None) -> IO:
+        return self._observe_file(
+            "open_write", name, super().open_write, name, mode
+        )
+
+    def iter_chunks(
+        self,
+        name: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        mode: Optional[str] = None,
+    ) -> Iterator[AnyStr]:
+        chunks = super().iter_chunks(name, chunk_size, mode)
+        if not self._hooks:
+            return chunks  # type: ignore
+        return self._observe_iterator("iter_chunks", name, _byte_size, chunks)
+
+    def read_range(
+        self, name: str, start: int, end: Optional[int] = None
+    ) -> bytes:
+        return self._observe(
+            "read_range", name, len, super().read_range, name, start, end
+        )
+
+    def read_parallel(
+        self,
+        name: str,
+        part_size: int = DEFAULT_PART_SIZE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ) -> bytearray:
+        return self._observe(
+            "read_parallel",
+            name,
+            len,
+            super().read_parallel,
+            name,
+            part_size,
+            max_concurrency,
+        )
+
+    def download_parallel(
+        self,
+        name: str,
+        file: IO[bytes],
+        part_size: int = DEFAULT_PART_SIZE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ):
+        self._observe(
+            "download_parallel",
+            name,
+            None,
+            super().download_parallel,
+            name,
+            file,
+            part_size,
+            max_concurrency,
+        )
+
+    def delete(self, name: str):
+        self._observe("delete", name, None, super().delete, name)
+
+    def copy(self, source: str, destination: str):
+        self._observe("copy", source, None, super().copy, source, destination)
+
+    def move(self, source: str, destination: str):
+        self._observe("move", source, None, super().move, source, destination)
+
+    def exists(self, name: str) -> bool:
+        return self._observe("exists", name, None, super().exists, name)
+
+    def size(self, name: str) -> int:
+        return self._observe("size", name, None, super().size, name)
+
+    def get_created_time(self, name: str) -> datetime:
+        return self._observe(
+            "get_created_time", name, None, super().get_created_time, name
+        )
+
+    def get_modified_time(self, name: str) -> datetime:
+        return self._observe(
+            "get_modified_time", name, None, super().get_modified_time, name
+        )
+
+    def get_access_time(self, name: str) -> datetime:
+        return self._observe(
+            "get_access_time", name, None, super().get_access_time, name
+        )
+
+    def stat(self, name: str) -> StorageStat:
+        return self._observe("stat", name, None, super().stat, name)
+
+    def list(
+        self,
+        prefix: str = "",
+        delimiter: Optional[str] = None,
+        prefetch_pages: int = 0,
+    ) -> Iterator[StorageEntry]:
+        entries = super().list(prefix, delimiter, prefetch_pages)
+        if not self._hooks:
+            return entries
+        return self._observe_iterator("list", prefix, None, entries)
+
+    def delete_many(
+        self,
+        names: Iterable[str],
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ) -> BatchResult:
+        return self._observe(
+            "delete_many",
+            None,
+            None,
+            super().delete_many,
+            names,
+            max_concurrency,
+        )
+
+    def exists_many(
+        self,
+        names: Iterable[str],
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ) -> BatchResult:
+        return self._observe(
+            "exists_many",
+            None,
+            None,
+            super().exists_many,
+            names,
+            max_concurrency,
+        )
+
+    def stat_many(
+        self,
+        names: Iterable[str],
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ) -> BatchResult:
+        return self._observe(
+            "stat_many",
+            None,
+            None,
+            super().stat_many,
+            names,
+            max_concurrency,
+        )
+
+    def _observe(
+        self,
+        operation: str,
+        name: Optional[str],
+        measure: Optional[Callable[[Any], int]],
+        function: Callable[..., Any],
+        *args,
+    ) -> Any:
+        if not self._hooks:
+            return function(*args)
+        start = perf_counter()
+        try:
+            result = function(*args)
+        except Exception as error:
+            self._emit(operation, name, start, None, error)
+            raise
+        size = None if measure is None else measure(result)
+        self._emit(operation, name, start, size, None)
+        return result
+
+    def _observe_file(
+        self,
+        operation: str,
+        name: Optional[str],
+        function: Callable[..., IO],
+        *args,
+    ) -> IO:
+        if not self._hooks:
+            return function(*args)
+        start = perf_counter()
+        try:
+            file = function(*args)
+        except Exception as error:
+            self._emit(operation, name, start, None, error)
+            raise
+        return _ObservedFile(  # type: ignore
+            file,
+            lambda size, error: self._emit(
+                operation, name, start, size, error
+            ),
+        )
+
+    def _observe_iterator(
+        self,
+        operation: str,
+        name: Optional[str],
+        measure: Optional[Callable[[Any], int]],
+        iterator: Iterator[Any],
+    ) -> Iterator[Any]:
+        start = perf_counter()
+        size = 0
+        try:
+            for item in iterator:
+                if measure is not None:
+                    size += measure(item)
+                yield item
+        except Exception as error:
+            self._emit(operation, name, start, None, error)
+            raise
+        self._emit(
+            operation, name, start, None if measure is None else size, None
+        )
+
+    def _emit(
+        self,
+        operation: str,
+        name: Optional[str],
+        start: float,
+        size: Optional[int],
+        error: Optional[Exception],
+    ):
+        event = OperationEvent(
+            backend=self.backend,
+            operation=operation,
+            name=name,
+            duration=perf_counter() - start,
+            size=size,
+            error=error,
+        )
+        for hook in self._hooks:
+            try:
+                hook(event)
+            except Exception:
+                # Instrumentation never breaks the storage calls.
+                logging.warning("Storage hook %r failed.", hook, exc_info=True)
+
+
+class OperationHistogram(NamedTuple):
+    calls: int
+    errors: int
+    total_duration: float
+    total_size: int
+    # Upper bounds of the latency buckets (in seconds), the last one being
+    # infinity, and the number of calls which fell into every bucket.
+    bounds: Tuple[float, ...]
+    counts: Tuple[int, ...]
+
+    def quantile(self, quantile: float) -> float:
+        """
+        Returns the upper bound of the bucket holding the given quantile of
+        the call durations.
+        """
+        rank = quantile * self.calls
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank and seen:
+                return bound
+        return 0.0
+
+
+class _Histogram:
+    __slots__ = ("calls", "errors", "total_duration", "total_size", "counts")
+
+    def __init__(self, buckets: int):
+        self.calls = 0
+        self.errors = 0
+        self.total_duration = 0.0
+        self.total_size = 0
+        self.counts = [0] * buckets
+
+
+class HistogramCollector:
+    """
+    A hook aggregating the events in memory, into latency histograms per
+    backend and operation.
+    """
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS):
+        self._bounds = (*sorted(buckets), float("inf"))
+        self._histograms: Dict[Tuple[str, str], _Histogram] = {}
+        self._lock = Lock()
+
+    def __call__(self, event: OperationEvent):
+        bucket = bisect_left(self._bounds, event.duration)
+        key = (event.backend, event.operation)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram(
+                    len(self._bounds)
+                )
+            histogram.calls += 1
+            histogram.errors += event.error is not None
+            histogram.total_duration += event.duration
+            histogram.total_size += event.size or 0
+            histogram.counts[bucket] += 1
+
+    def snapshot(self) -> Dict[Tuple[str, str], OperationHistogram]:
+        """
+        Returns the histograms keyed by backend and operation names.
+        """
+        with self._lock:
+            return {
+                key: OperationHistogram(
+                    calls=histogram.calls,
+                    errors=histogram.errors,
+                    total_duration=histogram.total_duration,
+                    total_size=histogram.total_size,
+                    bounds=self._bounds,
+                    counts=tuple(histogram.counts),
+                )
+                for key, histogram in self._histograms.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
@@ -1,48 +1,199 @@
 import os
+import re
+import weakref
+from functools import partial
 from importlib import import_module
-from inspect import Signature
+from inspect import Parameter, Signature
 from os import environ
-from typing import Any, Dict, Generator, Iterable, Tuple, Type
+from threading import Lock
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Mapping,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 
-from storages.backends.base import Storage
-from storages.exceptions import MissingEnvironmentVariableError
+from storages.backends.async_base import AsyncStorage
+from storages.backends.base import (
+    ByteSize,
+    Duration,
+    Storage,
+    StorageWrapper,
+)
+from storages.exceptions import (
+    ImproperlyConfiguredError,
+    MissingEnvironmentVariableError,
+)
 
 
 class StorageConstructorArgumentsExtractor:
     _DEFAULT_IGNORED_ARGUMENTS = ("self", "cls")
+    _EXTRACTED_KINDS = (
+        Parameter.POSITIONAL_OR_KEYWORD,
+        Parameter.KEYWORD_ONLY,
+    )
 
-    @staticmethod
+    @classmethod
     def extract(
+        cls,
         storage_backend_class: Type[Storage],
         ignored_arguments: Tuple[str, ...] = _DEFAULT_IGNORED_ARGUMENTS,
     ) -> Generator[str, None, None]:
-        signature = Signature.from_callable(storage_backend_class.__init__)
         return (
-            parameter.name
-            for _, parameter in signature.parameters.items()
-            if parameter.kind is parameter.POSITIONAL_OR_KEYWORD
-            and parameter.name not in ignored_arguments
+            name
+            for name in cls.extract_parameters(
+                storage_backend_class=storage_backend_class,
+                ignored_arguments=ignored_arguments,
+            )
         )
 
+    @classmethod
+    def extract_parameters(
+        cls,
+        storage_backend_class: Type[Storage],
+        ignored_arguments: Tuple[str, ...] = _DEFAULT_IGNORED_ARGUMENTS,
+    ) -> Dict[str, Parameter]:
+        signature = Signature.from_callable(storage_backend_class.__init__)
+        return {
+            name: parameter
+            for name, parameter in signature.parameters.items()
+            if parameter.kind in cls._EXTRACTED_KINDS
+            and name not in ignored_arguments
+        }
+
+
+class EnvironmentVariableConverter:
+    """
+    Converts values of the environment variables to the types the
+    parameters are annotated with. Byte sizes are given in bytes or with a
+    unit, e.g. "64KiB", "8MB" or "1G" (binary), and durations in seconds or
+    with a unit, e.g. "500ms", "30s", "5m" or "1h". An empty value of an
+    Optional parameter stands for None.
+    """
+
+    _TRUE_VALUES = ("1", "true", "yes", "on")
+    _FALSE_VALUES = ("0", "false", "no", "off")
+    _NUMBER_WITH_UNIT = re.compile(r"^\s*(\d+(?:\.\d*)?)\s*([a-z]*)\s*$", re.I)
+    _BYTE_SIZE_UNITS = {
+        "": 1,
+        "b": 1,
+        "k": 1024,
+        "kb": 1000,
+        "kib": 1024,
+        "m": 1024**2,
+        "mb": 1000**2,
+        "mib": 1024**2,
+        "g": 1024**3,
+        "gb": 1000**3,
+        "gib": 1024**3,
+        "t": 1024**4,
+        "tb": 1000**4,
+        "tib": 1024**4,
+    }
+    _DURATION_UNITS = {
+        "": 1.0,
+        "ms": 0.001,
+        "s": 1.0,
+        "m": 60.0,
+        "h": 3600.0,
+        "d": 86400.0,
+    }
+
+    @classmethod
+    def convert(cls, name: str, value: str, annotation: Any) -> Any:
+        annotation, optional = cls._unwrap_optional(annotation)
+        if optional and not value.strip():
+            return None
+        try:
+            if annotation is bool:
+                return cls._convert_bool(value)
+            if annotation is ByteSize:
+                return int(cls._convert_with_unit(value, cls._BYTE_SIZE_UNITS))
+            if annotation is Duration:
+                return cls._convert_with_unit(value, cls._DURATION_UNITS)
+            if annotation in (int, float):
+                return annotation(value)
+        except ValueError:
+            raise ImproperlyConfiguredError(name=name)
+        return value
+
+    @classmethod
+    def _convert_bool(cls, value: str) -> bool:
+        if value.lower() in cls._TRUE_VALUES:
+            return True
+        if value.lower() in cls._FALSE_VALUES:
+            return False
+        raise ValueError(value)
+
+    @classmethod
+    def _convert_with_unit(
+        cls, value: str, units: Mapping[str, float]
+    ) -> float:
+        match = cls._NUMBER_WITH_UNIT.match(value)
+        if match is None or match.group(2).lower() not in units:
+            raise ValueError(value)
+        return float(match.group(1)) * units[match.group(2).lower()]
+
+    @staticmethod
+    def _unwrap_optional(annotation: Any) -> Tuple[Any, bool]:
+        if getattr(annotation, "__origin__", None) is Union:
+            arguments = [
+                argument
+                for argument in annotation.__args__
+                if argument is not type(None)
+            ]
+            if len(arguments) == 1:
+                return arguments[0], True
+        return annotation, False
+
 
 class EnvironmentVariablesCollector:
     _DEFAULT_PREFIX = "STORAGES_"
 
     @classmethod
     def collect(
-        cls, names: Iterable[str], prefix: str = _DEFAULT_PREFIX
+        cls,
+        names: Iterable[str],
+        prefix: str = _DEFAULT_PREFIX,
+        parameters: Optional[Mapping[str, Parameter]] = None,
     ) -> Dict[str, Any]:
+        """
+        Collects values of the environment variables named after the
+        prefixed names. When the parameters are given, the ones with a default
+        value may be left undefined and values are converted to the types
+        the parameters are annotated with.
+        """
+        parameters = parameters or {}
         values = {}
         for name in names:
             environment_variable_name = f"{prefix}{name.upper()}"
             value = os.environ.get(environment_variable_name)
+            parameter = parameters.get(name)
             if value is None:
+                if cls._has_default(parameter):
+                    continue
                 raise MissingEnvironmentVariableError(
                     name=environment_variable_name
                 )
+            if parameter is not None:
+                value = EnvironmentVariableConverter.convert(
+                    environment_variable_name, value, parameter.annotation
+                )
             values[name] = value
         return values
 
+    @staticmethod
+    def _has_default(parameter: Optional[Parameter]) -> bool:
+        return parameter is not None and parameter.default is not (
+            Parameter.empty
+        )
+
 
 class DynamicStorageLoader:
     _PATH_DELIMITER = "."
@@ -65,17 +216,143 @@ class DynamicStorageLoader:
 
 class StorageProvider:
     @classmethod
-    def provide(cls, backend_path: str):
+    def provide(
+        cls,
+        backend_path: str,
+        prefix: str = EnvironmentVariablesCollector._DEFAULT_PREFIX,
+    ):
         backend_class = DynamicStorageLoader.load_class(path=backend_path)
-        constructor_arguments = StorageConstructorArgumentsExtractor.extract(
+        parameters = StorageConstructorArgumentsExtractor.extract_parameters(
             storage_backend_class=backend_class
         )
         constructor_argument_values = EnvironmentVariablesCollector.collect(
-            names=constructor_arguments
+            names=parameters, prefix=prefix, parameters=parameters
         )
         return backend_class(**constructor_argument_values)  # type: ignore
 
 
-default_storage = StorageProvider.provide(
-    backend_path=environ["STORAGES_BACKEND"]
-)
+class AsyncStorageProvider:
+    @classmethod
+    def provide(cls, backend_path: str) -> AsyncStorage:
+        """
+        Builds an asynchronous storage backend, configured by the same
+        environment variables as its synchronous counterpart.
+        """
+        storage = StorageProvider.provide(backend_path=backend_path)
+        if not isinstance(storage, AsyncStorage):
+            raise ImproperlyConfiguredError(name=backend_path)
+        return storage
+
+
+class LazyStorage(StorageWrapper):
+    """
+    Builds the storage using the factory on first use, so importing and
+    configuring it is free. A process forked after that builds its own
+    storage, as clients and connection pools must not be shared between
+    processes.
+    """
+
+    def __init__(self, factory: Callable[[], Storage]):
+        self._factory = factory
+        self._instance: Optional[Storage] = None
+        self._pid: Optional[int] = None
+        self._lock = Lock()
+        _lazy_storages.add(self)
+
+    @property
+    def _storage(self) -> Storage:  # type: ignore
+        pid = os.getpid()
+        if self._instance is None or self._pid != pid:
+            with self._lock:
+                if self._instance is None or self._pid != pid:
+                    self._instance = self._factory()
+                    self._pid = pid
+        return self._instance
+
+    def _reset(self):
+        self._instance = None
+        self._lock = Lock()
+
+
+# Reset in forked processes by a single handler, which does not keep them
+# alive.
+_lazy_storages: "weakref.WeakSet[LazyStorage]" = weakref.WeakSet()
+
+
+def _reset_lazy_storages():
+    for storage in list(_lazy_storages):
+        storage._reset()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_lazy_storages)
+
+
+class StorageRegistry:
+    """
+    Storages configured by environment variables prefixed with their upper
+    cased names, e.g. the "archive" storage by STORAGES_ARCHIVE_BACKEND and
+    STORAGES_ARCHIVE_AWS_BUCKET_NAME. The "default" storage is configured by
+    the unprefixed STORAGES_BACKEND and its settings. Every storage is built
+    once, on first use, and shared by all threads along with its clients and
+    connection pools.
+    """
+
+    DEFAULT_NAME = "default"
+    _NAME_PATTERN = re.compile(r"^[a-z][a-z0-9_]*$")
+    _BACKEND_NAME = "BACKEND"
+
+    def __init__(
+        self, prefix: str = EnvironmentVariablesCollector._DEFAULT_PREFIX
+    ):
+        self._prefix = prefix
+        self._storages: Dict[str, Storage] = {}
+        self._lock = Lock()
+
+    def __getitem__(self, name: str) -> Storage:
+        storage = self._storages.get(name)
+        if storage is None:
+            if not self._NAME_PATTERN.match(name):
+                raise ImproperlyConfiguredError(name=name)
+            with self._lock:
+                storage = self._storages.get(name)
+                if storage is None:
+                    storage = self._storages[name] = LazyStorage(
+                        partial(self._provide, name)
+                    )
+        return storage
+
+    def __contains__(self, name: str) -> bool:
+        return (
+            name in self._storages
+            or f"{self._name_prefix(name)}{self._BACKEND_NAME}" in environ
+        )
+
+    def register(self, name: str, storage: Storage):
+        """
+        Registers a storage built by the application, e.g. a wrapped one,
+        under the name, in place of the one configured by the environment.
+        """
+        with self._lock:
+            self._storages[name] = storage
+
+    def _provide(self, name: str) -> Storage:
+        prefix = self._name_prefix(name)
+        environment_variable_name = f"{prefix}{self._BACKEND_NAME}"
+        backend_path = environ.get(environment_variable_name)
+        if backend_path is None:
+            raise MissingEnvironmentVariableError(
+                name=environment_variable_name
+            )
+        return StorageProvider.provide(
+            backend_path=backend_path, prefix=prefix
+        )
+
+    def _name_prefix(self, name: str) -> str:
+        if name == self.DEFAULT_NAME:
+            return self._prefix
+        return f"{self._prefix}{name.upper()}_"
+
+
+storage_registry = StorageRegistry()
+default_storage = storage_registry[StorageRegistry.DEFAULT_NAME]
@@ -0,0 +1,45 @@
+from typing import Dict, Optional
+
+from opentelemetry import metrics
+
+from storages.instrumentation import OperationEvent
+
+
+class OpenTelemetryHook:
+    """
+    A hook recording the events of InstrumentedStorage as OpenTelemetry
+    metrics: the duration of the calls, the bytes they read or wrote and
+    the errors they raised, attributed with the backend and operation names.
+    Metrics are exported to Prometheus (or elsewhere) by the exporter
+    configured in the OpenTelemetry SDK.
+    """
+
+    def __init__(self, meter: Optional[metrics.Meter] = None):
+        meter = meter or metrics.get_meter("storages")
+        self._duration = meter.create_histogram(
+            "storages.operation.duration",
+            unit="s",
+            description="Duration of the storage calls.",
+        )
+        self._size = meter.create_counter(
+            "storages.operation.size",
+            unit="By",
+            description="Bytes read or written by the storage calls.",
+        )
+        self._errors = meter.create_counter(
+            "storages.operation.errors",
+            description="Storage calls which raised an error.",
+        )
+
+    def __call__(self, event: OperationEvent):
+        attributes: Dict[str, str] = {
+            "storage.backend": event.backend,
+            "storage.operation": event.operation,
+        }
+        self._duration.record(event.duration, attributes)
+        if event.size is not None:
+            self._size.add(event.size, attributes)
+        if event.error is not None:
+            self._errors.add(
+                1, {**attributes, "error.type": type(event.error).__name__}
+            )
@@ -0,0 +1,360 @@
+import asyncio
+import random
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import BoundedSemaphore, Condition, Lock
+from typing import (
+    AsyncIterable,
+    Callable,
+    Iterable,
+    NamedTuple,
+    Optional,
+    Union,
+)
+
+from storages.backends.async_base import AsyncStorage
+from storages.backends.base import (
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_MAX_CONCURRENCY,
+    BatchResult,
+    Storage,
+)
+from storages.exceptions import ImproperlyConfiguredError
+
+DEFAULT_MAX_IN_FLIGHT_BYTES = 256 * 1024 * 1024
+
+
+class TransferProgress(NamedTuple):
+    files_transferred: int
+    files_failed: int
+    bytes_transferred: int
+    elapsed_time: float
+
+    @property
+    def throughput(self) -> float:
+        """
+        Bytes transferred per second.
+        """
+        if self.elapsed_time <= 0:
+            return 0.0
+        return self.bytes_transferred / self.elapsed_time
+
+
+class _ProgressTracker:
+    def __init__(self, callback: Optional[Callable[[TransferProgress], None]]):
+        self._callback = callback
+        self._lock = Lock()
+        self._start_time = time.monotonic()
+        self._files_transferred = 0
+        self._files_failed = 0
+        self._bytes_transferred = 0
+
+    @property
+    def progress(self) -> TransferProgress:
+        with self._lock:
+            return TransferProgress(
+                files_transferred=self._files_transferred,
+                files_failed=self._files_failed,
+                bytes_transferred=self._bytes_transferred,
+                elapsed_time=time.monotonic() - self._start_time,
+            )
+
+    def add_bytes(self, size: int):
+        with self._lock:
+            self._bytes_transferred += size
+
+    def finish_file(self, failed: bool):
+        with self._lock:
+            if failed:
+                self._files_failed += 1
+            else:
+                self._files_transferred += 1
+        if self._callback is not None:
+            self._callback(self.progress)
+
+
+class _ByteBudget:
+    """
+    Limits the number of bytes held in memory at once. Requests larger than
+    the whole budget wait until nothing else is held.
+    """
+
+    def __init__(self, size: int):
+        self._size = size
+        self._available = size
+        self._condition = Condition()
+
+    def acquire(self, size: int) -> int:
+        size = min(size, self._size)
+        with self._condition:
+            self._condition.wait_for(lambda: self._available >= size)
+            self._available -= size
+        return size
+
+    def release(self, size: int):
+        with self._condition:
+            self._available += size
+            self._condition.notify_all()
+
+
+class _AsyncByteBudget:
+    def __init__(self, size: int):
+        self._size = size
+        self._available = size
+        self._condition: Optional[asyncio.Condition] = None
+
+    async def acquire(self, size: int) -> int:
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        size = min(size, self._size)
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._available >= size)
+            self._available -= size
+        return size
+
+    async def release(self, size: int):
+        async with self._condition:  # type: ignore
+            self._available += size
+            self._condition.notify_all()  # type: ignore
+
+
+class _BaseTransferManager:
+    def __init__(
+        self,
+        *,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_in_flight_bytes: int = DEFAULT_MAX_IN_FLIGHT_BYTES,
+        max_attempts: int = 5,
+        backoff: float = 0.1,
+        max_backoff: float = 10.0,
+        on_progress: Optional[Callable[[TransferProgress], None]] = None,
+    ):
+        if max_concurrency < 1:
+            raise ImproperlyConfiguredError(name="max_concurrency")
+        if max_in_flight_bytes < 1:
+            raise ImproperlyConfiguredError(name="max_in_flight_bytes")
+        if max_attempts < 1:
+            raise ImproperlyConfiguredError(name="max_attempts")
+        self._max_concurrency = max_concurrency
+        self._max_in_flight_bytes = max_in_flight_bytes
+        self._max_attempts = max_attempts
+        self._backoff = backoff
+        self._max_backoff = max_backoff
+        self._on_progress = on_progress
+
+    def _retry_delay(self, attempt: int) -> float:
+        """
+        Returns the exponential backoff delay with full jitter after the
+        given (zero based) attempt failed.
+        """
+        return random.uniform(
+            0, min(self._max_backoff, self._backoff * 2**attempt)
+        )
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        # Errors of the local file system are not going to go away.
+        return not isinstance(
+            error, (FileNotFoundError, IsADirectoryError, PermissionError)
+        )
+
+
+class TransferManager(_BaseTransferManager):
+    """
+    Streams files between storages from a pool of max_concurrency threads,
+    holding at most max_in_flight_bytes of their contents in memory at once.
+    Failed transfers are retried up to max_attempts times, with jittered
+    exponential backoff, and the on_progress callback is called after each
+    file. Files are streamed straight to their names: a failed transfer
+    leaves the destination file untouched on storages discarding the writes
+    failing within their with blocks (uploads to S3 and Google Cloud
+    Storage, atomic writes of FileSystemStorage).
+    """
+
+    def __init__(
+        self,
+        *,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_in_flight_bytes: int = DEFAULT_MAX_IN_FLIGHT_BYTES,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_attempts: int = 5,
+        backoff: float = 0.1,
+        max_backoff: float = 10.0,
+        on_progress: Optional[Callable[[TransferProgress], None]] = None,
+    ):
+        super().__init__(
+            max_concurrency=max_concurrency,
+            max_in_flight_bytes=max_in_flight_bytes,
+            max_attempts=max_attempts,
+            backoff=backoff,
+            max_backoff=max_backoff,
+            on_progress=on_progress,
+        )
+        if chunk_size < 1:
+            raise ImproperlyConfiguredError(name="chunk_size")
+        self._chunk_size = chunk_size
+
+    def transfer(
+        self, source: Storage, destination: Storage, names: Iterable[str]
+    ) -> BatchResult:
+        """
+        Transfers the files specified by names, keeping their names, and
+        returns the number of bytes of every transferred file. Names are
+        consumed lazily, as the pool frees up.
+        """
+        result = BatchResult(results={}, errors={})
+        tracker = _ProgressTracker(self._on_progress)
+        budget = _ByteBudget(self._max_in_flight_bytes)
+        # Keeps the queue of the pool short, so names are not consumed
+        # faster than files are transferred.
+        pending = BoundedSemaphore(2 * self._max_concurrency)
+
+        def run(name: str):
+            try:
+                result.results[name] = self._transfer_file(
+                    source, destination, name, tracker, budget
+                )
+            except Exception as error:
+                result.errors[name] = error
+            tracker.finish_file(failed=name in result.errors)
+
+        with ThreadPoolExecutor(self._max_concurrency) as executor:
+            for name in names:
+                pending.acquire()
+                future: Future = executor.submit(run, name)
+                future.add_done_callback(lambda _: pending.release())
+        return result
+
+    def _transfer_file(
+        self,
+        source: Storage,
+        destination: Storage,
+        name: str,
+        tracker: _ProgressTracker,
+        budget: _ByteBudget,
+    ) -> int:
+        attempt = 0
+        while True:
+            copied = 0
+            try:
+                with source.open_read(name, mode="rb") as source_file:
+                    with destination.open_write(
+                        name, mode="wb"
+                    ) as destination_file:
+                        while True:
+                            size = budget.acquire(self._chunk_size)
+                            try:
+                                chunk = source_file.read(self._chunk_size)
+                                if not chunk:
+                                    break
+                                destination_file.write(chunk)
+                            finally:
+                                budget.release(size)
+                            copied += len(chunk)
+                            tracker.add_bytes(len(chunk))
+                return copied
+            except Exception as error:
+                tracker.add_bytes(-copied)
+                attempt += 1
+                if attempt >= self._max_attempts or not self._is_retryable(
+                    error
+                ):
+                    raise
+            time.sleep(self._retry_delay(attempt - 1))
+
+
+class AsyncTransferManager(_BaseTransferManager):
+    """
+    The asyncio counterpart of TransferManager, running max_concurrency
+    transfers as tasks. AsyncStorage writes whole files, so every file is
+    held in memory while transferred, counted against max_in_flight_bytes.
+    """
+
+    async def transfer(
+        self,
+        source: AsyncStorage,
+        destination: AsyncStorage,
+        names: Union[Iterable[str], AsyncIterable[str]],
+    ) -> BatchResult:
+        result = BatchResult(results={}, errors={})
+        tracker = _ProgressTracker(self._on_progress)
+        budget = _AsyncByteBudget(self._max_in_flight_bytes)
+        queue: "asyncio.Queue[Optional[str]]" = asyncio.Queue(
+            maxsize=2 * self._max_concurrency
+        )
+
+        async def work():
+            while True:
+                name = await queue.get()
+                if name is None:
+                    return
+                try:
+                    result.results[name] = await self._transfer_file(
+                        source, destination, name, tracker, budget
+                    )
+                except Exception as error:
+                    result.errors[name] = error
+                tracker.finish_file(failed=name in result.errors)
+
+        workers = [
+            asyncio.ensure_future(work()) for _ in range(self._max_concurrency)
+        ]
+        try:
+            if isinstance(names, AsyncIterable):
+                async for name in names:
+                    await queue.put(name)
+            else:
+                for name in names:
+                    await queue.put(name)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+        return result
+
+    async def _transfer_file(
+        self,
+        source: AsyncStorage,
+        destination: AsyncStorage,
+        name: str,
+        tracker: _ProgressTracker,
+        budget: _AsyncByteBudget,
+    ) -> int:
+        attempt = 0
+        while True:
+            try:
+                size = await budget.acquire(await source.size(name))
+                try:
+                    content = b"".join(
+                        [chunk async for chunk in source.iter_chunks(name)]
+                    )
+                    await destination.write(name, content, mode="wb")
+                finally:
+                    await budget.release(size)
+                tracker.add_bytes(len(content))
+                return len(content)
+            except Exception as error:
+                attempt += 1
+                if attempt >= self._max_attempts or not self._is_retryable(
+                    error
+                ):
+                    raise
+            await asyncio.sleep(self._retry_delay(attempt - 1))
+
+
+def transfer(
+    source: Storage,
+    destination: Storage,
+    names: Iterable[str],
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> BatchResult:
+    """
+    Streams the files specified by names from the source storage to the
+    destination storage under the same names, max_concurrency files at a
+    time, see TransferManager.
+    """
+    return TransferManager(max_concurrency=max_concurrency).transfer(
+        source, destination, names
+    )
@@ -9,3 +9,19 @@ class TestAbstractStorage(TestCase):
     def test_initialization_raises_exception(self):
         with pytest.raises(TypeError):
             Storage()
+
+    def test_prefetched_pages(self):
+        pages = iter([[1, 2], [3]])
+        assert list(Storage._iterate_pages(pages, prefetch_pages=1)) == [
+            1,
+            2,
+            3,
+        ]
+
+    def test_prefetched_pages_error(self):
+        def pages():
+            yield [1]
+            raise ValueError()
+
+        with pytest.raises(ValueError):
+            list(Storage._iterate_pages(pages(), prefetch_pages=1))
@@ -0,0 +1,140 @@
+import asyncio
+from datetime import datetime, timedelta
+from os import environ
+from unittest import TestCase
+from uuid import uuid4
+
+import pytest
+
+from storages.backends.async_amazon_s3 import AsyncAmazonS3Storage
+from storages.backends.async_base import AsyncStorage
+from storages.exceptions import ImproperlyConfiguredError
+
+
+class async_aws_temp_file:
+    CONTENT = "Lorem ipsum dolor sit amet..."
+    CONTENT_BINARY = b"Binary lorem ipsum dolor sit amet..."
+
+    def __init__(self, storage: AsyncStorage, binary: bool = False):
+        self._storage = storage
+        self._binary = binary
+        self._file_name = str(uuid4())
+
+    async def __aenter__(self):
+        await self._storage.write(
+            name=self._file_name,
+            content=self.CONTENT_BINARY if self._binary else self.CONTENT,
+        )
+        return self._file_name
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self._storage.delete(self._file_name)
+
+
+class TestAsyncAWSS3Storage(TestCase):
+    @pytest.fixture(autouse=True)
+    def init_storage(self):
+        self._loop = asyncio.new_event_loop()
+        self._storage = AsyncAmazonS3Storage(
+            aws_access_key_id=environ.get("STORAGES_AWS_ACCESS_KEY_ID"),
+            aws_secret_access_key=environ.get(
+                "STORAGES_AWS_SECRET_ACCESS_KEY"
+            ),
+            aws_bucket_name=environ.get("STORAGES_AWS_BUCKET_NAME"),
+        )
+        yield
+        self._run(self._storage.close())
+        self._loop.close()
+
+    def _run(self, coroutine):
+        return self._loop.run_until_complete(coroutine)
+
+    def test_improper_initialization(self):
+        with pytest.raises(ImproperlyConfiguredError):
+            AsyncAmazonS3Storage(
+                aws_access_key_id="",
+                aws_secret_access_key="",
+                aws_bucket_name="",
+            )
+        with pytest.raises(ImproperlyConfiguredError):
+            AsyncAmazonS3Storage(
+                aws_access_key_id="some_key",
+                aws_secret_access_key="some_secret",
+                aws_bucket_name="some_bucket",
+                aws_max_pool_connections=0,
+            )
+
+    def test_file_not_exists(self):
+        assert not self._run(self._storage.exists("some_non_existent.file"))
+
+    def test_file_exists_upon_writing(self):
+        async def test():
+            async with async_aws_temp_file(self._storage) as temp_file:
+                assert await self._storage.exists(temp_file)
+
+        self._run(test())
+
+    def test_file_contains_written_data(self):
+        async def test():
+            async with async_aws_temp_file(self._storage) as temp_file:
+                assert (
+                    await self._storage.read(temp_file)
+                    == async_aws_temp_file.CONTENT
+                )
+                assert (
+                    await self._storage.read_range(temp_file, 6, 11)
+                    == async_aws_temp_file.CONTENT[6:11].encode()
+                )
+                chunks = [
+                    chunk
+                    async for chunk in self._storage.iter_chunks(temp_file, 8)
+                ]
+                assert b"".join(chunks) == async_aws_temp_file.CONTENT.encode()
+
+        self._run(test())
+
+    def test_file_does_not_exist_upon_writing_and_deletion(self):
+        async def test():
+            async with async_aws_temp_file(self._storage) as temp_file:
+                await self._storage.delete(temp_file)
+                assert not await self._storage.exists(temp_file)
+
+        self._run(test())
+
+    def test_file_metadata(self):
+        async def test():
+            async with async_aws_temp_file(self._storage) as temp_file:
+                stat = await self._storage.stat(temp_file)
+                assert stat.size == len(async_aws_temp_file.CONTENT)
+                assert await self._storage.size(temp_file) == stat.size
+                modification_time = await self._storage.get_modified_time(
+                    temp_file
+                )
+                assert modification_time.replace(
+                    tzinfo=None
+                ) - datetime.now() < timedelta(seconds=10)
+
+        self._run(test())
+
+    def test_file_creation_and_access_time(self):
+        with pytest.raises(NotImplementedError):
+            self._run(self._storage.get_created_time("any_name.ext"))
+        with pytest.raises(NotImplementedError):
+            self._run(self._storage.get_access_time("any_name.ext"))
+
+    def test_file_append_not_supported(self):
+        with pytest.raises(NotImplementedError):
+            self._run(self._storage.write("any_name.ext", "content", "a"))
+
+    def test_files_listed_by_prefix(self):
+        async def test():
+            async with async_aws_temp_file(self._storage) as temp_file:
+                entries = [
+                    entry
+                    async for entry in self._storage.list(
+                        temp_file, prefetch_pages=1
+                    )
+                ]
+                assert [entry.name for entry in entries] == [temp_file]
+
+        self._run(test())
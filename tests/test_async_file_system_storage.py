@@ -0,0 +1,115 @@
+import asyncio
+from unittest import TestCase
+
+import pytest
+
+from storages.backends.async_file_system import AsyncFileSystemStorage
+from storages.exceptions import ImproperlyConfiguredError
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+async def collect(iterator):
+    return [item async for item in iterator]
+
+
+class TestAsyncFileSystemStorage(TestCase):
+    _TEST_FILE_NAME = "test_file.txt"
+    _TEST_FILE_CONTENT = "Lorem ipsum dolor sit amet..."
+    _TEST_FILE_CONTENT_BINARY = b"Binary lorem ipsum dolor sit amet..."
+
+    @pytest.fixture(autouse=True)
+    def init_storage(self, tmpdir):
+        self._storage = AsyncFileSystemStorage(path=tmpdir, max_workers=4)
+        yield
+        run(self._storage.close())
+
+    def test_improper_storage_initialization(self):
+        with pytest.raises(ImproperlyConfiguredError):
+            AsyncFileSystemStorage(path="")
+        with pytest.raises(ImproperlyConfiguredError):
+            AsyncFileSystemStorage(path="some_path", max_workers=0)
+
+    def test_file_not_exists(self):
+        assert not run(self._storage.exists(self._TEST_FILE_NAME))
+
+    def test_file_exists_upon_writing(self):
+        self._write_contents_to_file()
+        assert run(self._storage.exists(self._TEST_FILE_NAME))
+
+    def test_file_contains_written_data(self):
+        self._write_contents_to_file()
+        assert (
+            run(self._storage.read(self._TEST_FILE_NAME))
+            == self._TEST_FILE_CONTENT
+        )
+
+    def test_file_read_in_chunks(self):
+        self._write_contents_to_file(binary=True)
+        chunks = run(
+            collect(self._storage.iter_chunks(self._TEST_FILE_NAME, 8))
+        )
+        assert all(len(chunk) <= 8 for chunk in chunks)
+        assert b"".join(chunks) == self._TEST_FILE_CONTENT_BINARY
+
+    def test_file_range_read(self):
+        self._write_contents_to_file(binary=True)
+        assert (
+            run(self._storage.read_range(self._TEST_FILE_NAME, 7, 12))
+            == self._TEST_FILE_CONTENT_BINARY[7:12]
+        )
+
+    def test_file_does_not_exist_upon_writing_and_deletion(self):
+        self._write_contents_to_file()
+        run(self._storage.delete(self._TEST_FILE_NAME))
+        assert not run(self._storage.exists(self._TEST_FILE_NAME))
+
+    def test_file_metadata(self):
+        self._write_contents_to_file()
+        stat = run(self._storage.stat(self._TEST_FILE_NAME))
+        assert stat.size == len(self._TEST_FILE_CONTENT)
+        assert run(self._storage.size(self._TEST_FILE_NAME)) == stat.size
+        assert (
+            run(self._storage.get_created_time(self._TEST_FILE_NAME))
+            == stat.created_time
+        )
+        assert (
+            run(self._storage.get_modified_time(self._TEST_FILE_NAME))
+            == stat.modified_time
+        )
+        assert run(self._storage.get_access_time(self._TEST_FILE_NAME))
+
+    def test_files_listed(self):
+        self._write_contents_to_file()
+        entries = run(collect(self._storage.list(prefetch_pages=1)))
+        assert [entry.name for entry in entries] == [self._TEST_FILE_NAME]
+
+    def test_concurrent_operations(self):
+        async def write_and_read(index: int) -> str:
+            name = f"{index}.txt"
+            await self._storage.write(name, str(index))
+            return await self._storage.read(name)
+
+        async def run_all():
+            return await asyncio.gather(*map(write_and_read, range(50)))
+
+        assert run(run_all()) == [str(index) for index in range(50)]
+
+    def _write_contents_to_file(self, binary: bool = False):
+        run(
+            self._storage.write(
+                self._TEST_FILE_NAME,
+                content=(
+                    self._TEST_FILE_CONTENT_BINARY
+                    if binary
+                    else self._TEST_FILE_CONTENT
+                ),
+                mode="xb" if binary else "x",
+            )
+        )
@@ -1,13 +1,16 @@
 from datetime import datetime, timedelta
 from os import environ
-from unittest import TestCase
+from unittest import TestCase, mock
 from uuid import uuid4
 
 import pytest
 
 from storages.backends.amazon_s3 import AmazonS3Storage
 from storages.backends.base import Storage
-from storages.exceptions import ImproperlyConfiguredError
+from storages.exceptions import (
+    ConcurrentModificationError,
+    ImproperlyConfiguredError,
+)
 
 
 class aws_temp_file:
@@ -61,6 +64,13 @@ class TestAWSS3Storage(TestCase):
                 aws_secret_access_key="some_secret",
                 aws_bucket_name="",
             )
+        with pytest.raises(ImproperlyConfiguredError):
+            AmazonS3Storage(
+                aws_access_key_id="some_key",
+                aws_secret_access_key="some_secret",
+                aws_bucket_name="some_bucket",
+                aws_multipart_part_size=1024,
+            )
 
     def test_file_not_exists(self):
         assert not self._storage.exists("some_non_existent.file")
@@ -103,3 +113,225 @@ class TestAWSS3Storage(TestCase):
                 temp_file
             ).replace(tzinfo=None)
             assert modification_time - datetime.now() < timedelta(seconds=10)
+
+    def test_file_written_through_open_write(self):
+        with aws_temp_file(storage=self._storage) as temp_file:
+            with self._storage.open_write(temp_file) as file:
+                file.write(aws_temp_file.CONTENT_BINARY)
+            assert (
+                self._storage.read(temp_file, mode="rb")
+                == aws_temp_file.CONTENT_BINARY
+            )
+
+    def test_failed_open_write_not_uploaded(self):
+        with aws_temp_file(storage=self._storage) as temp_file:
+            for mode in ("wb", "w", "a"):
+                with pytest.raises(RuntimeError):
+                    with self._storage.open_write(temp_file, mode) as file:
+                        file.write(b"partial" if "b" in mode else "partial")
+                        raise RuntimeError
+                assert self._storage.read(temp_file) == aws_temp_file.CONTENT
+
+    def test_file_read_through_open_read(self):
+        with aws_temp_file(storage=self._storage) as temp_file:
+            with self._storage.open_read(temp_file, mode="r") as file:
+                assert file.read() == aws_temp_file.CONTENT
+
+    def test_file_read_in_chunks(self):
+        with aws_temp_file(storage=self._storage, binary=True) as temp_file:
+            chunks = list(self._storage.iter_chunks(temp_file, 8))
+            assert all(len(chunk) <= 8 for chunk in chunks)
+            assert b"".join(chunks) == aws_temp_file.CONTENT_BINARY
+
+    def test_large_file_written_in_parts(self):
+        storage = AmazonS3Storage(
+            aws_access_key_id=environ.get("STORAGES_AWS_ACCESS_KEY_ID"),
+            aws_secret_access_key=environ.get(
+                "STORAGES_AWS_SECRET_ACCESS_KEY"
+            ),
+            aws_bucket_name=environ.get("STORAGES_AWS_BUCKET_NAME"),
+            aws_multipart_threshold=5 * 1024 * 1024,
+            aws_multipart_part_size=5 * 1024 * 1024,
+            aws_max_concurrency=3,
+        )
+        content = aws_temp_file.CONTENT_BINARY * 350000
+        with aws_temp_file(storage=storage) as temp_file:
+            storage.write(temp_file, content, mode="wb")
+            assert storage.read(temp_file, mode="rb") == content
+
+    def test_file_written_if_changed(self):
+        with aws_temp_file(storage=self._storage) as temp_file:
+            assert not self._storage.write_if_changed(
+                temp_file, aws_temp_file.CONTENT
+            )
+            assert self._storage.write_if_changed(
+                temp_file, aws_temp_file.CONTENT_BINARY
+            )
+            assert self._storage.read(temp_file, mode="rb") == (
+                aws_temp_file.CONTENT_BINARY
+            )
+        name = str(uuid4())
+        assert self._storage.write_if_changed(name, aws_temp_file.CONTENT)
+        self._storage.delete(name)
+
+    def test_large_file_written_in_parts_if_changed(self):
+        storage = AmazonS3Storage(
+            aws_access_key_id=environ.get("STORAGES_AWS_ACCESS_KEY_ID"),
+            aws_secret_access_key=environ.get(
+                "STORAGES_AWS_SECRET_ACCESS_KEY"
+            ),
+            aws_bucket_name=environ.get("STORAGES_AWS_BUCKET_NAME"),
+            aws_multipart_threshold=5 * 1024 * 1024,
+            aws_multipart_part_size=5 * 1024 * 1024,
+        )
+        content = aws_temp_file.CONTENT_BINARY * 350000
+        with aws_temp_file(storage=storage) as temp_file:
+            assert storage.write_if_changed(temp_file, content)
+            assert not storage.write_if_changed(temp_file, content)
+            storage.write(temp_file, content[::-1], mode="wb")
+            assert not storage.write_if_changed(temp_file, content[::-1])
+            assert storage.read(temp_file, mode="rb") == content[::-1]
+
+    def test_concurrently_modified_file_not_overwritten(self):
+        with aws_temp_file(storage=self._storage) as temp_file:
+            head_object = self._storage._client.head_object
+
+            def head_before_concurrent_write(**kwargs):
+                response = head_object(**kwargs)
+                self._storage.write(temp_file, "concurrent")
+                return response
+
+            with mock.patch.object(
+                self._storage._client,
+                "head_object",
+                head_before_concurrent_write,
+            ):
+                with pytest.raises(ConcurrentModificationError):
+                    self._storage.write_if_changed(temp_file, "changed")
+            assert self._storage.read(temp_file) == "concurrent"
+
+    def test_file_appended(self):
+        with aws_temp_file(storage=self._storage) as temp_file:
+            self._storage.write(temp_file, "+appended", mode="a")
+            with self._storage.open_write(temp_file, mode="a") as file:
+                file.write("+streamed")
+            assert self._storage.read(temp_file) == (
+                aws_temp_file.CONTENT + "+appended+streamed"
+            )
+            self._storage.write(temp_file, "replaced")
+            assert self._storage.read(temp_file) == "replaced"
+
+    def test_large_file_appended_by_copying_parts(self):
+        content = aws_temp_file.CONTENT_BINARY * 150000
+        with aws_temp_file(storage=self._storage) as temp_file:
+            self._storage.write(temp_file, content, mode="wb")
+            with mock.patch.object(
+                self._storage._client,
+                "upload_part_copy",
+                wraps=self._storage._client.upload_part_copy,
+            ) as upload_part_copy:
+                self._storage.write(temp_file, b"+appended", mode="ab")
+            upload_part_copy.assert_called_once()
+            assert self._storage.read(temp_file, mode="rb") == (
+                content + b"+appended"
+            )
+
+    def test_small_file_merged_with_large_appended_data(self):
+        content = aws_temp_file.CONTENT_BINARY * 300000
+        with aws_temp_file(storage=self._storage, binary=True) as temp_file:
+            self._storage.write(temp_file, content, mode="ab")
+            assert self._storage.read(temp_file, mode="rb") == (
+                aws_temp_file.CONTENT_BINARY + content
+            )
+
+    def test_append_retried_on_concurrent_modification(self):
+        with aws_temp_file(storage=self._storage) as temp_file:
+            stale_head = self._storage._head(temp_file)
+            self._storage.write(temp_file, "concurrent")
+            with mock.patch.object(
+                self._storage,
+                "_head",
+                side_effect=[stale_head, self._storage._head(temp_file)],
+            ) as head:
+                self._storage.write(temp_file, "+appended", mode="a")
+            assert head.call_count == 2
+            assert self._storage.read(temp_file) == "concurrent+appended"
+
+    def test_file_range_read(self):
+        with aws_temp_file(storage=self._storage, binary=True) as temp_file:
+            content = aws_temp_file.CONTENT_BINARY
+            assert self._storage.read_range(temp_file, 7, 12) == content[7:12]
+            assert self._storage.read_range(temp_file, 7) == content[7:]
+
+    def test_file_read_in_parallel(self):
+        with aws_temp_file(storage=self._storage, binary=True) as temp_file:
+            content = self._storage.read_parallel(
+                temp_file, part_size=4, max_concurrency=3
+            )
+            assert content == aws_temp_file.CONTENT_BINARY
+
+    def test_file_stat(self):
+        with aws_temp_file(storage=self._storage) as temp_file:
+            stat = self._storage.stat(temp_file)
+            assert stat.size == len(aws_temp_file.CONTENT)
+            assert stat.modified_time == self._storage.get_modified_time(
+                temp_file
+            )
+            assert stat.etag
+
+    def test_file_copied(self):
+        with aws_temp_file(storage=self._storage) as temp_file:
+            destination = f"{temp_file}-copy"
+            self._storage.copy(temp_file, destination)
+            try:
+                assert self._storage.read(destination) == aws_temp_file.CONTENT
+                assert self._storage.exists(temp_file)
+            finally:
+                self._storage.delete(destination)
+
+    def test_large_file_copied_in_parts(self):
+        storage = AmazonS3Storage(
+            aws_access_key_id=environ.get("STORAGES_AWS_ACCESS_KEY_ID"),
+            aws_secret_access_key=environ.get(
+                "STORAGES_AWS_SECRET_ACCESS_KEY"
+            ),
+            aws_bucket_name=environ.get("STORAGES_AWS_BUCKET_NAME"),
+            aws_multipart_threshold=5 * 1024 * 1024,
+            aws_multipart_part_size=5 * 1024 * 1024,
+        )
+        content = aws_temp_file.CONTENT_BINARY * 350000
+        with aws_temp_file(storage=storage) as temp_file:
+            storage.write(temp_file, content, mode="wb")
+            destination = f"{temp_file}-copy"
+            storage.copy(temp_file, destination)
+            try:
+                assert storage.read(destination, mode="rb") == content
+            finally:
+                storage.delete(destination)
+
+    def test_file_moved(self):
+        with aws_temp_file(storage=self._storage) as temp_file:
+            destination = f"{temp_file}-moved"
+            self._storage.move(temp_file, destination)
+            assert not self._storage.exists(temp_file)
+            try:
+                assert self._storage.read(destination) == aws_temp_file.CONTENT
+            finally:
+                self._storage.delete(destination)
+
+    def test_files_deleted_in_batch(self):
+        with aws_temp_file(storage=self._storage) as first_file, aws_temp_file(
+            storage=self._storage
+        ) as second_file:
+            result = self._storage.delete_many((first_file, second_file))
+            assert result.results == {first_file: None, second_file: None}
+            assert not result.errors
+            existence = self._storage.exists_many((first_file, second_file))
+            assert not any(existence.results.values())
+
+    def test_files_listed_by_prefix(self):
+        with aws_temp_file(storage=self._storage) as temp_file:
+            entries = list(self._storage.list(temp_file, prefetch_pages=1))
+            assert [(entry.name, entry.size) for entry in entries] == [
+                (temp_file, len(aws_temp_file.CONTENT))
+            ]
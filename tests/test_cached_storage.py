@@ -0,0 +1,130 @@
+import os
+from unittest import TestCase, mock
+
+import pytest
+
+from storages.backends.cached import CachedStorage
+from storages.backends.file_system import FileSystemStorage
+from storages.exceptions import ImproperlyConfiguredError
+
+
+class TestCachedStorage(TestCase):
+    _TEST_FILE_NAME = "test_file.txt"
+    _TEST_FILE_CONTENT = "Lorem ipsum dolor sit amet..."
+
+    @pytest.fixture(autouse=True)
+    def init_storage(self, tmpdir):
+        self._remote_path = tmpdir.mkdir("remote")
+        self._cache_path = tmpdir.mkdir("cache")
+        self._wrapped_storage = mock.Mock(
+            wraps=FileSystemStorage(self._remote_path)
+        )
+        self._storage = CachedStorage(
+            self._wrapped_storage, path=self._cache_path, max_size=1024
+        )
+        self._storage.write(self._TEST_FILE_NAME, self._TEST_FILE_CONTENT)
+
+    def _cached_size(self):
+        return sum(
+            os.path.getsize(os.path.join(directory, name))
+            for directory, _, names in os.walk(self._cache_path)
+            for name in names
+        )
+
+    def test_improper_initialization(self):
+        with pytest.raises(ImproperlyConfiguredError):
+            CachedStorage(
+                self._wrapped_storage, path=self._cache_path, max_size=0
+            )
+
+    def test_read_through(self):
+        assert (
+            self._storage.read(self._TEST_FILE_NAME) == self._TEST_FILE_CONTENT
+        )
+        assert (
+            self._storage.read(self._TEST_FILE_NAME, mode="rb")
+            == self._TEST_FILE_CONTENT.encode()
+        )
+        with self._storage.open_read(self._TEST_FILE_NAME) as file:
+            assert file.read() == self._TEST_FILE_CONTENT.encode()
+        assert self._storage.read_range(self._TEST_FILE_NAME, 6, 11) == (
+            b"ipsum"
+        )
+        assert (
+            b"".join(self._storage.iter_chunks(self._TEST_FILE_NAME, 4))
+            == self._TEST_FILE_CONTENT.encode()
+        )
+        assert self._wrapped_storage.open_read.call_count == 1
+        statistics = self._storage.statistics
+        assert statistics.misses == 1
+        assert statistics.hits == 4
+
+    def test_outdated_copy_refetched(self):
+        self._storage.read(self._TEST_FILE_NAME)
+        FileSystemStorage(self._remote_path).write(
+            self._TEST_FILE_NAME, "changed", mode="w"
+        )
+        assert self._storage.read(self._TEST_FILE_NAME) == "changed"
+        assert self._storage.statistics.misses == 2
+        assert self._cached_size() == len("changed")
+
+    def test_unvalidated_reads_skip_remote(self):
+        storage = CachedStorage(
+            self._wrapped_storage,
+            path=self._cache_path,
+            max_size=1024,
+            validate=False,
+        )
+        storage.read(self._TEST_FILE_NAME)
+        storage.read(self._TEST_FILE_NAME)
+        self._wrapped_storage.stat.assert_not_called()
+        assert self._wrapped_storage.open_read.call_count == 1
+
+    def test_least_recently_used_copies_evicted(self):
+        storage = CachedStorage(
+            self._wrapped_storage,
+            path=self._cache_path,
+            max_size=2 * len(self._TEST_FILE_CONTENT),
+        )
+        for name in ("a.txt", "b.txt"):
+            storage.write(name, self._TEST_FILE_CONTENT)
+        for name in (self._TEST_FILE_NAME, "a.txt"):
+            storage.read(name)
+        storage.read(self._TEST_FILE_NAME)
+        storage.read("b.txt")
+        assert storage.statistics.evictions == 1
+        assert self._cached_size() <= 2 * len(self._TEST_FILE_CONTENT)
+        storage.read(self._TEST_FILE_NAME)
+        storage.read("a.txt")
+        assert storage.statistics.misses == 4
+
+    def test_cache_directory_scanned_once(self):
+        cache = self._storage._cache
+        with mock.patch.object(cache, "list", wraps=cache.list) as listing:
+            for name in ("a.txt", "b.txt", "c.txt"):
+                self._storage.write(name, self._TEST_FILE_CONTENT)
+                self._storage.read(name)
+        assert listing.call_args_list.count(mock.call()) == 1
+        assert self._storage.statistics.misses == 3
+
+    def test_copies_invalidated_on_write_and_delete(self):
+        self._storage.read(self._TEST_FILE_NAME)
+        self._storage.write(self._TEST_FILE_NAME, "appended", mode="a")
+        assert self._cached_size() == 0
+        assert (
+            self._storage.read(self._TEST_FILE_NAME)
+            == self._TEST_FILE_CONTENT + "appended"
+        )
+        self._storage.delete(self._TEST_FILE_NAME)
+        assert self._cached_size() == 0
+        with pytest.raises(FileNotFoundError):
+            self._storage.read(self._TEST_FILE_NAME)
+
+    def test_cache_shared_between_instances(self):
+        self._storage.read(self._TEST_FILE_NAME)
+        storage = CachedStorage(
+            self._wrapped_storage, path=self._cache_path, max_size=1024
+        )
+        assert storage.read(self._TEST_FILE_NAME) == self._TEST_FILE_CONTENT
+        assert storage.statistics.hits == 1
+        assert self._wrapped_storage.open_read.call_count == 1
@@ -0,0 +1,176 @@
+import gzip
+import os
+from unittest import TestCase, mock
+
+import pytest
+import zstandard
+
+from storages.backends.compressed import CompressedStorage, GzipCodec
+from storages.backends.file_system import FileSystemStorage
+from storages.exceptions import ImproperlyConfiguredError
+
+
+class TestCompressedStorage(TestCase):
+    _TEST_FILE_CONTENT = '{"lorem": "ipsum dolor sit amet..."}\n' * 100
+    _CODEC_FILE_NAMES = ("test_file.json", "test_file.csv", "test_file.lz4")
+
+    @pytest.fixture(autouse=True)
+    def init_storage(self, tmpdir):
+        self._path = str(tmpdir)
+        self._wrapped_storage = FileSystemStorage(self._path)
+        self._storage = CompressedStorage(
+            self._wrapped_storage,
+            codecs={
+                "*.json": "zstd",
+                "*.csv": GzipCodec(level=9),
+                "*.lz4": "lz4",
+            },
+        )
+
+    def _stored_size(self, name):
+        return os.path.getsize(os.path.join(self._path, name))
+
+    def test_improper_initialization(self):
+        with pytest.raises(ImproperlyConfiguredError):
+            CompressedStorage(self._wrapped_storage, codecs={"*": "rar"})
+
+    def test_file_compressed(self):
+        for name in self._CODEC_FILE_NAMES:
+            self._storage.write(name, self._TEST_FILE_CONTENT, mode="w")
+            assert self._stored_size(name) < len(self._TEST_FILE_CONTENT)
+            assert self._storage.read(name) == self._TEST_FILE_CONTENT
+            assert self._storage.read(name, mode="rb") == (
+                self._TEST_FILE_CONTENT.encode()
+            )
+
+    def test_file_compressed_through_open_write(self):
+        for name in self._CODEC_FILE_NAMES:
+            with self._storage.open_write(name, mode="w") as file:
+                file.write(self._TEST_FILE_CONTENT)
+            assert self._stored_size(name) < len(self._TEST_FILE_CONTENT)
+            with self._storage.open_read(name, mode="rb") as file:
+                assert file.read() == self._TEST_FILE_CONTENT.encode()
+            with self._storage.open_read(name, mode="r") as file:
+                assert (
+                    file.readline()
+                    == self._TEST_FILE_CONTENT.split("\n")[0] + "\n"
+                )
+
+    def test_uncompressed_size_reported(self):
+        for name in self._CODEC_FILE_NAMES:
+            self._storage.write(name, self._TEST_FILE_CONTENT, mode="w")
+            with self._storage.open_write(f"streamed.{name}", mode="wb") as f:
+                f.write(self._TEST_FILE_CONTENT.encode())
+            for written_name in (name, f"streamed.{name}"):
+                size = len(self._TEST_FILE_CONTENT)
+                assert self._storage.size(written_name) == size
+                assert self._storage.stat(written_name).size == size
+
+    def test_failed_open_write_not_published(self):
+        storage = CompressedStorage(
+            FileSystemStorage(self._path, atomic_writes=True),
+            codecs={"*.json": "zstd"},
+        )
+        for mode in ("wb", "w"):
+            with pytest.raises(RuntimeError):
+                with storage.open_write("failed.json", mode=mode) as file:
+                    content = self._TEST_FILE_CONTENT
+                    file.write(content.encode() if "b" in mode else content)
+                    raise RuntimeError
+            assert not storage.exists("failed.json")
+        assert os.listdir(self._path) == []
+
+    def test_file_read_in_range_and_chunks(self):
+        content = self._TEST_FILE_CONTENT.encode()
+        for name in self._CODEC_FILE_NAMES:
+            self._storage.write(name, self._TEST_FILE_CONTENT, mode="w")
+            assert self._storage.read_range(name, 50, 3000) == content[50:3000]
+            assert self._storage.read_range(name, 3000) == content[3000:]
+            assert b"".join(self._storage.iter_chunks(name, 100)) == content
+            assert self._storage.read_parallel(name) == content
+
+    def test_codec_recognized_by_magic_number(self):
+        self._wrapped_storage.write(
+            "gzipped.json",
+            gzip.compress(self._TEST_FILE_CONTENT.encode()),
+            mode="wb",
+        )
+        self._wrapped_storage.write(
+            "plain.json", self._TEST_FILE_CONTENT, mode="w"
+        )
+        for name in ("gzipped.json", "plain.json"):
+            assert self._storage.read(name) == self._TEST_FILE_CONTENT
+            assert self._storage.size(name) == len(self._TEST_FILE_CONTENT)
+
+    def test_unmatched_file_not_compressed(self):
+        self._storage.write("test_file.txt", self._TEST_FILE_CONTENT, mode="w")
+        assert self._stored_size("test_file.txt") == len(
+            self._TEST_FILE_CONTENT
+        )
+        assert self._storage.read("test_file.txt") == self._TEST_FILE_CONTENT
+
+    def test_uncompressed_size_read_without_decompressing(self):
+        for name in self._CODEC_FILE_NAMES:
+            with self._storage.open_write(name, mode="wb") as file:
+                file.write(self._TEST_FILE_CONTENT.encode())
+            with mock.patch.object(
+                self._storage, "open_read", side_effect=AssertionError
+            ):
+                assert self._storage.size(name) == len(self._TEST_FILE_CONTENT)
+
+    def test_uncompressed_size_read_in_two_calls(self):
+        wrapped_storage = mock.Mock(wraps=self._wrapped_storage)
+        storage = CompressedStorage(
+            wrapped_storage, codecs={"*.json": "zstd", "*.csv": "gzip"}
+        )
+        for name in ("test_file.json", "test_file.csv"):
+            storage.write(name, self._TEST_FILE_CONTENT, mode="w")
+            wrapped_storage.reset_mock()
+            assert storage.size(name) == len(self._TEST_FILE_CONTENT)
+            assert storage.stat(name).size == len(self._TEST_FILE_CONTENT)
+            assert wrapped_storage.size.call_count == 1
+            assert wrapped_storage.stat.call_count == 1
+            assert wrapped_storage.read_range.call_count == 2
+
+    def test_unrecorded_uncompressed_size_counted(self):
+        with zstandard.ZstdCompressor().stream_writer(
+            self._wrapped_storage.open_write("streamed.json", mode="wb")
+        ) as file:
+            file.write(self._TEST_FILE_CONTENT.encode())
+        assert self._storage.read("streamed.json") == self._TEST_FILE_CONTENT
+        assert self._storage.size("streamed.json") == len(
+            self._TEST_FILE_CONTENT
+        )
+
+    def test_default_mode_of_wrapped_storage_kept(self):
+        for name in self._CODEC_FILE_NAMES:
+            self._storage.write(name, self._TEST_FILE_CONTENT)
+            with pytest.raises(FileExistsError):
+                self._storage.write(name, self._TEST_FILE_CONTENT)
+            with pytest.raises(FileExistsError):
+                self._storage.open_write(name)
+            assert self._storage.read(name) == self._TEST_FILE_CONTENT
+
+    def test_compressed_file_appended(self):
+        for name in self._CODEC_FILE_NAMES:
+            self._storage.write(name, self._TEST_FILE_CONTENT, mode="a")
+            self._storage.write(name, "appended\n", mode="a")
+            with self._storage.open_write(name, mode="a") as file:
+                file.write("streamed\n")
+            content = self._TEST_FILE_CONTENT + "appended\nstreamed\n"
+            assert self._stored_size(name) < len(content)
+            assert self._storage.read(name) == content
+            assert self._storage.size(name) == len(content)
+
+    def test_uncompressed_file_appended_uncompressed(self):
+        self._wrapped_storage.write(
+            "plain.json", self._TEST_FILE_CONTENT, mode="w"
+        )
+        self._storage.write("plain.json", "appended\n", mode="a")
+        assert self._wrapped_storage.read("plain.json") == (
+            self._TEST_FILE_CONTENT + "appended\n"
+        )
+
+    def test_compressed_file_not_updated(self):
+        with pytest.raises(NotImplementedError):
+            self._storage.write("test_file.json", "content", mode="r+")
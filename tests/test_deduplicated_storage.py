@@ -0,0 +1,164 @@
+import os
+from unittest import TestCase, mock
+
+import pytest
+
+from storages.backends.deduplicated import DeduplicatedStorage
+from storages.backends.file_system import FileSystemStorage
+from storages.exceptions import (
+    ConcurrentModificationError,
+    ImproperlyConfiguredError,
+)
+
+
+class TestDeduplicatedStorage(TestCase):
+    _TEST_FILE_NAME = "test_file.txt"
+    _TEST_FILE_CONTENT = "Lorem ipsum dolor sit amet..."
+
+    @pytest.fixture(autouse=True)
+    def init_storage(self, tmpdir):
+        self._path = str(tmpdir.mkdir("blobs"))
+        self._index_path = str(tmpdir.join("index.sqlite3"))
+        self._wrapped_storage = mock.Mock(
+            wraps=FileSystemStorage(self._path, make_directories=True)
+        )
+        self._storage = DeduplicatedStorage(
+            self._wrapped_storage, index_path=self._index_path
+        )
+        self._storage.write(self._TEST_FILE_NAME, self._TEST_FILE_CONTENT)
+        yield
+        self._storage.close()
+
+    def _blob_count(self):
+        return sum(len(names) for _, _, names in os.walk(self._path))
+
+    def test_improper_initialization(self):
+        with pytest.raises(ImproperlyConfiguredError):
+            DeduplicatedStorage(
+                self._wrapped_storage,
+                index_path=self._index_path,
+                algorithm="unknown",
+            )
+
+    def test_file_read(self):
+        assert self._storage.read(self._TEST_FILE_NAME) == (
+            self._TEST_FILE_CONTENT
+        )
+        with self._storage.open_read(self._TEST_FILE_NAME) as file:
+            assert file.read() == self._TEST_FILE_CONTENT.encode()
+        assert self._storage.read_range(self._TEST_FILE_NAME, 6, 11) == (
+            b"ipsum"
+        )
+        assert self._storage.size(self._TEST_FILE_NAME) == len(
+            self._TEST_FILE_CONTENT
+        )
+        assert self._storage.exists(self._TEST_FILE_NAME)
+        assert not self._storage.exists("missing.txt")
+
+    def test_identical_content_stored_once(self):
+        self._storage.write("copy.txt", self._TEST_FILE_CONTENT)
+        with self._storage.open_write("streamed.txt", mode="w") as file:
+            file.write(self._TEST_FILE_CONTENT)
+        self._wrapped_storage.write.assert_called_once()
+        self._wrapped_storage.open_write.assert_not_called()
+        assert self._blob_count() == 1
+        assert self._storage.read("streamed.txt") == self._TEST_FILE_CONTENT
+        assert self._storage.stat("copy.txt").etag == (
+            self._storage.stat(self._TEST_FILE_NAME).etag
+        )
+
+    def test_file_written_through_open_write(self):
+        with self._storage.open_write("streamed.txt", mode="wb") as file:
+            file.write(b"other ")
+            file.write(b"content")
+        assert self._storage.read("streamed.txt", mode="rb") == (
+            b"other content"
+        )
+        assert self._blob_count() == 2
+
+    def test_failed_open_write_not_committed(self):
+        for mode in ("wb", "w"):
+            with pytest.raises(RuntimeError):
+                with self._storage.open_write("failed.txt", mode=mode) as file:
+                    file.write(b"partial" if "b" in mode else "partial")
+                    raise RuntimeError
+            assert not self._storage.exists("failed.txt")
+        self._wrapped_storage.open_write.assert_not_called()
+        assert self._blob_count() == 1
+
+    def test_unreferenced_blobs_collected(self):
+        self._storage.write("copy.txt", self._TEST_FILE_CONTENT)
+        self._storage.delete(self._TEST_FILE_NAME)
+        assert self._storage.collect_garbage() == 0
+        self._storage.write("copy.txt", "rewritten", mode="w")
+        assert self._storage.collect_garbage() == 1
+        assert self._blob_count() == 1
+        assert self._storage.read("copy.txt") == "rewritten"
+        with pytest.raises(FileNotFoundError):
+            self._storage.read(self._TEST_FILE_NAME)
+
+    def test_file_copied_and_moved_within_index(self):
+        self._storage.copy(self._TEST_FILE_NAME, "copied.txt")
+        self._storage.move("copied.txt", "moved.txt")
+        assert self._storage.read("moved.txt") == self._TEST_FILE_CONTENT
+        assert not self._storage.exists("copied.txt")
+        self._storage.delete(self._TEST_FILE_NAME)
+        assert self._storage.collect_garbage() == 0
+        self._storage.delete("moved.txt")
+        assert self._storage.collect_garbage() == 1
+        assert self._blob_count() == 0
+
+    def test_index_shared(self):
+        storage = DeduplicatedStorage(
+            self._wrapped_storage, index_path=self._index_path
+        )
+        try:
+            assert storage.read(self._TEST_FILE_NAME) == (
+                self._TEST_FILE_CONTENT
+            )
+        finally:
+            storage.close()
+
+    def test_file_written_if_changed(self):
+        assert not self._storage.write_if_changed(
+            self._TEST_FILE_NAME, self._TEST_FILE_CONTENT
+        )
+        assert self._storage.write_if_changed(self._TEST_FILE_NAME, "changed")
+        assert self._storage.write_if_changed("new.txt", "changed")
+        self._wrapped_storage.write.assert_has_calls(
+            [mock.call(mock.ANY, b"changed", mode="wb")]
+        )
+        assert self._wrapped_storage.write.call_count == 2
+        assert self._storage.read(self._TEST_FILE_NAME) == "changed"
+
+    def test_concurrently_modified_file_not_overwritten(self):
+        write = self._wrapped_storage.write
+
+        def write_before_concurrent_write(*args, **kwargs):
+            self._wrapped_storage.write = write
+            self._storage.write(self._TEST_FILE_NAME, "concurrent")
+            write(*args, **kwargs)
+
+        self._wrapped_storage.write = write_before_concurrent_write
+        with pytest.raises(ConcurrentModificationError):
+            self._storage.write_if_changed(self._TEST_FILE_NAME, "changed")
+        assert self._storage.read(self._TEST_FILE_NAME) == "concurrent"
+        assert self._storage.collect_garbage() == 2
+
+    def test_files_listed(self):
+        self._storage.write("nested/first.txt", "first")
+        self._storage.write("nested/second.txt", "second")
+        assert [entry.name for entry in self._storage.list("nested/")] == [
+            "nested/first.txt",
+            "nested/second.txt",
+        ]
+        assert [
+            (entry.name, entry.is_prefix)
+            for entry in self._storage.list(delimiter="/")
+        ] == [(self._TEST_FILE_NAME, False), ("nested/", True)]
+
+    def test_exclusive_write_of_existing_file(self):
+        with pytest.raises(FileExistsError):
+            self._storage.write(self._TEST_FILE_NAME, "content", mode="x")
+        with pytest.raises(NotImplementedError):
+            self._storage.write(self._TEST_FILE_NAME, "content", mode="a")
@@ -1,10 +1,17 @@
+import errno
+import os
+import socket
 from datetime import datetime, timedelta
-from unittest import TestCase
+from io import BytesIO
+from unittest import TestCase, mock
 
 import pytest
 
 from storages.backends.file_system import FileSystemStorage
-from storages.exceptions import ImproperlyConfiguredError
+from storages.exceptions import (
+    ConcurrentModificationError,
+    ImproperlyConfiguredError,
+)
 
 
 class TestFileSystemStorage(TestCase):
@@ -14,6 +21,7 @@ class TestFileSystemStorage(TestCase):
 
     @pytest.fixture(autouse=True)
     def init_storage(self, tmpdir):
+        self._tmpdir = tmpdir
         self._storage = FileSystemStorage(path=tmpdir)
 
     def test_improper_storage_initialization(self):
@@ -71,11 +79,314 @@ class TestFileSystemStorage(TestCase):
         access_time = self._storage.get_access_time(self._TEST_FILE_NAME)
         assert access_time - now < timedelta(seconds=1)
 
+    def test_file_written_through_open_write(self):
+        with self._storage.open_write(self._TEST_FILE_NAME) as file:
+            file.write(self._TEST_FILE_CONTENT_BINARY)
+        assert (
+            self._storage.read(self._TEST_FILE_NAME, mode="rb")
+            == self._TEST_FILE_CONTENT_BINARY
+        )
+
+    def test_file_read_through_open_read(self):
+        self._write_contents_to_file()
+        with self._storage.open_read(self._TEST_FILE_NAME, mode="r") as file:
+            assert file.read() == self._TEST_FILE_CONTENT
+
+    def test_file_read_in_chunks(self):
+        self._write_contents_to_file(binary=True)
+        chunks = list(self._storage.iter_chunks(self._TEST_FILE_NAME, 8))
+        assert all(len(chunk) <= 8 for chunk in chunks)
+        assert b"".join(chunks) == self._TEST_FILE_CONTENT_BINARY
+
+    def test_file_range_read(self):
+        self._write_contents_to_file(binary=True)
+        content = self._TEST_FILE_CONTENT_BINARY
+        assert self._storage.read_range(self._TEST_FILE_NAME, 7, 12) == (
+            content[7:12]
+        )
+        assert self._storage.read_range(self._TEST_FILE_NAME, 7) == (
+            content[7:]
+        )
+
+    def test_file_read_in_parallel(self):
+        self._write_contents_to_file(binary=True)
+        content = self._storage.read_parallel(
+            self._TEST_FILE_NAME, part_size=4, max_concurrency=3
+        )
+        assert content == self._TEST_FILE_CONTENT_BINARY
+
+    def test_file_downloaded_in_parallel(self):
+        self._write_contents_to_file(binary=True)
+        with BytesIO() as file:
+            self._storage.download_parallel(
+                self._TEST_FILE_NAME, file, part_size=4, max_concurrency=3
+            )
+            assert file.getvalue() == self._TEST_FILE_CONTENT_BINARY
+
+    def test_improper_write_settings(self):
+        with pytest.raises(ImproperlyConfiguredError):
+            FileSystemStorage(path=self._tmpdir, fsync="always")
+        with pytest.raises(ImproperlyConfiguredError):
+            FileSystemStorage(path=self._tmpdir, write_buffer_size=0)
+
+    def test_file_written_atomically(self):
+        storage = FileSystemStorage(
+            path=self._tmpdir, atomic_writes=True, fsync="file+dir"
+        )
+        with storage.open_write(self._TEST_FILE_NAME, mode="w") as file:
+            file.write(self._TEST_FILE_CONTENT)
+            assert not storage.exists(self._TEST_FILE_NAME)
+        assert storage.read(self._TEST_FILE_NAME) == self._TEST_FILE_CONTENT
+        storage.write(self._TEST_FILE_NAME, b"replaced", mode="wb")
+        storage.write(self._TEST_FILE_NAME, b"+appended", mode="ab")
+        assert storage.read(self._TEST_FILE_NAME) == "replaced+appended"
+        assert self._tmpdir.listdir() == [
+            self._tmpdir.join(self._TEST_FILE_NAME)
+        ]
+
+    def test_file_appended_with_single_write(self):
+        self._write_contents_to_file()
+        with mock.patch("os.write", wraps=os.write) as write:
+            self._storage.write(self._TEST_FILE_NAME, "+appended", mode="a")
+            self._storage.write("new.txt", b"created", mode="ab")
+        assert write.call_count == 2
+        assert self._storage.read(self._TEST_FILE_NAME) == (
+            self._TEST_FILE_CONTENT + "+appended"
+        )
+        assert self._storage.read("new.txt") == "created"
+
+    def test_failed_atomic_write_leaves_file_untouched(self):
+        storage = FileSystemStorage(path=self._tmpdir, atomic_writes=True)
+        storage.write(self._TEST_FILE_NAME, self._TEST_FILE_CONTENT)
+        with pytest.raises(TypeError):
+            storage.write(self._TEST_FILE_NAME, b"bytes", mode="w")
+        with pytest.raises(RuntimeError):
+            with storage.open_write(self._TEST_FILE_NAME, mode="wb") as file:
+                file.write(b"partial")
+                raise RuntimeError()
+        assert storage.read(self._TEST_FILE_NAME) == self._TEST_FILE_CONTENT
+        assert self._tmpdir.listdir() == [
+            self._tmpdir.join(self._TEST_FILE_NAME)
+        ]
+
+    def test_file_written_atomically_only_once(self):
+        storage = FileSystemStorage(path=self._tmpdir, atomic_writes=True)
+        storage.write(self._TEST_FILE_NAME, self._TEST_FILE_CONTENT)
+        with pytest.raises(FileExistsError):
+            storage.write(self._TEST_FILE_NAME, "overwritten")
+        file = storage.open_write("other.txt")
+        storage.write("other.txt", b"first", mode="xb")
+        file.write(b"second")
+        with pytest.raises(FileExistsError):
+            file.close()
+        assert storage.read("other.txt") == "first"
+        assert len(self._tmpdir.listdir()) == 2
+
+    def test_file_written_with_fsync(self):
+        storage = FileSystemStorage(path=self._tmpdir, fsync="file")
+        with mock.patch("storages.backends.file_system.fsync") as fsync:
+            storage.write(self._TEST_FILE_NAME, self._TEST_FILE_CONTENT)
+        fsync.assert_called_once()
+        assert storage.read(self._TEST_FILE_NAME) == self._TEST_FILE_CONTENT
+
+    def test_file_written_to_missing_directory(self):
+        with pytest.raises(FileNotFoundError):
+            self._storage.write("missing/file.txt", self._TEST_FILE_CONTENT)
+        storage = FileSystemStorage(
+            path=self._tmpdir, atomic_writes=True, make_directories=True
+        )
+        storage.write("missing/file.txt", self._TEST_FILE_CONTENT)
+        assert storage.read("missing/file.txt") == self._TEST_FILE_CONTENT
+
+    def test_file_read_through_buffer(self):
+        self._write_contents_to_file(binary=True)
+        with self._storage.read_buffer(self._TEST_FILE_NAME) as buffer:
+            assert buffer.readonly
+            assert buffer == self._TEST_FILE_CONTENT_BINARY
+        self._storage.write("empty.bin", b"", mode="xb")
+        assert len(self._storage.read_buffer("empty.bin")) == 0
+
+    def test_file_copied_to_file(self):
+        self._write_contents_to_file(binary=True)
+        with self._tmpdir.join("copy.bin").open("wb") as file:
+            file.write(b">")
+            assert self._storage.copy_to(self._TEST_FILE_NAME, file) == len(
+                self._TEST_FILE_CONTENT_BINARY
+            )
+            file.write(b"<")
+        assert self._tmpdir.join("copy.bin").read_binary() == (
+            b">" + self._TEST_FILE_CONTENT_BINARY + b"<"
+        )
+
+    def test_file_copied_to_socket(self):
+        self._write_contents_to_file(binary=True)
+        left, right = socket.socketpair()
+        with left, right:
+            assert self._storage.copy_to(
+                self._TEST_FILE_NAME, left.makefile("wb")
+            ) == len(self._TEST_FILE_CONTENT_BINARY)
+            assert right.recv(1024) == self._TEST_FILE_CONTENT_BINARY
+
+    def test_file_copied_to_file_without_descriptor(self):
+        self._write_contents_to_file(binary=True)
+        with BytesIO() as file:
+            self._storage.copy_to(self._TEST_FILE_NAME, file)
+            assert file.getvalue() == self._TEST_FILE_CONTENT_BINARY
+
+    def test_file_copied(self):
+        self._write_contents_to_file(binary=True)
+        self._storage.write("copy.txt", b"replaced", mode="xb")
+        self._storage.copy(self._TEST_FILE_NAME, "copy.txt")
+        self._storage.write(self._TEST_FILE_NAME, b"!", mode="ab")
+        assert (
+            self._storage.read("copy.txt", mode="rb")
+            == self._TEST_FILE_CONTENT_BINARY
+        )
+        with pytest.raises(FileNotFoundError):
+            self._storage.copy("missing.txt", "missing-copy.txt")
+        assert not self._storage.exists("missing-copy.txt")
+
+    def test_file_moved(self):
+        self._write_contents_to_file()
+        storage = FileSystemStorage(path=self._tmpdir, make_directories=True)
+        storage.move(self._TEST_FILE_NAME, "dir/moved.txt")
+        assert not storage.exists(self._TEST_FILE_NAME)
+        assert storage.read("dir/moved.txt") == self._TEST_FILE_CONTENT
+
+    def test_file_moved_across_file_systems(self):
+        self._write_contents_to_file()
+        with mock.patch(
+            "storages.backends.file_system.replace",
+            side_effect=OSError(errno.EXDEV, "Invalid cross-device link"),
+        ):
+            self._storage.move(self._TEST_FILE_NAME, "moved.txt")
+        assert not self._storage.exists(self._TEST_FILE_NAME)
+        assert self._storage.read("moved.txt") == self._TEST_FILE_CONTENT
+
+    def test_file_stat(self):
+        self._write_contents_to_file()
+        stat = self._storage.stat(self._TEST_FILE_NAME)
+        assert stat.size == len(self._TEST_FILE_CONTENT)
+        assert stat.modified_time == self._storage.get_modified_time(
+            self._TEST_FILE_NAME
+        )
+        assert stat.created_time == self._storage.get_created_time(
+            self._TEST_FILE_NAME
+        )
+        assert stat.etag
+        assert stat.content_type == "text/plain"
+
+    def test_files_deleted_in_batch(self):
+        self._write_contents_to_file()
+        result = self._storage.delete_many(
+            (self._TEST_FILE_NAME, "some_non_existent.file")
+        )
+        assert result.results == {self._TEST_FILE_NAME: None}
+        assert isinstance(
+            result.errors["some_non_existent.file"], FileNotFoundError
+        )
+        assert not self._storage.exists(self._TEST_FILE_NAME)
+
+    def test_files_checked_for_existence_in_batch(self):
+        self._write_contents_to_file()
+        result = self._storage.exists_many(
+            (self._TEST_FILE_NAME, "some_non_existent.file")
+        )
+        assert result.results == {
+            self._TEST_FILE_NAME: True,
+            "some_non_existent.file": False,
+        }
+        assert not result.errors
+
+    def test_files_stat_in_batch(self):
+        self._write_contents_to_file()
+        result = self._storage.stat_many(
+            (self._TEST_FILE_NAME, "some_non_existent.file")
+        )
+        assert result.results[self._TEST_FILE_NAME].size == len(
+            self._TEST_FILE_CONTENT
+        )
+        assert set(result.errors) == {"some_non_existent.file"}
+
+    def test_files_listed(self):
+        names = self._write_nested_files()
+        entries = list(self._storage.list())
+        assert {entry.name for entry in entries} == set(names)
+        assert all(
+            entry.size == len(self._TEST_FILE_CONTENT) for entry in entries
+        )
+
+    def test_files_listed_by_prefix(self):
+        self._write_nested_files()
+        names = {entry.name for entry in self._storage.list("dir/sub")}
+        assert names == {"dir/sub/c.txt", "dir/subfile.txt"}
+
+    def test_files_listed_with_delimiter(self):
+        self._write_nested_files()
+        entries = list(self._storage.list("dir/", delimiter="/"))
+        assert {(entry.name, entry.is_prefix) for entry in entries} == {
+            ("dir/b.txt", False),
+            ("dir/subfile.txt", False),
+            ("dir/sub/", True),
+        }
+
+    def test_files_listed_with_prefetching(self):
+        names = self._write_nested_files()
+        with mock.patch.object(FileSystemStorage, "_LIST_PAGE_SIZE", 1):
+            entries = self._storage.list(prefetch_pages=2)
+            assert {entry.name for entry in entries} == set(names)
+
+    def test_files_listed_in_missing_directory(self):
+        assert not list(self._storage.list("missing/"))
+
+    def test_files_listed_with_unsupported_delimiter(self):
+        with pytest.raises(NotImplementedError):
+            self._storage.list(delimiter="-")
+
+    def test_file_written_if_changed(self):
+        assert self._storage.write_if_changed(
+            self._TEST_FILE_NAME, self._TEST_FILE_CONTENT
+        )
+        modified_time = self._storage.get_modified_time(self._TEST_FILE_NAME)
+        assert not self._storage.write_if_changed(
+            self._TEST_FILE_NAME, self._TEST_FILE_CONTENT
+        )
+        assert self._storage.get_modified_time(self._TEST_FILE_NAME) == (
+            modified_time
+        )
+        assert self._storage.write_if_changed(
+            self._TEST_FILE_NAME, self._TEST_FILE_CONTENT_BINARY
+        )
+        assert self._storage.read(self._TEST_FILE_NAME, mode="rb") == (
+            self._TEST_FILE_CONTENT_BINARY
+        )
+
+    def test_concurrently_created_file_not_overwritten(self):
+        self._write_contents_to_file()
+        stat = FileSystemStorage.__module__ + ".stat"
+        with mock.patch(stat, side_effect=FileNotFoundError):
+            with pytest.raises(ConcurrentModificationError):
+                self._storage.write_if_changed(
+                    self._TEST_FILE_NAME, self._TEST_FILE_CONTENT
+                )
+        assert self._storage.read(self._TEST_FILE_NAME) == (
+            self._TEST_FILE_CONTENT
+        )
+
+    def _write_nested_files(self):
+        self._tmpdir.mkdir("dir").mkdir("sub")
+        names = ("a.txt", "dir/b.txt", "dir/sub/c.txt", "dir/subfile.txt")
+        for name in names:
+            self._storage.write(name, self._TEST_FILE_CONTENT)
+        return names
+
     def _write_contents_to_file(self, binary: bool = False):
         self._storage.write(
             self._TEST_FILE_NAME,
-            content=self._TEST_FILE_CONTENT_BINARY
-            if binary
-            else self._TEST_FILE_CONTENT,
+            content=(
+                self._TEST_FILE_CONTENT_BINARY
+                if binary
+                else self._TEST_FILE_CONTENT
+            ),
             mode="xb" if binary else "x",
         )
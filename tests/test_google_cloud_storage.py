@@ -1,6 +1,6 @@
 from datetime import datetime, timedelta
 from os import environ
-from unittest import TestCase
+from unittest import TestCase, mock
 from uuid import uuid4
 
 import pytest
@@ -63,6 +63,24 @@ class TestGoogleCloudStorage(TestCase):
                 google_cloud_credentials="",
                 google_cloud_bucket_name="some_bucket",
             )
+        with pytest.raises(ImproperlyConfiguredError):
+            GoogleCloudStorage(
+                google_cloud_credentials="base64_data",
+                google_cloud_bucket_name="some_bucket",
+                google_cloud_part_size=1000,
+            )
+        with pytest.raises(ImproperlyConfiguredError):
+            GoogleCloudStorage(
+                google_cloud_credentials="base64_data",
+                google_cloud_bucket_name="some_bucket",
+                google_cloud_chunk_size=1000,
+            )
+        with pytest.raises(ImproperlyConfiguredError):
+            GoogleCloudStorage(
+                google_cloud_credentials="base64_data",
+                google_cloud_bucket_name="some_bucket",
+                google_cloud_max_pool_connections=0,
+            )
 
     def test_file_not_exists(self):
         assert not self._storage.exists("some_non_existent.file")
@@ -112,3 +130,151 @@ class TestGoogleCloudStorage(TestCase):
                 temp_file
             ).replace(tzinfo=None)
             assert modification_time - datetime.now() < timedelta(seconds=10)
+
+    def test_file_written_through_open_write(self):
+        with google_cloud_temp_file(storage=self._storage) as temp_file:
+            with self._storage.open_write(temp_file) as file:
+                file.write(google_cloud_temp_file.CONTENT_BINARY)
+            assert (
+                self._storage.read(temp_file, mode="rb")
+                == google_cloud_temp_file.CONTENT_BINARY
+            )
+
+    def test_file_read_through_open_read(self):
+        with google_cloud_temp_file(storage=self._storage) as temp_file:
+            with self._storage.open_read(temp_file, mode="r") as file:
+                assert file.read() == google_cloud_temp_file.CONTENT
+
+    def test_file_read_in_chunks(self):
+        with google_cloud_temp_file(
+            storage=self._storage, binary=True
+        ) as temp_file:
+            chunks = list(self._storage.iter_chunks(temp_file, 8))
+            assert all(len(chunk) <= 8 for chunk in chunks)
+            assert b"".join(chunks) == google_cloud_temp_file.CONTENT_BINARY
+
+    def test_large_file_written_in_parts(self):
+        storage = GoogleCloudStorage(
+            google_cloud_credentials=environ.get(
+                "STORAGES_GOOGLE_CLOUD_CREDENTIALS"
+            ),
+            google_cloud_bucket_name=environ.get(
+                "STORAGES_GOOGLE_CLOUD_BUCKET_NAME"
+            ),
+            google_cloud_composite_threshold=1024 * 1024,
+            google_cloud_part_size=256 * 1024,
+            google_cloud_max_concurrency=3,
+        )
+        content = google_cloud_temp_file.CONTENT_BINARY * 60000
+        with google_cloud_temp_file(storage=storage) as temp_file:
+            storage.write(temp_file, content, mode="wb")
+            assert storage.read(temp_file, mode="rb") == content
+
+    def test_file_appended(self):
+        with google_cloud_temp_file(storage=self._storage) as temp_file:
+            self._storage.write(temp_file, "+appended", mode="a")
+            with self._storage.open_write(temp_file, mode="a") as file:
+                file.write("+streamed")
+            assert self._storage.read(temp_file) == (
+                google_cloud_temp_file.CONTENT + "+appended+streamed"
+            )
+            self._storage.write(temp_file, "replaced")
+            assert self._storage.read(temp_file) == "replaced"
+
+    def test_appended_file_compacted(self):
+        with google_cloud_temp_file(storage=self._storage) as temp_file:
+            with mock.patch.object(
+                GoogleCloudStorage, "_MAX_COMPONENT_COUNT", 2
+            ):
+                for _ in range(3):
+                    self._storage.write(temp_file, "+", mode="a")
+            assert self._storage.read(temp_file) == (
+                google_cloud_temp_file.CONTENT + "+++"
+            )
+            blob = self._storage._get_blob(temp_file)
+            assert blob.component_count == 2
+
+    def test_append_retried_on_concurrent_modification(self):
+        with google_cloud_temp_file(storage=self._storage) as temp_file:
+            stale_blob = self._storage._get_blob(temp_file)
+            self._storage.write(temp_file, "concurrent")
+            with mock.patch.object(
+                self._storage._bucket,
+                "get_blob",
+                side_effect=[stale_blob, self._storage._get_blob(temp_file)],
+            ) as get_blob:
+                self._storage.write(temp_file, "+appended", mode="a")
+            assert get_blob.call_count == 2
+            assert self._storage.read(temp_file) == "concurrent+appended"
+
+    def test_file_range_read(self):
+        with google_cloud_temp_file(
+            storage=self._storage, binary=True
+        ) as temp_file:
+            content = google_cloud_temp_file.CONTENT_BINARY
+            range_content = self._storage.read_range(temp_file, 7, 12)
+            assert range_content == content[7:12]
+            assert self._storage.read_range(temp_file, 7) == content[7:]
+
+    def test_file_read_in_parallel(self):
+        with google_cloud_temp_file(
+            storage=self._storage, binary=True
+        ) as temp_file:
+            content = self._storage.read_parallel(
+                temp_file, part_size=4, max_concurrency=3
+            )
+            assert content == google_cloud_temp_file.CONTENT_BINARY
+
+    def test_file_stat(self):
+        with google_cloud_temp_file(storage=self._storage) as temp_file:
+            stat = self._storage.stat(temp_file)
+            assert stat.size == len(google_cloud_temp_file.CONTENT)
+            assert stat.modified_time == self._storage.get_modified_time(
+                temp_file
+            )
+            assert stat.etag
+
+    def test_file_copied(self):
+        with google_cloud_temp_file(storage=self._storage) as temp_file:
+            destination = f"{temp_file}-copy"
+            self._storage.copy(temp_file, destination)
+            try:
+                assert (
+                    self._storage.read(destination, mode="rb")
+                    == google_cloud_temp_file.CONTENT.encode()
+                )
+                assert self._storage.exists(temp_file)
+            finally:
+                self._storage.delete(destination)
+
+    def test_file_moved(self):
+        with google_cloud_temp_file(storage=self._storage) as temp_file:
+            destination = f"{temp_file}-moved"
+            self._storage.move(temp_file, destination)
+            try:
+                assert not self._storage.exists(temp_file)
+                assert (
+                    self._storage.read(destination, mode="rb")
+                    == google_cloud_temp_file.CONTENT.encode()
+                )
+            finally:
+                self._storage.delete(destination)
+
+    def test_files_deleted_in_batch(self):
+        with google_cloud_temp_file(
+            storage=self._storage
+        ) as first_file, google_cloud_temp_file(
+            storage=self._storage
+        ) as second_file:
+            result = self._storage.delete_many((first_file, second_file))
+            assert result.results == {first_file: None, second_file: None}
+            assert not result.errors
+            existence = self._storage.exists_many((first_file, second_file))
+            assert not any(existence.results.values())
+
+    def test_files_listed_by_prefix(self):
+        with google_cloud_temp_file(storage=self._storage) as temp_file:
+            entries = list(self._storage.list(temp_file, prefetch_pages=1))
+            assert [(entry.name, entry.size) for entry in entries] == [
+                (temp_file, len(google_cloud_temp_file.CONTENT))
+            ]
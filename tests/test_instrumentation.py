@@ -0,0 +1,141 @@
+from unittest import TestCase, mock
+
+import pytest
+
+from storages.backends.file_system import FileSystemStorage
+from storages.backends.metadata_cache import MetadataCachedStorage
+from storages.instrumentation import (
+    HistogramCollector,
+    InstrumentedStorage,
+    OperationEvent,
+)
+
+
+class TestInstrumentedStorage(TestCase):
+    _TEST_FILE_NAME = "test_file.txt"
+    _TEST_FILE_CONTENT = "Lorem ipsum dolor sit amet..."
+
+    @pytest.fixture(autouse=True)
+    def init_storage(self, tmpdir):
+        self._hook = mock.Mock()
+        self._storage = InstrumentedStorage(
+            FileSystemStorage(path=tmpdir), hooks=[self._hook]
+        )
+
+    def _events(self):
+        return [call[0][0] for call in self._hook.call_args_list]
+
+    def test_calls_reported(self):
+        self._storage.write(self._TEST_FILE_NAME, self._TEST_FILE_CONTENT)
+        self._storage.read(self._TEST_FILE_NAME)
+        self._storage.exists(self._TEST_FILE_NAME)
+        self._storage.delete(self._TEST_FILE_NAME)
+        events = self._events()
+        assert [event.operation for event in events] == [
+            "write",
+            "read",
+            "exists",
+            "delete",
+        ]
+        assert {event.backend for event in events} == {"FileSystemStorage"}
+        assert {event.name for event in events} == {self._TEST_FILE_NAME}
+        assert [event.size for event in events] == [
+            len(self._TEST_FILE_CONTENT),
+            len(self._TEST_FILE_CONTENT),
+            None,
+            None,
+        ]
+        assert all(event.duration >= 0 for event in events)
+        assert not any(event.error for event in events)
+
+    def test_errors_reported(self):
+        with pytest.raises(FileNotFoundError):
+            self._storage.read("missing.txt")
+        (event,) = self._events()
+        assert event.operation == "read"
+        assert isinstance(event.error, FileNotFoundError)
+
+    def test_iterators_reported_once_exhausted(self):
+        self._storage.write(self._TEST_FILE_NAME, self._TEST_FILE_CONTENT)
+        chunks = self._storage.iter_chunks(self._TEST_FILE_NAME, 4)
+        entries = self._storage.list()
+        assert len(self._events()) == 1
+        assert b"".join(chunks).decode() == self._TEST_FILE_CONTENT
+        assert [entry.name for entry in entries] == [self._TEST_FILE_NAME]
+        events = self._events()
+        assert [(event.operation, event.size) for event in events[1:]] == [
+            ("iter_chunks", len(self._TEST_FILE_CONTENT)),
+            ("list", None),
+        ]
+
+    def test_streams_reported_once_closed(self):
+        content = "Zażółć gęślą jaźń"
+        with self._storage.open_write(self._TEST_FILE_NAME, mode="w") as file:
+            file.write(content)
+            assert not self._events()
+        with self._storage.open_read(self._TEST_FILE_NAME, mode="rb") as file:
+            assert file.read(4) + file.read() == content.encode()
+        events = self._events()
+        assert [(event.operation, event.size) for event in events] == [
+            ("open_write", len(content.encode())),
+            ("open_read", len(content.encode())),
+        ]
+
+    def test_text_written_counted_in_bytes(self):
+        content = "Zażółć gęślą jaźń"
+        self._storage.write(self._TEST_FILE_NAME, content, mode="w")
+        assert self._events()[0].size == len(content.encode())
+
+    def test_hooks_registered_and_removed(self):
+        storage = InstrumentedStorage(self._storage)
+        storage.write(self._TEST_FILE_NAME, self._TEST_FILE_CONTENT)
+        hook = mock.Mock()
+        storage.add_hook(hook)
+        storage.exists(self._TEST_FILE_NAME)
+        storage.remove_hook(hook)
+        storage.exists(self._TEST_FILE_NAME)
+        assert hook.call_count == 1
+
+    def test_failing_hook_ignored(self):
+        self._hook.side_effect = ValueError()
+        self._storage.write(self._TEST_FILE_NAME, self._TEST_FILE_CONTENT)
+        assert self._storage.exists(self._TEST_FILE_NAME)
+
+    def test_backend_named_after_innermost_storage(self):
+        storage = InstrumentedStorage(
+            MetadataCachedStorage(FileSystemStorage(path="."))
+        )
+        assert storage.backend == "FileSystemStorage"
+        assert InstrumentedStorage(storage, backend="local").backend == (
+            "local"
+        )
+
+
+class TestHistogramCollector(TestCase):
+    def test_events_aggregated(self):
+        collector = HistogramCollector(buckets=(0.1, 1.0))
+        for duration, size, error in (
+            (0.05, 10, None),
+            (0.5, 20, None),
+            (2.0, None, ValueError()),
+        ):
+            collector(
+                OperationEvent(
+                    backend="FileSystemStorage",
+                    operation="read",
+                    name="file.txt",
+                    duration=duration,
+                    size=size,
+                    error=error,
+                )
+            )
+        histogram = collector.snapshot()[("FileSystemStorage", "read")]
+        assert histogram.calls == 3
+        assert histogram.errors == 1
+        assert histogram.total_duration == pytest.approx(2.55)
+        assert histogram.total_size == 30
+        assert histogram.counts == (1, 1, 1)
+        assert histogram.quantile(0.5) == 1.0
+        assert histogram.quantile(0.99) == float("inf")
+        collector.reset()
+        assert not collector.snapshot()
@@ -0,0 +1,136 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+from unittest import TestCase, mock
+
+import pytest
+
+from storages.backends.file_system import FileSystemStorage
+from storages.backends.memory_cache import MemoryCachedStorage
+from storages.exceptions import ImproperlyConfiguredError
+
+
+class TestMemoryCachedStorage(TestCase):
+    _TEST_FILE_NAME = "test_file.txt"
+    _TEST_FILE_CONTENT = "Lorem ipsum dolor sit amet..."
+
+    @pytest.fixture(autouse=True)
+    def init_storage(self, tmpdir):
+        self._file_system_storage = FileSystemStorage(tmpdir)
+        self._wrapped_storage = mock.Mock(wraps=self._file_system_storage)
+        self._storage = MemoryCachedStorage(
+            self._wrapped_storage,
+            max_size=2 * len(self._TEST_FILE_CONTENT),
+            max_object_size=len(self._TEST_FILE_CONTENT),
+        )
+        self._storage.write(self._TEST_FILE_NAME, self._TEST_FILE_CONTENT)
+
+    def test_improper_initialization(self):
+        with pytest.raises(ImproperlyConfiguredError):
+            MemoryCachedStorage(self._wrapped_storage, max_size=0)
+        with pytest.raises(ImproperlyConfiguredError):
+            MemoryCachedStorage(
+                self._wrapped_storage, max_size=1, max_object_size=2
+            )
+        with pytest.raises(ImproperlyConfiguredError):
+            MemoryCachedStorage(self._wrapped_storage, ttl=0)
+
+    def test_content_fetched_once(self):
+        assert (
+            self._storage.read(self._TEST_FILE_NAME) == self._TEST_FILE_CONTENT
+        )
+        assert (
+            self._storage.read(self._TEST_FILE_NAME, mode="rb")
+            == self._TEST_FILE_CONTENT.encode()
+        )
+        with self._storage.open_read(self._TEST_FILE_NAME, mode="r") as file:
+            assert file.read() == self._TEST_FILE_CONTENT
+        assert (
+            b"".join(self._storage.iter_chunks(self._TEST_FILE_NAME, 4))
+            == self._TEST_FILE_CONTENT.encode()
+        )
+        assert self._storage.read_range(self._TEST_FILE_NAME, 6, 11) == (
+            b"ipsum"
+        )
+        assert self._wrapped_storage.read.call_count == 1
+        self._wrapped_storage.read_range.assert_not_called()
+
+    def test_concurrent_misses_fetched_once(self):
+        started = Event()
+        release = Event()
+        read = self._file_system_storage.read
+
+        def slow_read(*args, **kwargs):
+            started.set()
+            release.wait()
+            return read(*args, **kwargs)
+
+        self._wrapped_storage.read.side_effect = slow_read
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = [
+                executor.submit(self._storage.read, self._TEST_FILE_NAME)
+                for _ in range(8)
+            ]
+            started.wait()
+            release.set()
+        assert {result.result() for result in results} == {
+            self._TEST_FILE_CONTENT
+        }
+        assert self._wrapped_storage.read.call_count == 1
+
+    def test_failed_fetch_not_cached(self):
+        with pytest.raises(FileNotFoundError):
+            self._storage.read("missing.txt")
+        self._storage.write("missing.txt", "found")
+        assert self._storage.read("missing.txt") == "found"
+
+    def test_least_recently_used_content_evicted(self):
+        for name in ("a.txt", "b.txt"):
+            self._storage.write(name, self._TEST_FILE_CONTENT)
+        for name in (self._TEST_FILE_NAME, "a.txt", "b.txt"):
+            self._storage.read(name)
+        self._storage.read("b.txt")
+        self._storage.read(self._TEST_FILE_NAME)
+        assert self._wrapped_storage.read.call_count == 4
+
+    def test_large_content_not_cached(self):
+        self._storage.write("large.txt", 2 * self._TEST_FILE_CONTENT)
+        self._storage.read("large.txt")
+        self._storage.read("large.txt")
+        assert self._wrapped_storage.read.call_count == 2
+
+    def test_content_missing_from_cache_streamed(self):
+        self._storage.write("large.txt", 2 * self._TEST_FILE_CONTENT)
+        with self._storage.open_read("large.txt", mode="r") as file:
+            assert file.read() == 2 * self._TEST_FILE_CONTENT
+        assert (
+            b"".join(self._storage.iter_chunks("large.txt", 4, mode="rb"))
+            == 2 * self._TEST_FILE_CONTENT.encode()
+        )
+        self._wrapped_storage.read.assert_not_called()
+        self._wrapped_storage.open_read.assert_called_once_with(
+            "large.txt", mode="r"
+        )
+        self._wrapped_storage.iter_chunks.assert_called_once_with(
+            "large.txt", 4, mode="rb"
+        )
+
+    def test_content_expires(self):
+        storage = MemoryCachedStorage(self._wrapped_storage, ttl=60)
+        storage.read(self._TEST_FILE_NAME)
+        with mock.patch(
+            "storages.backends.memory_cache.monotonic",
+            return_value=float("inf"),
+        ):
+            storage.read(self._TEST_FILE_NAME)
+        assert self._wrapped_storage.read.call_count == 2
+
+    def test_content_invalidated_on_write_and_delete(self):
+        self._storage.read(self._TEST_FILE_NAME)
+        self._storage.write(self._TEST_FILE_NAME, "!", mode="a")
+        assert (
+            self._storage.read(self._TEST_FILE_NAME)
+            == self._TEST_FILE_CONTENT + "!"
+        )
+        self._storage.delete_many((self._TEST_FILE_NAME,))
+        with pytest.raises(FileNotFoundError):
+            self._storage.read(self._TEST_FILE_NAME)
@@ -0,0 +1,102 @@
+from unittest import TestCase, mock
+
+import pytest
+
+from storages.backends.file_system import FileSystemStorage
+from storages.backends.metadata_cache import MetadataCachedStorage
+from storages.exceptions import ImproperlyConfiguredError
+
+
+class TestMetadataCachedStorage(TestCase):
+    _TEST_FILE_NAME = "test_file.txt"
+    _TEST_FILE_CONTENT = "Lorem ipsum dolor sit amet..."
+
+    @pytest.fixture(autouse=True)
+    def init_storage(self, tmpdir):
+        self._wrapped_storage = mock.Mock(wraps=FileSystemStorage(tmpdir))
+        self._storage = MetadataCachedStorage(
+            self._wrapped_storage, ttl=60, max_size=2
+        )
+        self._storage.write(self._TEST_FILE_NAME, self._TEST_FILE_CONTENT)
+
+    def test_improper_initialization(self):
+        with pytest.raises(ImproperlyConfiguredError):
+            MetadataCachedStorage(self._wrapped_storage, ttl=0)
+        with pytest.raises(ImproperlyConfiguredError):
+            MetadataCachedStorage(self._wrapped_storage, max_size=0)
+
+    def test_metadata_fetched_once(self):
+        assert self._storage.size(self._TEST_FILE_NAME) == len(
+            self._TEST_FILE_CONTENT
+        )
+        self._storage.get_modified_time(self._TEST_FILE_NAME)
+        self._storage.get_created_time(self._TEST_FILE_NAME)
+        assert self._wrapped_storage.stat.call_count == 1
+
+    def test_metadata_expires(self):
+        self._storage.stat(self._TEST_FILE_NAME)
+        with mock.patch(
+            "storages.backends.metadata_cache.monotonic",
+            return_value=float("inf"),
+        ):
+            self._storage.stat(self._TEST_FILE_NAME)
+        assert self._wrapped_storage.stat.call_count == 2
+
+    def test_least_recently_used_metadata_evicted(self):
+        for name in ("a.txt", "b.txt"):
+            self._storage.write(name, self._TEST_FILE_CONTENT)
+        for name in (self._TEST_FILE_NAME, "a.txt", "b.txt"):
+            self._storage.stat(name)
+        self._storage.stat(self._TEST_FILE_NAME)
+        assert self._wrapped_storage.stat.call_count == 4
+
+    def test_metadata_invalidated_on_write_and_delete(self):
+        self._storage.stat(self._TEST_FILE_NAME)
+        self._storage.write(self._TEST_FILE_NAME, "appended", mode="a")
+        assert self._storage.size(self._TEST_FILE_NAME) == len(
+            self._TEST_FILE_CONTENT + "appended"
+        )
+        self._storage.delete(self._TEST_FILE_NAME)
+        with pytest.raises(FileNotFoundError):
+            self._storage.stat(self._TEST_FILE_NAME)
+
+    def test_metadata_invalidated_on_batch_delete(self):
+        self._storage.stat(self._TEST_FILE_NAME)
+        self._storage.delete_many((self._TEST_FILE_NAME,))
+        with pytest.raises(FileNotFoundError):
+            self._storage.stat(self._TEST_FILE_NAME)
+
+    def test_created_time_delegated_when_missing(self):
+        self._wrapped_storage.stat.return_value = self._storage.stat(
+            "test_file.txt"
+        )._replace(created_time=None)
+        self._storage.invalidate(self._TEST_FILE_NAME)
+        self._storage.get_created_time(self._TEST_FILE_NAME)
+        self._wrapped_storage.get_created_time.assert_called_once_with(
+            self._TEST_FILE_NAME
+        )
+
+    def test_metadata_invalidated_on_copy_and_move(self):
+        self._storage.write("copy.txt", "short")
+        self._storage.stat("copy.txt")
+        self._storage.copy(self._TEST_FILE_NAME, "copy.txt")
+        assert self._storage.size("copy.txt") == len(self._TEST_FILE_CONTENT)
+        self._storage.move("copy.txt", "moved.txt")
+        with pytest.raises(FileNotFoundError):
+            self._storage.stat("copy.txt")
+
+    def test_metadata_fetched_before_write_not_cached(self):
+        stale_stat = self._storage.stat(self._TEST_FILE_NAME)
+        self._storage.invalidate(self._TEST_FILE_NAME)
+
+        def write_while_fetching(name):
+            self._storage.write(name, "appended", mode="a")
+            return stale_stat
+
+        self._wrapped_storage.stat.side_effect = write_while_fetching
+        assert self._storage.stat(self._TEST_FILE_NAME) == stale_stat
+        self._wrapped_storage.stat.side_effect = None
+        assert self._storage.size(self._TEST_FILE_NAME) == len(
+            self._TEST_FILE_CONTENT + "appended"
+        )
+        assert self._wrapped_storage.stat.call_count == 3
@@ -1,18 +1,25 @@
+import gc
+import inspect
 import os
 import unittest.mock
+import weakref
+from typing import Optional
 from unittest import TestCase
 
 import pytest
 
 from storages.backends.amazon_s3 import AmazonS3Storage
-from storages.backends.base import Storage
+from storages.backends.async_file_system import AsyncFileSystemStorage
+from storages.backends.base import ByteSize, Duration, Storage
 from storages.backends.file_system import FileSystemStorage
 from storages.backends.google_cloud import GoogleCloudStorage
-from storages.exceptions import MissingEnvironmentVariableError
-from storages.provider import (DynamicStorageLoader,
-                               EnvironmentVariablesCollector,
+from storages.exceptions import (ImproperlyConfiguredError,
+                                 MissingEnvironmentVariableError)
+from storages.provider import (AsyncStorageProvider, DynamicStorageLoader,
+                               EnvironmentVariablesCollector, LazyStorage,
                                StorageConstructorArgumentsExtractor,
-                               StorageProvider)
+                               StorageProvider, StorageRegistry,
+                               _reset_lazy_storages)
 
 
 class TestStorageConstructorArgumentsExtractor(TestCase):
@@ -37,6 +44,17 @@ class TestStorageConstructorArgumentsExtractor(TestCase):
         for index, argument in enumerate(arguments):
             assert argument == expected_arguments[index]
 
+    def test_extraction_of_keyword_only_parameters(self):
+        class _TestStorage(Storage):
+            def __init__(self, a, *, b: int = 1):
+                pass
+
+        parameters = StorageConstructorArgumentsExtractor.extract_parameters(
+            storage_backend_class=_TestStorage
+        )
+        assert tuple(parameters) == ("a", "b")
+        assert parameters["b"].default == 1
+
 
 class TestEnvironmentVariablesCollector:
     @pytest.fixture(autouse=True)
@@ -47,6 +65,12 @@ class TestEnvironmentVariablesCollector:
                 "STORAGES_PARAM_A": "a",
                 "STORAGES_PARAM_B": "b",
                 "STORAGES_PARAM_C": "c",
+                "STORAGES_PARAM_INT": "10",
+                "STORAGES_PARAM_FLOAT": "2.5",
+                "STORAGES_PARAM_BOOL": "yes",
+                "STORAGES_PARAM_SIZE": "8MiB",
+                "STORAGES_PARAM_DURATION": "500ms",
+                "STORAGES_PARAM_EMPTY": "",
                 "NOT_STORAGES_RELATED_PARAM": "any_value",
             },
         ):
@@ -78,6 +102,81 @@ class TestEnvironmentVariablesCollector:
         with pytest.raises(MissingEnvironmentVariableError):
             EnvironmentVariablesCollector.collect(names=names)
 
+    def test_missing_environment_variable_with_default(self):
+        parameters = self._parameters(
+            lambda param_a, missing="default": None
+        )
+        values = EnvironmentVariablesCollector.collect(
+            names=parameters, parameters=parameters
+        )
+        assert values == {"param_a": "a"}
+
+    def test_collecting_annotated(self):
+        def constructor(
+            param_a: str, param_int: int, param_float: float, param_bool: bool
+        ):
+            pass
+
+        parameters = self._parameters(constructor)
+        values = EnvironmentVariablesCollector.collect(
+            names=parameters, parameters=parameters
+        )
+        assert values == {
+            "param_a": "a",
+            "param_int": 10,
+            "param_float": 2.5,
+            "param_bool": True,
+        }
+
+    def test_collecting_sizes_and_durations(self):
+        def constructor(
+            param_int: ByteSize,
+            param_size: ByteSize,
+            param_float: Duration,
+            param_duration: Duration,
+        ):
+            pass
+
+        parameters = self._parameters(constructor)
+        values = EnvironmentVariablesCollector.collect(
+            names=parameters, parameters=parameters
+        )
+        assert values == {
+            "param_int": 10,
+            "param_size": 8 * 1024 * 1024,
+            "param_float": 2.5,
+            "param_duration": 0.5,
+        }
+
+    def test_collecting_optional(self):
+        def constructor(
+            param_size: Optional[ByteSize] = None,
+            param_empty: Optional[int] = 1,
+            missing: Optional[int] = None,
+        ):
+            pass
+
+        parameters = self._parameters(constructor)
+        values = EnvironmentVariablesCollector.collect(
+            names=parameters, parameters=parameters
+        )
+        assert values == {"param_size": 8 * 1024 * 1024, "param_empty": None}
+
+    def test_collecting_improperly_annotated(self):
+        def constructor(param_a: int, param_b: bool, param_c: ByteSize):
+            pass
+
+        parameters = self._parameters(constructor)
+        for name in parameters:
+            with pytest.raises(ImproperlyConfiguredError):
+                EnvironmentVariablesCollector.collect(
+                    names=(name,), parameters=parameters
+                )
+
+    @staticmethod
+    def _parameters(constructor):
+        return dict(inspect.signature(constructor).parameters)
+
 
 class TestDynamicStorageLoader(TestCase):
     _EXPECTED_RESULT = {
@@ -105,3 +204,112 @@ class TestStorageProvider(TestCase):
         for path, expected_class in self._EXPECTED_RESULT.items():
             storage = StorageProvider.provide(backend_path=path)
             assert type(storage) == expected_class
+
+
+class TestAsyncStorageProvider(TestCase):
+    def test_provider(self):
+        with unittest.mock.patch.dict(os.environ, {"STORAGES_PATH": "."}):
+            storage = AsyncStorageProvider.provide(
+                backend_path="storages.backends.async_file_system."
+                "AsyncFileSystemStorage"
+            )
+        assert isinstance(storage, AsyncFileSystemStorage)
+
+    def test_provider_of_synchronous_storage(self):
+        with unittest.mock.patch.dict(os.environ, {"STORAGES_PATH": "."}):
+            with pytest.raises(ImproperlyConfiguredError):
+                AsyncStorageProvider.provide(
+                    backend_path="storages.backends.file_system."
+                    "FileSystemStorage"
+                )
+
+
+class TestLazyStorage(TestCase):
+    @pytest.fixture(autouse=True)
+    def init_storage(self):
+        self._factory = unittest.mock.Mock(
+            return_value=unittest.mock.Mock(spec=Storage)
+        )
+        self._storage = LazyStorage(self._factory)
+
+    def test_storage_built_on_first_use(self):
+        self._factory.assert_not_called()
+        self._storage.exists("first.file")
+        self._storage.exists("second.file")
+        self._factory.assert_called_once_with()
+
+    def test_storage_rebuilt_in_another_process(self):
+        self._storage.exists("any.file")
+        with unittest.mock.patch(
+            "storages.provider.os.getpid", return_value=0
+        ):
+            self._storage.exists("any.file")
+        assert self._factory.call_count == 2
+
+    def test_storage_rebuilt_after_fork(self):
+        self._storage.exists("any.file")
+        _reset_lazy_storages()
+        self._storage.exists("any.file")
+        assert self._factory.call_count == 2
+
+    def test_storage_not_kept_alive_by_fork_handler(self):
+        reference = weakref.ref(self._storage)
+        del self._storage
+        gc.collect()
+        assert reference() is None
+
+
+class TestStorageRegistry(TestCase):
+    @pytest.fixture(autouse=True)
+    def init_registry(self, tmpdir):
+        self._path = str(tmpdir)
+        with unittest.mock.patch.dict(
+            os.environ,
+            {
+                "STORAGES_BACKEND": "storages.backends.file_system."
+                "FileSystemStorage",
+                "STORAGES_PATH": self._path,
+                "STORAGES_ARCHIVE_BACKEND": "storages.backends.file_system."
+                "FileSystemStorage",
+                "STORAGES_ARCHIVE_PATH": self._path,
+                "STORAGES_ARCHIVE_MAKE_DIRECTORIES": "yes",
+            },
+        ):
+            self._registry = StorageRegistry()
+            yield
+
+    def test_storage_configured_by_prefixed_variables(self):
+        self._registry["archive"].write("nested/file.txt", "content")
+        assert os.path.isfile(os.path.join(self._path, "nested", "file.txt"))
+
+    def test_default_storage_configured_by_unprefixed_variables(self):
+        assert self._registry["default"].exists("file.txt") is False
+
+    def test_storage_shared(self):
+        with unittest.mock.patch.object(
+            StorageProvider, "provide", wraps=StorageProvider.provide
+        ) as provide:
+            assert self._registry["archive"] is self._registry["archive"]
+            self._registry["archive"].exists("first.file")
+            self._registry["archive"].exists("second.file")
+        provide.assert_called_once_with(
+            backend_path="storages.backends.file_system.FileSystemStorage",
+            prefix="STORAGES_ARCHIVE_",
+        )
+
+    def test_storage_registered(self):
+        storage = unittest.mock.Mock(spec=Storage)
+        self._registry.register("archive", storage)
+        assert self._registry["archive"] is storage
+
+    def test_storage_contained(self):
+        assert "archive" in self._registry
+        assert "analytics" not in self._registry
+
+    def test_storage_not_configured(self):
+        with pytest.raises(MissingEnvironmentVariableError):
+            self._registry["analytics"].exists("file.txt")
+
+    def test_improper_name(self):
+        with pytest.raises(ImproperlyConfiguredError):
+            self._registry["Archive-1"]
@@ -0,0 +1,44 @@
+from unittest import TestCase, mock
+
+from storages.instrumentation import OperationEvent
+from storages.telemetry import OpenTelemetryHook
+
+
+class TestOpenTelemetryHook(TestCase):
+    def test_events_recorded(self):
+        meter = mock.Mock()
+        hook = OpenTelemetryHook(meter=meter)
+        attributes = {
+            "storage.backend": "AmazonS3Storage",
+            "storage.operation": "read",
+        }
+        hook(
+            OperationEvent(
+                backend="AmazonS3Storage",
+                operation="read",
+                name="file.txt",
+                duration=0.5,
+                size=10,
+                error=None,
+            )
+        )
+        hook(
+            OperationEvent(
+                backend="AmazonS3Storage",
+                operation="read",
+                name="file.txt",
+                duration=1.5,
+                size=None,
+                error=ValueError(),
+            )
+        )
+        duration = meter.create_histogram.return_value
+        assert duration.record.call_args_list == [
+            mock.call(0.5, attributes),
+            mock.call(1.5, attributes),
+        ]
+        counter = meter.create_counter.return_value
+        assert counter.add.call_args_list == [
+            mock.call(10, attributes),
+            mock.call(1, {**attributes, "error.type": "ValueError"}),
+        ]
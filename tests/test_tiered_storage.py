@@ -0,0 +1,194 @@
+import os
+import time
+from unittest import TestCase, mock
+
+import pytest
+
+from storages.backends.file_system import FileSystemStorage
+from storages.backends.tiered import TieredStorage
+from storages.exceptions import ImproperlyConfiguredError
+
+
+class TestTieredStorage(TestCase):
+    _TEST_FILE_NAME = "test_file.txt"
+    _TEST_FILE_CONTENT = "Lorem ipsum dolor sit amet..."
+
+    @pytest.fixture(autouse=True)
+    def init_storage(self, tmpdir):
+        self._fast_path = str(tmpdir.mkdir("fast"))
+        self._slow_path = str(tmpdir.mkdir("slow"))
+        self._fast_storage = FileSystemStorage(self._fast_path)
+        self._slow_storage = mock.Mock(
+            wraps=FileSystemStorage(self._slow_path)
+        )
+        self._storage = TieredStorage(
+            self._fast_storage, self._slow_storage, demote_after=0
+        )
+        self._storage.write(
+            self._TEST_FILE_NAME, self._TEST_FILE_CONTENT, mode="w"
+        )
+        yield
+        self._storage.close()
+
+    def _in_fast(self, name=_TEST_FILE_NAME):
+        return os.path.exists(os.path.join(self._fast_path, name))
+
+    def _in_slow(self, name=_TEST_FILE_NAME):
+        return os.path.exists(os.path.join(self._slow_path, name))
+
+    def test_improper_initialization(self):
+        with pytest.raises(ImproperlyConfiguredError):
+            TieredStorage(
+                self._fast_storage, self._slow_storage, max_fast_size=-1
+            )
+        with pytest.raises(ImproperlyConfiguredError):
+            TieredStorage(
+                self._fast_storage, self._slow_storage, demote_interval=0
+            )
+
+    def test_file_written_to_fast_tier(self):
+        assert self._in_fast()
+        assert not self._in_slow()
+        assert self._storage.read(self._TEST_FILE_NAME) == (
+            self._TEST_FILE_CONTENT
+        )
+
+    def test_file_demoted(self):
+        assert self._storage.demote() == [self._TEST_FILE_NAME]
+        assert not self._in_fast()
+        assert self._in_slow()
+        assert self._storage.exists(self._TEST_FILE_NAME)
+        assert self._storage.size(self._TEST_FILE_NAME) == len(
+            self._TEST_FILE_CONTENT
+        )
+
+    def test_file_promoted_on_read(self):
+        self._storage.demote()
+        assert self._storage.read(self._TEST_FILE_NAME) == (
+            self._TEST_FILE_CONTENT
+        )
+        assert self._in_fast()
+        with self._storage.open_read(self._TEST_FILE_NAME) as file:
+            assert file.read() == self._TEST_FILE_CONTENT.encode()
+        self._slow_storage.open_read.assert_called_once()
+        # The slow copy is up to date, so it is not uploaded again.
+        self._slow_storage.open_write.reset_mock()
+        assert self._storage.demote() == [self._TEST_FILE_NAME]
+        self._slow_storage.open_write.assert_not_called()
+
+    def test_open_file_not_demoted(self):
+        with self._storage.open_read(self._TEST_FILE_NAME) as file:
+            assert self._storage.demote() == []
+            assert file.read() == self._TEST_FILE_CONTENT.encode()
+        assert self._storage.demote() == [self._TEST_FILE_NAME]
+
+    def test_least_recently_used_files_demoted_above_capacity(self):
+        storage = TieredStorage(
+            self._fast_storage,
+            self._slow_storage,
+            max_fast_size=2 * len(self._TEST_FILE_CONTENT),
+        )
+        # Demoted explicitly rather than in the background.
+        storage.close()
+        for name in ("first.txt", "second.txt"):
+            storage.write(name, self._TEST_FILE_CONTENT, mode="w")
+        assert storage.demote() == [self._TEST_FILE_NAME]
+        storage.read("first.txt")
+        storage.write("third.txt", self._TEST_FILE_CONTENT, mode="w")
+        assert storage.demote() == ["second.txt"]
+
+    def test_files_demoted_in_background(self):
+        storage = TieredStorage(
+            self._fast_storage,
+            self._slow_storage,
+            demote_after=0,
+            demote_interval=0.01,
+        )
+        try:
+            deadline = time.monotonic() + 5
+            while self._in_fast() and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            storage.close()
+        assert self._in_slow()
+        assert not self._in_fast()
+
+    def test_newer_copy_read(self):
+        self._slow_storage.write(self._TEST_FILE_NAME, "newer", mode="w")
+        past = time.time() - 3600
+        os.utime(
+            os.path.join(self._fast_path, self._TEST_FILE_NAME), (past, past)
+        )
+        storage = TieredStorage(self._fast_storage, self._slow_storage)
+        storage._index.clear()
+        assert storage.read(self._TEST_FILE_NAME) == "newer"
+
+    def test_stale_fast_copy_resolved_on_first_use(self):
+        self._slow_storage.write(self._TEST_FILE_NAME, "newer", mode="w")
+        past = time.time() - 3600
+        os.utime(
+            os.path.join(self._fast_path, self._TEST_FILE_NAME), (past, past)
+        )
+        storage = TieredStorage(self._fast_storage, self._slow_storage)
+        assert storage.read(self._TEST_FILE_NAME) == "newer"
+        assert storage.demote() == []
+        assert self._slow_storage.read(self._TEST_FILE_NAME) == "newer"
+
+    def test_newer_slow_copy_not_demoted_over(self):
+        self._slow_storage.write(self._TEST_FILE_NAME, "newer", mode="w")
+        past = time.time() - 3600
+        os.utime(
+            os.path.join(self._fast_path, self._TEST_FILE_NAME), (past, past)
+        )
+        storage = TieredStorage(
+            self._fast_storage, self._slow_storage, demote_after=0
+        )
+        assert storage.demote() == [self._TEST_FILE_NAME]
+        assert not self._in_fast()
+        assert storage.read(self._TEST_FILE_NAME) == "newer"
+
+    def test_tier_looked_up_once(self):
+        self._storage.demote()
+        self._slow_storage.exists.reset_mock()
+        storage = TieredStorage(self._fast_storage, self._slow_storage)
+        for _ in range(3):
+            assert storage.exists(self._TEST_FILE_NAME)
+            storage.size(self._TEST_FILE_NAME)
+        assert not storage.exists("missing.txt")
+        assert self._slow_storage.exists.call_count == 2
+
+    def test_file_appended_after_promotion(self):
+        self._storage.demote()
+        self._storage.write(self._TEST_FILE_NAME, "!", mode="a")
+        assert self._storage.read(self._TEST_FILE_NAME) == (
+            self._TEST_FILE_CONTENT + "!"
+        )
+
+    def test_exclusive_write_of_demoted_file(self):
+        self._storage.demote()
+        with pytest.raises(FileExistsError):
+            self._storage.write(self._TEST_FILE_NAME, "content", mode="x")
+
+    def test_file_written_through_open_write(self):
+        with self._storage.open_write("streamed.txt", mode="w") as file:
+            file.write(self._TEST_FILE_CONTENT)
+        assert self._storage.read("streamed.txt") == self._TEST_FILE_CONTENT
+        assert self._in_fast("streamed.txt")
+
+    def test_file_deleted_from_both_tiers(self):
+        self._storage.demote()
+        self._storage.read(self._TEST_FILE_NAME)
+        self._storage.delete(self._TEST_FILE_NAME)
+        assert not self._in_fast()
+        assert not self._in_slow()
+        assert not self._storage.exists(self._TEST_FILE_NAME)
+        with pytest.raises(FileNotFoundError):
+            self._storage.delete(self._TEST_FILE_NAME)
+
+    def test_files_listed_from_both_tiers(self):
+        self._storage.demote()
+        self._storage.write("hot.txt", self._TEST_FILE_CONTENT, mode="w")
+        assert sorted(entry.name for entry in self._storage.list()) == [
+            "hot.txt",
+            self._TEST_FILE_NAME,
+        ]
@@ -0,0 +1,147 @@
+import asyncio
+import os
+from unittest import TestCase, mock
+
+import pytest
+
+from storages.backends.async_file_system import AsyncFileSystemStorage
+from storages.backends.file_system import FileSystemStorage
+from storages.exceptions import ImproperlyConfiguredError
+from storages.transfer import AsyncTransferManager, TransferManager, transfer
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+class TestTransfer(TestCase):
+    _TEST_FILE_CONTENT = b"Lorem ipsum dolor sit amet..."
+
+    @pytest.fixture(autouse=True)
+    def init_storage(self, tmpdir):
+        self._source_path = tmpdir.mkdir("source")
+        self._destination_path = tmpdir.mkdir("destination")
+        self._source = FileSystemStorage(path=self._source_path)
+        self._destination = FileSystemStorage(path=self._destination_path)
+        self._names = [f"{index}.bin" for index in range(5)]
+        for name in self._names:
+            self._source.write(name, self._TEST_FILE_CONTENT, mode="xb")
+
+    def _assert_transferred(self, result):
+        assert result.results == dict.fromkeys(
+            self._names, len(self._TEST_FILE_CONTENT)
+        )
+        assert not result.errors
+        for name in self._names:
+            assert (
+                self._destination.read(name, mode="rb")
+                == self._TEST_FILE_CONTENT
+            )
+
+    def test_improper_initialization(self):
+        for name in ("max_concurrency", "max_in_flight_bytes", "chunk_size"):
+            with pytest.raises(ImproperlyConfiguredError):
+                TransferManager(**{name: 0})
+
+    def test_files_transferred(self):
+        result = transfer(
+            self._source,
+            self._destination,
+            iter(self._names),
+            max_concurrency=2,
+        )
+        self._assert_transferred(result)
+
+    def test_files_transferred_in_chunks_within_budget(self):
+        manager = TransferManager(
+            max_concurrency=4, max_in_flight_bytes=8, chunk_size=4
+        )
+        self._assert_transferred(
+            manager.transfer(self._source, self._destination, self._names)
+        )
+
+    def test_progress_reported(self):
+        on_progress = mock.Mock()
+        manager = TransferManager(max_concurrency=1, on_progress=on_progress)
+        manager.transfer(
+            self._source, self._destination, [*self._names, "missing.bin"]
+        )
+        assert on_progress.call_count == len(self._names) + 1
+        progress = on_progress.call_args[0][0]
+        assert progress.files_transferred == len(self._names)
+        assert progress.files_failed == 1
+        assert progress.bytes_transferred == len(self._names) * len(
+            self._TEST_FILE_CONTENT
+        )
+        assert progress.throughput > 0
+
+    def test_failed_transfers_retried(self):
+        source = mock.Mock(wraps=self._source)
+        source.open_read.side_effect = [
+            ConnectionError(),
+            self._source.open_read(self._names[0]),
+        ]
+        manager = TransferManager(backoff=0)
+        result = manager.transfer(source, self._destination, self._names[:1])
+        assert result.results == {self._names[0]: len(self._TEST_FILE_CONTENT)}
+        assert source.open_read.call_count == 2
+
+    def test_failed_transfer_leaves_destination_untouched(self):
+        destination = FileSystemStorage(
+            path=self._destination_path, atomic_writes=True
+        )
+        destination.write(self._names[0], b"previous", mode="xb")
+        source = mock.Mock(wraps=self._source)
+        file = self._source.open_read(self._names[0], mode="rb")
+        file.read = mock.Mock(side_effect=[b"Lorem", OSError("Reset.")])
+        source.open_read.return_value = file
+        manager = TransferManager(max_attempts=1, chunk_size=5)
+        result = manager.transfer(source, destination, self._names[:1])
+        assert isinstance(result.errors[self._names[0]], OSError)
+        assert destination.read(self._names[0], mode="rb") == b"previous"
+        assert os.listdir(self._destination_path) == [self._names[0]]
+
+    def test_files_transferred_under_their_names(self):
+        destination = mock.Mock(wraps=self._destination)
+        transfer(self._source, destination, self._names)
+        written = [
+            args[0] for args, _ in destination.open_write.call_args_list
+        ]
+        assert sorted(written) == self._names
+        destination.move.assert_not_called()
+
+    def test_failed_transfers_reported(self):
+        source = mock.Mock(wraps=self._source)
+        source.open_read.side_effect = ConnectionError()
+        manager = TransferManager(max_attempts=3, backoff=0)
+        result = manager.transfer(
+            source, self._destination, ("0.bin", "missing.bin")
+        )
+        assert not result.results
+        assert isinstance(result.errors["0.bin"], ConnectionError)
+        assert source.open_read.call_count == 6
+        source.open_read.side_effect = None
+        result = manager.transfer(source, self._destination, ["missing.bin"])
+        assert isinstance(result.errors["missing.bin"], FileNotFoundError)
+        assert source.open_read.call_count == 7
+
+    def test_files_transferred_asynchronously(self):
+        async def names():
+            for name in self._names:
+                yield name
+
+        async def transfer_files():
+            async with AsyncFileSystemStorage(
+                path=self._source_path
+            ) as source, AsyncFileSystemStorage(
+                path=self._destination_path
+            ) as destination:
+                return await AsyncTransferManager(
+                    max_concurrency=2, max_in_flight_bytes=8
+                ).transfer(source, destination, names())
+
+        self._assert_transferred(run(transfer_files()))